@@ -0,0 +1,126 @@
+import os
+import sys
+import csv
+import time
+import argparse
+import tempfile
+import subprocess
+from typing import List, Dict, Tuple, Callable
+
+from sheets_stub import SheetsStub, build_workbook, start_stub, synthetic_result_rows
+
+# ==========================================
+# 1. 설정 정보
+# ==========================================
+GENERATORS_DIR = os.path.dirname(os.path.abspath(__file__))
+TARGET_MODULES = ['generate_dashboard', 'generate_table', 'mokil_high_school_results_gen']
+HEAVY_MODULES = ['pandas', 'numpy', 'openpyxl', 'gspread', 'google.auth', 'requests']
+REPEAT = 5
+FETCH_LATENCY_MS = 80  # 대역 서버 응답 지연 (구글 API 왕복 시간 근사)
+
+# ==========================================
+# 2. 합성 데이터 (구글 시트 CSV export 와 같은 구조)
+# ==========================================
+def write_synthetic_sheet(path: str, mode: str, students: int, seed: int = 0) -> None:
+    """전기고/후기고 CSV export 와 같은 레이아웃의 합성 시트를 기록합니다 (행 생성은 sheets_stub 과 공유)."""
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        csv.writer(f).writerows(synthetic_result_rows(mode, students, seed))
+
+# ==========================================
+# 3. 측정 항목
+# ==========================================
+def _run_python(code: str) -> Tuple[float, str, str]:
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=GENERATORS_DIR,
+                          capture_output=True, text=True, stdin=subprocess.DEVNULL)
+    return time.perf_counter() - start, proc.stdout, proc.stderr
+
+def _importtime_cumulative(stderr: str, module: str) -> float:
+    """-X importtime 출력에서 모듈의 누적 import 시간(ms)을 찾습니다."""
+    for line in stderr.splitlines():
+        parts = [p.strip() for p in line.split('|')]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1000
+    return 0.0
+
+def bench_import_time() -> None:
+    """각 생성기 모듈의 콜드 import 시간과 import 시점에 로드되는 무거운 패키지"""
+    print(f"\n[import 시간] (새 프로세스, {REPEAT}회 중 최솟값)")
+    print(f"{'모듈':<34}{'import(ms)':>12}{'프로세스(ms)':>14}  로드된 무거운 패키지")
+    for module in TARGET_MODULES:
+        code = f"import sys, {module}; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+        best_import, best_wall, loaded = float('inf'), float('inf'), ''
+        for _ in range(REPEAT):
+            wall, out, err = _run_python(code)
+            best_import = min(best_import, _importtime_cumulative(err, module))
+            best_wall = min(best_wall, wall * 1000)
+            loaded = out.strip()
+        print(f"{module:<34}{best_import:>12.1f}{best_wall:>14.1f}  {loaded or '-'}")
+
+def bench_light_vs_full(students: int = 2000) -> None:
+    """mokil 생성기 전체 실행 시간: 라이트 모드(csv) vs 기본 모드(pandas)"""
+    print(f"\n[mokil 생성기 실행 시간] (합성 데이터 {students}행, 새 프로세스)")
+    script = os.path.join(GENERATORS_DIR, 'mokil_high_school_results_gen.py')
+    with tempfile.TemporaryDirectory() as tmp:
+        early, late = os.path.join(tmp, 'early.csv'), os.path.join(tmp, 'late.csv')
+        write_synthetic_sheet(early, 'early', students, seed=1)
+        write_synthetic_sheet(late, 'late', students, seed=2)
+
+        cases = [('light', ['--light']), ('full(html)', ['--formats', 'html']), ('full', []), ('full(typed)', ['--typed'])]
+        for label, extra in cases:
+            best = float('inf')
+            for _ in range(REPEAT):
+                start = time.perf_counter()
+                subprocess.run([sys.executable, script, '--early-source', early, '--late-source', late] + extra,
+                               cwd=tmp, capture_output=True, stdin=subprocess.DEVNULL, check=True)
+                best = min(best, (time.perf_counter() - start) * 1000)
+            print(f"{label:<34}{best:>12.1f} ms")
+
+def bench_sheets_fetch(classes: int = 15) -> None:
+    """gspread 수집 경로(시트 탐색 + 값 읽기)를 로컬 대역 서버에 대해 측정: 매니페스트 캐시 없음 vs 있음"""
+    import re
+    from sheets_client import authorize, RequestScheduler, TRANSFER_STATS
+    from sheet_manifest import SheetManifest, fetch_target_sheets
+    from generate_dashboard import SHEET_URL, SURVEY_COLUMNS, RESULT_SCAN_FROM
+
+    print(f"\n[시트 수집] (로컬 대역 서버, 지연 {FETCH_LATENCY_MS}ms, 설문 시트 {classes}개)")
+    stub = SheetsStub(build_workbook(classes=classes), latency_ms=FETCH_LATENCY_MS)
+    server, base = start_stub(stub)
+    pattern = re.compile(r"진학희망 및 지원유형 조사\(3\d{2}\)_Sheet1")
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            manifest = SheetManifest(path=os.path.join(tmp, 'manifest.json'))
+            client = authorize(endpoint=base)
+            cases = [('cold(매니페스트 없음)', None), ('warm(매니페스트 캐시)', None), ('warm + 필요한 열만', SURVEY_COLUMNS)]
+            for label, columns in cases:
+                before, before_bytes = stub.stats['requests'], TRANSFER_STATS['bytes']
+                start = time.perf_counter()
+                rows = sum(len(r) for _, r in fetch_target_sheets(client, SHEET_URL, pattern, RequestScheduler(), manifest, columns,
+                                                                   RESULT_SCAN_FROM if columns else None))
+                elapsed = (time.perf_counter() - start) * 1000
+                kb = (TRANSFER_STATS['bytes'] - before_bytes) / 1024
+                print(f"{label:<34}{elapsed:>12.1f} ms  요청 {stub.stats['requests'] - before}회, {rows}행, {kb:.1f}KB")
+    finally:
+        server.shutdown()
+
+BENCHMARKS: Dict[str, Callable[[], None]] = {
+    'import': bench_import_time,
+    'light': bench_light_vs_full,
+    'fetch': bench_sheets_fetch,
+}
+
+# ==========================================
+# 4. 실행
+# ==========================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="생성기 성능 측정")
+    parser.add_argument('names', nargs='*', help=f"실행할 측정 항목 ({', '.join(BENCHMARKS)} / 기본: 전체)")
+    args = parser.parse_args()
+    unknown = [n for n in args.names if n not in BENCHMARKS]
+    if unknown:
+        parser.error(f"알 수 없는 측정 항목: {', '.join(unknown)}")
+
+    selected: List[str] = args.names or list(BENCHMARKS)
+    print(f"=== 생성기 벤치마크 (Python {sys.version.split()[0]}) ===")
+    for name in selected:
+        BENCHMARKS[name]()
@@ -0,0 +1,60 @@
+from typing import Any, Dict, List, Sequence, Tuple
+
+# ==========================================
+# 1. 설정 정보
+# ==========================================
+# 그룹 한 묶음의 열 (학과는 has_dept 그룹만)
+STUDENT_FIELDS = ('name', 'gender', 'school')
+DEPT_FIELDS = STUDENT_FIELDS + ('dept',)
+FIELD_LABELS = {'name': '이름', 'gender': '성별', 'school': '학교명', 'dept': '학과'}
+HEADER_ROWS = 2                                       # 그룹 이름 행 + 열 이름 행
+FOOTER_ROWS = (('남', '남'), ('여', '여'), ('계', None))  # 합계 행 (라벨, 성별 - None 은 전체)
+
+Merge = Tuple[int, int, int, int]  # (첫 행, 첫 열, 끝 행, 끝 열) - 0부터, 끝 포함
+
+def group_fields(group: Dict[str, Any]) -> Tuple[str, ...]:
+    return DEPT_FIELDS if group['has_dept'] else STUDENT_FIELDS
+
+# ==========================================
+# 2. 반 × 그룹 격자
+# ==========================================
+def build_class_layout(classes: Dict[int, Dict[str, List[Dict[str, str]]]], groups: Sequence[Dict[str, Any]],
+                       counts: Dict[str, int], class_nums: Sequence[int]) -> Dict[str, Any]:
+    """
+    반 × 그룹 표의 격자를 한 번만 계산합니다. HTML 표 / 반별 페이지 / 엑셀은 이 결과를 그대로 내보내기만 하므로
+    행 수, 빈 칸 패딩, 학반 세로 병합, 그룹 가로 병합이 형식마다 어긋나지 않습니다.
+    - visible_groups: 학생이 한 명이라도 있는 그룹 / spans: 그룹별 {'group', 'col', 'width'} (0열은 학반)
+    - blocks: 반마다 {'num', 'label', 'top'(본문 첫 행), 'height'(그룹 중 최대 인원, 최소 1), 'filled'(그룹별 인원), 'rows'}
+      rows[r][k] 는 r번째 행 k번째 그룹의 학생 - filled[k] <= r < height 인 칸은 None (빈 칸 패딩)
+    - merges: 머리글 2행 + 본문 + 합계 3행으로 된 표 전체 기준 병합 범위 (학반 머리글, 그룹 머리글/합계, 반별 학반 칸)
+    """
+    visible_groups = [g for g in groups if counts[g['id']] > 0]
+    spans = []
+    col = 1
+    for g in visible_groups:
+        width = len(group_fields(g))
+        spans.append({'group': g, 'col': col, 'width': width})
+        col += width
+
+    blocks = []
+    top = 0
+    for num in class_nums:
+        lists = [classes[num][g['id']] for g in visible_groups]
+        filled = [len(students) for students in lists]
+        height = max(filled, default=0) or 1
+        rows = [[students[r] if r < n else None for students, n in zip(lists, filled)] for r in range(height)]
+        blocks.append({'num': num, 'label': f"3-{num}", 'top': top, 'height': height, 'filled': filled, 'rows': rows})
+        top += height
+
+    footer_top = HEADER_ROWS + top
+    merges: List[Merge] = [(0, 0, HEADER_ROWS - 1, 0)]
+    for span in spans:
+        last = span['col'] + span['width'] - 1
+        if span['width'] > 1:
+            merges.append((0, span['col'], 0, last))
+            merges.extend((footer_top + i, span['col'], footer_top + i, last) for i in range(len(FOOTER_ROWS)))
+    merges.extend((HEADER_ROWS + b['top'], 0, HEADER_ROWS + b['top'] + b['height'] - 1, 0)
+                  for b in blocks if b['height'] > 1)
+
+    return {'visible_groups': visible_groups, 'spans': spans, 'n_cols': col, 'blocks': blocks,
+            'body_rows': top, 'footer_top': footer_top, 'merges': merges}
@@ -0,0 +1,284 @@
+import os
+import re
+import sys
+import json
+from collections import Counter, defaultdict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+from output_writer import write_text, status_note
+from run_metrics import METRICS
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+# ==========================================
+# 1. 설정 정보
+# ==========================================
+VALIDATION_DIR_NAME = '.validation'
+# 검증 규칙 (보고서 순서)
+RULES: Dict[str, str] = {
+    'duplicate': '중복 학생',
+    'track_conflict': '전기/후기 동시 지원',
+    'bad_class': '반 해석 불가',
+    'result_conflict': '합불 결과 모순',
+}
+# 검증 레코드 필드: 원본(시트), 원본 행 번호(1부터), 전형(early/late), 그룹, 반(원본 값), 번호, 이름, 합불 칸들(열 순서)
+RECORD_FIELDS = ('source', 'row', 'track', 'group', 'class', 'num', 'name', 'results')
+# 설문 시트 열 위치 (generate_dashboard / generate_table 공용): 전기 지원 H~K, 후기 지원 M~P, 합불 U/V/W
+SURVEY_TRACK_COLS = {'early': (7, 8, 9, 10), 'late': (12, 13, 14, 15)}
+SURVEY_RESULT_COLS = {'early': (20, 21), 'late': (22,)}
+# 합불 문자열 판정 ('불합격'/'미합격' 안의 '합격'에 걸리지 않도록 불합격·예비 표시를 먼저 확인)
+# 합격은 '합격' 낱말이 있어야 함 ('합계', '결합' 같은 비고는 판정 불가)
+FAIL_PATTERN = '불합|미합|탈락'
+WAIT_PATTERN = '예비'            # 예비 합격 (대기, 최종 아님)
+PASS_TOKEN = '합격'
+STAGE_PATTERN = '1차|2차|면접'   # 중간 단계 합격 (최종 아님)
+MAX_EXAMPLES = 10               # 콘솔에 보여줄 문제 수
+
+def classify_result(text: Any) -> str:
+    """합불 칸 값 → '불합격' / '진행'(1차·2차·면접·예비 합격) / '합격' / '' (빈 값·판정 불가)"""
+    t = re.sub(r'\s+', '', str(text or ''))
+    if re.search(FAIL_PATTERN, t): return '불합격'
+    if PASS_TOKEN not in t: return ''
+    if re.search(WAIT_PATTERN, t) or re.search(STAGE_PATTERN, t): return '진행'
+    return '합격'
+
+def is_contradictory(text: Any) -> bool:
+    """'합격 → 불합격' 처럼 한 칸에 최종 합격과 불합격이 함께 적힌 값 (중간 단계·예비 표기는 제외)"""
+    t = re.sub(r'\s+', '', str(text or ''))
+    if not re.search(FAIL_PATTERN, t) or re.search(STAGE_PATTERN, t) or re.search(WAIT_PATTERN, t): return False
+    return PASS_TOKEN in re.sub(r'불합격|미합격', '', t)
+
+def parse_class(val: Any) -> Optional[int]:
+    """'3-7' → 7, '7반' / '3학년 7반' → 7 (해석할 수 없으면 None)"""
+    val = str(val or '').strip()
+    if '-' in val:
+        part = val.split('-')[1].strip()
+        return int(part) if part.isdigit() else None
+    nums = re.findall(r'\d+', val)
+    return int(nums[-1]) if nums else None
+
+def survey_checks(source: str, row_no: int, row: Sequence[str]) -> List[Dict[str, Any]]:
+    """설문 시트 한 행 → 검증 레코드 (전기/후기 열이 모두 채워져 있으면 전형마다 하나씩)"""
+    checks = []
+    for track, cols in SURVEY_TRACK_COLS.items():
+        filled = [c for c in cols if c < len(row) and str(row[c]).strip()]
+        if not filled: continue
+        checks.append({
+            'source': source, 'row': row_no, 'track': track, 'group': str(filled[0]),
+            'class': row[0], 'num': row[1], 'name': row[2],
+            'results': [row[c] for c in SURVEY_RESULT_COLS[track] if c < len(row)],
+        })
+    return checks
+
+# ==========================================
+# 2. 검증 (열 단위 규칙 + 해시 조인, 행 수에 선형)
+# ==========================================
+def _issue(rule: str, track: str, cls: Any, name: str, rows: List[str], detail: str) -> Dict[str, Any]:
+    return {'rule': rule, 'track': track, 'class': str(cls), 'name': name, 'rows': rows, 'detail': detail}
+
+def _where(source: str, row: Any) -> str:
+    return f"{source}:{row}"
+
+def _rows(group: List[Dict[str, Any]]) -> List[str]:
+    # 한 행이 전기/후기 레코드 둘로 나뉜 경우 위치는 한 번만
+    return list(dict.fromkeys(g['where'] for g in group))
+
+def validate_records(records: Iterable[Dict[str, Any]], max_class: Optional[int] = None,
+                     vectorized: bool = True) -> Dict[str, Any]:
+    """
+    정규화된 학생 레코드 전체를 한 번에 검사합니다.
+    - duplicate: 같은 학생(반 + 번호 + 이름)이 같은 전형에서 여러 시트에 있거나, 같은 시트·그룹에 두 번 이상 입력됨
+    - track_conflict: 같은 학생이 전기고와 후기고에 모두 있음 (전기고 불합격 후 후기 지원은 정상)
+    - bad_class: 반 값을 해석할 수 없거나 1~max_class 범위 밖
+    - result_conflict: 한 칸에 합격/불합격이 함께 적힘, 최종 합격 뒤에 다른 결과가 있음, 중복 행끼리 결과가 다름
+    vectorized=True 이면 pandas 열 연산 + groupby 로, False 이면 dict 한 번 순회로 검사합니다 (라이트 모드).
+    """
+    records = list(records)
+    issues = _validate_frame(records, max_class) if vectorized and records else _validate_loop(records, max_class)
+    issues.sort(key=lambda i: (list(RULES).index(i['rule']), i['track'], i['rows'], i['detail']))
+    return {
+        'checked': len(records),
+        'counts': {rule: sum(1 for i in issues if i['rule'] == rule) for rule in RULES},
+        'issues': issues,
+    }
+
+def _class_key(raw: str, max_class: Optional[int]) -> Tuple[str, bool]:
+    """반 값 → (학생 키에 쓸 반, 해석 불가 여부). 해석할 수 없으면 원본 값을 그대로 키로 씀"""
+    num = parse_class(raw)
+    bad = num is None or num < 1 or bool(max_class and num > max_class)
+    return (raw.strip() if bad else str(num)), bad
+
+def _by_unique(values: 'pd.Series', func: Callable[[Any], Any], dtype: Any = object) -> 'np.ndarray':
+    """
+    고유값에만 func 를 적용하고 factorize 코드로 펼칩니다 (반·합불 칸은 값 종류가 수십 개 이하).
+    규칙 함수는 루프 경로와 같은 것을 쓰므로 두 경로의 판정이 항상 같음.
+    """
+    import numpy as np
+    import pandas as pd
+    codes, uniques = pd.factorize(values)
+    out = np.empty(len(uniques), dtype=dtype)
+    for i, u in enumerate(uniques):
+        out[i] = func(u)
+    return out[codes]
+
+def _flagged_groups(flagged: 'pd.DataFrame', *cols: str) -> Dict[Tuple[Any, ...], List[Dict[str, Any]]]:
+    """문제로 표시된 행(보통 소수)만 파이썬 dict 로 묶음 (groupby 객체를 그룹마다 순회하는 것보다 빠름)"""
+    groups: Dict[Tuple[Any, ...], List[Dict[str, Any]]] = defaultdict(list)
+    for r in flagged.to_dict('records'):
+        groups[tuple(r[c] for c in cols)].append(r)
+    return groups
+
+def _validate_frame(records: List[Dict[str, Any]], max_class: Optional[int]) -> List[Dict[str, Any]]:
+    import numpy as np
+    import pandas as pd
+    df = pd.DataFrame.from_records(records, columns=list(RECORD_FIELDS))
+    for col in ('source', 'track', 'group', 'class', 'num', 'name'):
+        df[col] = df[col].fillna('').astype(str)
+    issues: List[Dict[str, Any]] = []
+
+    # --- 반 해석 ---
+    parsed = _by_unique(df['class'], lambda v: _class_key(v, max_class))
+    df['class_key'] = [k for k, _ in parsed]
+    bad = pd.Series([b for _, b in parsed], index=df.index, dtype=bool)
+    for r in df[bad].to_dict('records'):
+        issues.append(_issue('bad_class', r['track'], r['class'], r['name'], [_where(r['source'], r['row'])],
+                             _class_detail(r['class'], max_class)))
+
+    # --- 합불 칸 (레코드별 칸 목록을 펼쳐서 열 단위 판정) ---
+    cells = df['results'].explode().fillna('').astype(str)  # 칸이 없는 레코드는 '' 한 칸
+    outcome = pd.Series(_by_unique(cells, classify_result), index=cells.index)
+    mixed = _by_unique(cells, is_contradictory, bool)
+    filled = _by_unique(cells, lambda v: bool(v.strip()), bool)
+    pos = pd.Series(np.arange(len(cells)), index=cells.index)
+    first_pass = pos.where(outcome == '합격').groupby(level=0).min()
+    last_filled = pos.where(filled).groupby(level=0).max()
+    after_pass = (last_filled > first_pass).reindex(df.index, fill_value=False)
+    df['outcome'] = outcome.where(outcome != '').groupby(level=0).last().reindex(df.index).fillna('')
+    for idx, value in cells[mixed].items():
+        r = df.loc[idx]
+        issues.append(_issue('result_conflict', r['track'], r['class'], r['name'], [_where(r['source'], r['row'])],
+                             f"한 칸에 합격과 불합격이 함께 적힘: '{value.strip()}'"))
+    for r in df[after_pass].to_dict('records'):
+        issues.append(_issue('result_conflict', r['track'], r['class'], r['name'], [_where(r['source'], r['row'])],
+                             "최종 합격 뒤에 다른 결과가 있음"))
+
+    # --- 학생 키(반 + 번호 + 이름) 기준 해시 조인 (groupby) ---
+    df['num_key'] = _by_unique(df['num'], str.strip)
+    df['name_key'] = _by_unique(df['name'], lambda n: ''.join(n.split()))
+    df['key'] = df.groupby(['class_key', 'num_key', 'name_key'], sort=False).ngroup()
+    df['where'] = df['source'] + ':' + df['row'].astype(str)
+    df['is_pass'] = df['outcome'] == '합격'
+    df['is_fail'] = df['outcome'] == '불합격'
+    df['repeated'] = df.groupby(['key', 'track', 'source', 'group'], sort=False)['row'].transform('size') > 1
+    by_track = df.groupby(['key', 'track'], sort=False)
+    duplicate = (by_track['source'].transform('nunique') > 1) | by_track['repeated'].transform('any')
+    disagree = by_track['is_pass'].transform('any') & by_track['is_fail'].transform('any')
+    for (key, track), grp in _flagged_groups(df[duplicate], 'key', 'track').items():
+        issues.append(_issue('duplicate', track, grp[0]['class'], grp[0]['name'], _rows(grp),
+                             _duplicate_detail(len({g['source'] for g in grp}))))
+    for (key, track), grp in _flagged_groups(df[disagree], 'key', 'track').items():
+        issues.append(_issue('result_conflict', track, grp[0]['class'], grp[0]['name'], _rows(grp),
+                             "중복 행끼리 합불 결과가 다름"))
+
+    df['early_live'] = (df['track'] == 'early') & ~df['is_fail']
+    by_key = df.groupby('key', sort=False)
+    conflict = (by_key['track'].transform('nunique') > 1) & by_key['early_live'].transform('any')
+    for (key,), grp in _flagged_groups(df[conflict], 'key').items():
+        issues.append(_issue('track_conflict', 'early+late', grp[0]['class'], grp[0]['name'], _rows(grp),
+                             _track_detail(g['outcome'] for g in grp if g['track'] == 'early')))
+    return issues
+
+def _validate_loop(records: List[Dict[str, Any]], max_class: Optional[int]) -> List[Dict[str, Any]]:
+    issues: List[Dict[str, Any]] = []
+    by_track: Dict[Tuple[Tuple[str, str, str], str], List[Dict[str, Any]]] = defaultdict(list)
+    by_key: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = defaultdict(list)
+    # 반/합불 칸은 값 종류가 적으므로 규칙 판정을 값마다 한 번만
+    class_key_of = lru_cache(maxsize=None)(lambda v: _class_key(v, max_class))
+    outcome_of = lru_cache(maxsize=None)(classify_result)
+    mixed_of = lru_cache(maxsize=None)(is_contradictory)
+    for rec in records:
+        r = {f: str(rec.get(f, '') or '') for f in RECORD_FIELDS if f not in ('row', 'results')}
+        r['row'], r['where'] = rec.get('row', ''), _where(r['source'], rec.get('row', ''))
+        class_key, bad = class_key_of(r['class'])
+        if bad:
+            issues.append(_issue('bad_class', r['track'], r['class'], r['name'], [r['where']], _class_detail(r['class'], max_class)))
+
+        results = [str(v or '') for v in rec.get('results') or []]
+        outcomes = [outcome_of(v) for v in results]
+        for v in results:
+            if mixed_of(v):
+                issues.append(_issue('result_conflict', r['track'], r['class'], r['name'], [r['where']],
+                                     f"한 칸에 합격과 불합격이 함께 적힘: '{v.strip()}'"))
+        if '합격' in outcomes:
+            last_filled = max(i for i, v in enumerate(results) if v.strip())
+            if last_filled > outcomes.index('합격'):
+                issues.append(_issue('result_conflict', r['track'], r['class'], r['name'], [r['where']], "최종 합격 뒤에 다른 결과가 있음"))
+        r['outcome'] = next((o for o in reversed(outcomes) if o), '')
+
+        key = (class_key, r['num'].strip(), ''.join(r['name'].split()))
+        by_track[(key, r['track'])].append(r)
+        by_key[key].append(r)
+
+    for (key, track), group in by_track.items():
+        if len(group) < 2: continue
+        first = group[0]
+        sources = {g['source'] for g in group}
+        if len(sources) > 1 or max(Counter((g['source'], g['group']) for g in group).values()) > 1:
+            issues.append(_issue('duplicate', track, first['class'], first['name'], _rows(group),
+                                 _duplicate_detail(len(sources))))
+        outcomes = {g['outcome'] for g in group}
+        if '합격' in outcomes and '불합격' in outcomes:
+            issues.append(_issue('result_conflict', track, first['class'], first['name'], _rows(group),
+                                 "중복 행끼리 합불 결과가 다름"))
+    for key, group in by_key.items():
+        if len(group) < 2: continue
+        early = [g['outcome'] for g in group if g['track'] == 'early']
+        if len({g['track'] for g in group}) > 1 and any(o != '불합격' for o in early):
+            first = group[0]
+            issues.append(_issue('track_conflict', 'early+late', first['class'], first['name'], _rows(group),
+                                 _track_detail(early)))
+    return issues
+
+def _class_detail(raw: str, max_class: Optional[int]) -> str:
+    num = parse_class(raw)
+    if num is None: return f"반 값 '{raw}' 을(를) 해석할 수 없음"
+    return f"반 번호 {num} 이(가) 범위(1~{max_class}) 밖" if max_class else f"반 번호 {num} 이(가) 올바르지 않음"
+
+def _duplicate_detail(n_sources: int) -> str:
+    return f"같은 학생이 {n_sources}개 시트에 있음" if n_sources > 1 else "같은 시트·그룹에 두 번 이상 입력됨"
+
+def _track_detail(early_outcomes: Iterable[str]) -> str:
+    states = sorted({o or '결과 없음' for o in early_outcomes if o != '불합격'})
+    return f"전기고({', '.join(states)})와 후기고에 모두 있음"
+
+# ==========================================
+# 3. 검증 보고서
+# ==========================================
+def validation_path(output_dir: str, name: Optional[str] = None) -> str:
+    name = name or os.path.splitext(os.path.basename(sys.argv[0]))[0] or 'run'
+    return os.path.join(output_dir, VALIDATION_DIR_NAME, f"{name}.json")
+
+def run_validation(records: Iterable[Dict[str, Any]], output_dir: str, max_class: Optional[int] = None,
+                   vectorized: bool = True, name: Optional[str] = None) -> Dict[str, Any]:
+    """검증 후 <출력 폴더>/.validation/<생성기>.json 에 기록하고, 규칙별 건수를 출력/지표로 남깁니다."""
+    with METRICS.timer('validation_seconds'):
+        report = validate_records(records, max_class, vectorized)
+    path = validation_path(output_dir, name)
+    status = write_text(path, json.dumps(report, ensure_ascii=False, indent=1))
+    for rule, n in report['counts'].items():
+        METRICS.set('validation_issues', n, rule=rule)
+
+    total = len(report['issues'])
+    if not total:
+        print(f"🧪 데이터 검증: {report['checked']}건 검사 - 문제 없음{status_note(status)}")
+        return report
+    summary = ' · '.join(f"{RULES[rule]} {n}건" for rule, n in report['counts'].items() if n)
+    print(f"⚠️ 데이터 검증: {report['checked']}건 검사 - {summary} (상세: {path}){status_note(status)}")
+    for issue in report['issues'][:MAX_EXAMPLES]:
+        print(f"   - [{RULES[issue['rule']]}] {issue['class']} {issue['name']}: {issue['detail']} ({', '.join(issue['rows'])})")
+    if total > MAX_EXAMPLES:
+        print(f"   ... 외 {total - MAX_EXAMPLES}건")
+    return report
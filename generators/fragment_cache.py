@@ -0,0 +1,97 @@
+import os
+import json
+import hashlib
+import inspect
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from run_metrics import METRICS
+
+# ==========================================
+# 1. 설정 정보
+# ==========================================
+# 렌더링한 HTML 조각: .cache/fragments/<이름>.json (조각 데이터 해시 → HTML)
+FRAGMENT_DIR = os.path.join('.cache', 'fragments')
+CACHE_VERSION = 1
+
+def template_version(*parts: Any) -> str:
+    """
+    조각을 만드는 코드(함수 소스)와 설정 값(class 표 등)으로 만든 템플릿 버전.
+    렌더링 코드나 설정이 바뀌면 버전이 달라져 예전 조각을 통째로 버립니다.
+    """
+    h = hashlib.sha1()
+    for part in parts:
+        h.update((inspect.getsource(part) if callable(part) else repr(part)).encode('utf-8'))
+    return h.hexdigest()[:12]
+
+def content_key(data: Any) -> str:
+    """조각을 만든 데이터(JSON 으로 표현 가능한 값) → 해시 키"""
+    text = json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+# ==========================================
+# 2. 조각 캐시
+# ==========================================
+class FragmentCache:
+    """
+    반/표 단위 HTML 조각 캐시. 조각을 만든 데이터의 해시가 지난 실행과 같으면 렌더링하지 않고 저장된 HTML 을 그대로 끼워 넣으므로
+    렌더링 시간이 학교 전체 크기가 아니라 바뀐 반(표) 수에 비례합니다. 여러 스레드에서 동시에 써도 안전합니다.
+    enabled=False 이면 읽지도 저장하지도 않고 매번 렌더링합니다.
+    save() 는 이번 실행에 쓴 조각만 남기고(사라진 반, 바뀌기 전 데이터의 조각은 정리) 달라졌을 때만 파일을 갱신합니다.
+    """
+
+    def __init__(self, name: str, version: str, root: str = FRAGMENT_DIR, enabled: bool = True):
+        self.name = name
+        self.version = f"{CACHE_VERSION}-{version}"
+        self.path: Optional[str] = os.path.join(root, f"{name}.json") if enabled else None
+        self.lock = threading.Lock()
+        self.stored: Dict[str, Any] = self._load()  # 지난 실행까지의 조각
+        self.used: Dict[str, Any] = {}              # 이번 실행에 쓴 조각 (다음 실행용)
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self) -> Dict[str, Any]:
+        if not self.path: return {}
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if payload.get('version') != self.version: return {}
+        return payload.get('fragments', {})
+
+    def render(self, data: Any, fn: Callable[[], Any]) -> Any:
+        """data 로 만든 조각: 같은 데이터의 조각이 있으면 그대로, 없으면 fn() 으로 렌더링해 보관"""
+        key = content_key(data) if self.path else None
+        with self.lock:
+            cached = self.used.get(key, self.stored.get(key)) if key else None
+            if cached is not None:
+                self.used[key] = cached
+                self.hits += 1
+                return cached
+        value = fn()
+        with self.lock:
+            if key: self.used[key] = value
+            self.misses += 1
+        return value
+
+    def save(self) -> None:
+        """이번 실행의 조각으로 교체하고 적중/미스를 지표로 남김 (실시간 모드는 갱신마다 호출)"""
+        with self.lock:
+            used, self.used = self.used, {}
+            changed = used.keys() != self.stored.keys()
+            self.stored = used
+            METRICS.add('cache_hits', self.hits, cache='fragments')
+            METRICS.add('cache_misses', self.misses, cache='fragments')
+            self.hits = self.misses = 0
+            if not self.path or not changed: return
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'version': self.version, 'name': self.name, 'fragments': used}, f,
+                          ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp, self.path)
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        return f"🧩 HTML 조각 캐시: {total}개 중 {self.hits}개 재사용, {self.misses}개 새로 렌더링"
@@ -1,10 +1,25 @@
-import gspread
-from google.oauth2.service_account import Credentials
-import pandas as pd
 import re
 import os
+import json
+import argparse
+import functools
+from collections import Counter
 from datetime import datetime
-from typing import List, Dict, Tuple, Any
+from typing import List, Dict, Tuple, Any, Iterator, Optional
+
+from report_stats import ReportStats
+from school_names import get_resolver
+from sheets_client import authorize, get_scheduler, TRANSFER_STATS
+from sheet_manifest import fetch_target_sheets, get_manifest
+from output_writer import write_text, status_note, save_run_manifest
+from html_compact import enable_compact, report_compaction
+from results_cube import cube_path, update_cube, render_cube_html, year_from_title
+from search_index import save_search_partial, save_portal
+from data_validation import classify_result, survey_checks, run_validation
+from workbook_source import WorkbookSource, open_workbook, workbook_url
+from run_budget import RunBudget, BudgetExceeded, SourceUnavailable, fetch_and_parse, stage_budget
+from live_server import LiveChannel, LiveHub, unique_ids, describe_delta, serve_live, DEFAULT_LIVE_PORT, DEFAULT_POLL_SECONDS
+from run_metrics import METRICS, record_scheduler, record_manifest, record_resolver, save_run_metrics
 
 # ==========================================
 # 1. 설정 정보
@@ -12,129 +27,161 @@ from typing import List, Dict, Tuple, Any
 KEY_FILE = 'service_key.json'
 SHEET_URL = 'https://docs.google.com/spreadsheets/d/1I_Cy5TZEnG0GmoThLPJJR7ZrXxUgXzsDDzu2zOtmjQI/edit?gid=294818561#gid=294818561'
 
+# 컬럼 인덱스 (A=0 기준) - 시트에서는 이 열들과 합불 스캔 범위만 읽음 (A:D, H열부터 시트 끝 열까지)
+COL = {
+    'CLASS': 0,        # A: 반
+    'NUM': 1,          # B: 번호
+    'NAME': 2,         # C: 성명
+    'GENDER': 3,       # D: 성별
+    'GIFTED': 7,       # H: 영재고
+    'SCIENCE': 8,      # I: 과학고
+    'ARTS': 9,         # J: 예술고
+    'MEISTER': 10,     # K: 특성화고(교명)
+    'DEPT': 11,        # L: 특성화고(학과)
+    'JASA': 12,        # M: 자사고
+    'FOREIGN': 13,     # N: 외고/국제고
+    'GENERAL': 14,     # O: 일반고
+    'ETC': 15          # P: 기타
+}
+# 합불 여부는 Q열부터 시트 끝 열까지 전체에서 찾음 (결과 U/V/W 외에 비고란에 적는 경우 포함)
+RESULT_SCAN_FROM = 16  # Q
+# 행 폭은 최소 Z열까지 (검증이 보는 합불 열 U/V/W 포함, 구글 시트 기본 열 수), 시트가 더 넓으면 끝 열까지
+SURVEY_COLUMNS = sorted(set(COL.values()) | set(range(RESULT_SCAN_FROM, 26)))
+
 # 생성될 파일명
 OUTPUT_DIR = 'reports'
 OUTPUT_EARLY_HTML = os.path.join(OUTPUT_DIR, '목일중_전기고_진학현황.html')
 OUTPUT_LATE_HTML = os.path.join(OUTPUT_DIR, '목일중_후기고_진학현황.html')
+OUTPUT_CUBE_HTML = os.path.join(OUTPUT_DIR, '목일중_지원현황_통계큐브.html')
 
-SCOPES = [
-    'https://www.googleapis.com/auth/spreadsheets',
-    'https://www.googleapis.com/auth/drive'
-]
+# 가상화(청크 로딩) 모드 설정
+VIRTUAL_CHUNK_SIZE = 500   # 청크 파일 하나에 담을 학생 수
+VIRTUAL_THRESHOLD = 400    # 지원자가 이 인원 이상이면 자동으로 가상화 모드 사용
 
 # ==========================================
 # 2. 데이터 가져오기 및 처리
 # ==========================================
-def fetch_all_data() -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+def _survey_sheets(workbook: Optional[WorkbookSource] = None) -> Iterator[Tuple[Dict[str, Any], List[List[str]]]]:
+    """설문 시트마다 (시트 정보, 행 목록) - 통합 문서를 주면 시트 API 대신 XLSX 에서 읽음"""
+    print("🔄 구글 시트에 연결 중입니다..." if workbook is None else "📗 통합 문서에서 시트를 읽는 중입니다...")
+    
+    # 정규표현식: "진학희망 및 지원유형 조사(3"으로 시작하고 "_Sheet1"으로 끝나는 시트 찾기
+    # 예: 진학희망 및 지원유형 조사(303)_Sheet1
+    target_pattern = re.compile(r"진학희망 및 지원유형 조사\(3\d{2}\)_Sheet1")
+
+    if workbook is not None:
+        return workbook.sheets(target_pattern, columns=SURVEY_COLUMNS, tail_from=RESULT_SCAN_FROM)
+    # 시트 목록은 매니페스트 캐시에서 (없거나 만료 시에만 open_by_url / worksheets 호출)
+    # 모든 gspread 호출은 쿼터 스케줄러를 거침 (gspread / google-auth 는 authorize 시점에 import)
+    client = authorize(KEY_FILE)
+    # COL 과 합불 스캔 범위의 열만 읽음 (행은 원래 열 위치를 유지한 고정 폭)
+    return fetch_target_sheets(client, SHEET_URL, target_pattern, columns=SURVEY_COLUMNS, tail_from=RESULT_SCAN_FROM)
+
+def fetch_survey_sheets(workbook: Optional[WorkbookSource] = None) -> List[Tuple[Dict[str, Any], List[List[str]]]]:
+    """설문 시트를 모두 내려받아 목록으로 반환 (제한 시간 실행의 '수집' 단계, 파싱은 fetch_all_data(sheets=...))"""
+    return list(_survey_sheets(workbook))
+
+def fetch_all_data(checks: Optional[List[Dict[str, Any]]] = None, workbook: Optional[WorkbookSource] = None,
+                   sheets: Optional[List[Tuple[Dict[str, Any], List[List[str]]]]] = None) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
     """
     구글 시트에서 데이터를 가져와 전기고/후기고 지원자 리스트로 분리하여 반환합니다.
+    checks 를 주면 데이터 검증용 레코드(행마다 전형별)를 함께 모읍니다.
+    workbook 을 주면 시트 API 대신 통합 문서(XLSX)에서 같은 시트들을 읽습니다.
+    sheets 를 주면 내려받지 않고 이미 받은 시트 목록(fetch_survey_sheets 결과)을 파싱만 합니다.
     """
-    print("🔄 구글 시트에 연결 중입니다...")
-    
     try:
-        creds = Credentials.from_service_account_file(KEY_FILE, scopes=SCOPES)
-        client = gspread.authorize(creds)
-        doc = client.open_by_url(SHEET_URL)
+        target_sheets = sheets if sheets is not None else _survey_sheets(workbook)
     except Exception as e:
         print(f"❌ 구글 시트 연결 실패: {e}")
         return [], []
     
-    worksheets = doc.worksheets()
-    
-    # 정규표현식: "진학희망 및 지원유형 조사(3"으로 시작하고 "_Sheet1"으로 끝나는 시트 찾기
-    # 예: 진학희망 및 지원유형 조사(303)_Sheet1
-    target_pattern = re.compile(r"진학희망 및 지원유형 조사\(3\d{2}\)_Sheet1")
-    
     early_students = []
     late_students = []
     
-    for sht in worksheets:
-        if target_pattern.search(sht.title):
-            print(f"📑 데이터 수집 중: {sht.title}")
+    for sheet, rows in target_sheets:
+        print(f"📑 데이터 수집 중: {sheet['title']}")
+        
+        # 데이터 유효성 검사 (행 개수 부족 시 패스)
+        if len(rows) < 3: continue
+        METRICS.add('rows_scanned', len(rows) - 2, source='sheets')
+        
+        # 3행(Index 2)부터 학생 데이터 시작
+        for row_no, r in enumerate(rows[2:], start=3):
+            # 이름이 없으면 빈 행으로 간주
+            if not r[COL['NAME']].strip(): continue
+            if checks is not None: checks.extend(survey_checks(sheet['title'], row_no, r))
             
-            # 전체 데이터 가져오기
-            try:
-                rows = sht.get_all_values()
-            except Exception as e:
-                print(f"⚠️ 시트 데이터 읽기 실패 ({sht.title}): {e}")
-                continue
+            # 데이터 파싱 (COL 인덱스 매핑, 행 폭은 읽은 열 기준으로 이미 고정)
+            row = r
             
-            # 데이터 유효성 검사 (행 개수 부족 시 패스)
-            if len(rows) < 3: continue
+            info = {
+                'class': row[COL['CLASS']],
+                'num': row[COL['NUM']],
+                'name': row[COL['NAME']],
+                'gender': row[COL['GENDER']],
+                'result': '',   # 합불 여부 (추후 확장을 위해 비워둠 or 맨 뒤 열 확인)
+                'school': '',
+                'dept': '',     # 학과
+                'type': ''
+            }
             
-            # 3행(Index 2)부터 학생 데이터 시작
-            for r in rows[2:]:
-                # 이름이 없으면 빈 행으로 간주
-                if len(r) < 3 or not r[2].strip(): continue
-                
-                # 데이터 파싱 (CSV 구조 기반 인덱스 매핑)
-                # 0:반, 1:번호, 2:성명, 3:성별
-                # 7:영재, 8:과학, 9:예술, 10:특성화, 11:특성화학과
-                # 12:자사, 13:외고, 14:일반, 15:기타
-                
-                # 안전한 인덱싱을 위해 길이 확장
-                row = r + [''] * (25 - len(r))
-                
-                info = {
-                    'class': row[0],
-                    'num': row[1],
-                    'name': row[2],
-                    'gender': row[3],
-                    'result': '',   # 합불 여부 (추후 확장을 위해 비워둠 or 맨 뒤 열 확인)
-                    'school': '',
-                    'dept': '',     # 학과
-                    'type': ''
-                }
-                
-                # 합불 여부 확인 (맨 뒤쪽 열이나 비고란 활용, 여기서는 예시로 맨 뒤쪽 스캔)
-                # "합격"이라는 단어가 있는 열을 찾음
-                for cell in row[16:]: 
-                    if "합격" in str(cell): info['result'] = "합격"
-                    elif "불합격" in str(cell): info['result'] = "불합격"
-
-                # --- [전기고 판별] ---
-                is_early = False
-                
-                # 1. 영재고 (7)
-                if row[7].strip():
-                    is_early = True; info['type'] = '영재고'; info['school'] = _clean_school_name(row[7], '영재고')
-                # 2. 과학고 (8)
-                elif row[8].strip():
-                    is_early = True; info['type'] = '과학고'; info['school'] = _clean_school_name(row[8], '과학고')
-                # 3. 예술고 (9)
-                elif row[9].strip():
-                    is_early = True; info['type'] = '예술고'; info['school'] = _clean_school_name(row[9], '예술고')
-                # 4. 특성화고 (10)
-                elif row[10].strip():
-                    is_early = True; info['type'] = '특성화고'
-                    info['school'] = _clean_school_name(row[10], '특성화고')
-                    info['dept'] = row[11].strip() # 학과
-                
-                if is_early:
-                    early_students.append(info)
-                    continue # 전기에 속하면 후기는 체크 안 함 (우선순위)
+            # 합불 여부 확인 (맨 뒤쪽 열 스캔, 뒤쪽 열의 최종 결과가 우선)
+            # '불합격'도 '합격'을 포함하므로 판정 함수로 확인 (1차/2차/면접/예비 합격은 최종이 아닌 '진행')
+            for cell in row[RESULT_SCAN_FROM:]:
+                outcome = classify_result(cell)
+                if outcome: info['result'] = outcome
 
-                # --- [후기고 판별] ---
-                is_late = False
-                
-                # 1. 자사고 (12)
-                if row[12].strip():
-                    is_late = True; info['type'] = '자사고'; info['school'] = _clean_school_name(row[12], '자사고')
-                # 2. 외고/국제고 (13)
-                elif row[13].strip():
-                    is_late = True; info['type'] = '외고/국제고'; info['school'] = _clean_school_name(row[13], '외고/국제고')
-                # 3. 일반고 (14) - 보통 일반고는 명단 안 만들지만 데이터 있으면 수집
-                elif row[14].strip():
-                    is_late = True; info['type'] = '일반고'; info['school'] = _clean_school_name(row[14], '일반고')
-                # 4. 기타/대안 (15)
-                elif row[15].strip():
-                    is_late = True; info['type'] = '대안/기타'; info['school'] = _clean_school_name(row[15], '대안학교')
+            # --- [전기고 판별] ---
+            is_early = False
+            
+            # 1. 영재고 (H)
+            if row[COL['GIFTED']].strip():
+                is_early = True; info['type'] = '영재고'; info['school'] = _clean_school_name(row[COL['GIFTED']], '영재고')
+            # 2. 과학고 (I)
+            elif row[COL['SCIENCE']].strip():
+                is_early = True; info['type'] = '과학고'; info['school'] = _clean_school_name(row[COL['SCIENCE']], '과학고')
+            # 3. 예술고 (J)
+            elif row[COL['ARTS']].strip():
+                is_early = True; info['type'] = '예술고'; info['school'] = _clean_school_name(row[COL['ARTS']], '예술고')
+            # 4. 특성화고 (K)
+            elif row[COL['MEISTER']].strip():
+                is_early = True; info['type'] = '특성화고'
+                info['school'] = _clean_school_name(row[COL['MEISTER']], '특성화고')
+                info['dept'] = row[COL['DEPT']].strip() # 학과
+            
+            if is_early:
+                early_students.append(info)
+                continue # 전기에 속하면 후기는 체크 안 함 (우선순위)
+
+            # --- [후기고 판별] ---
+            is_late = False
+            
+            # 1. 자사고 (M)
+            if row[COL['JASA']].strip():
+                is_late = True; info['type'] = '자사고'; info['school'] = _clean_school_name(row[COL['JASA']], '자사고')
+            # 2. 외고/국제고 (N)
+            elif row[COL['FOREIGN']].strip():
+                is_late = True; info['type'] = '외고/국제고'; info['school'] = _clean_school_name(row[COL['FOREIGN']], '외고/국제고')
+            # 3. 일반고 (O) - 보통 일반고는 명단 안 만들지만 데이터 있으면 수집
+            elif row[COL['GENERAL']].strip():
+                is_late = True; info['type'] = '일반고'; info['school'] = _clean_school_name(row[COL['GENERAL']], '일반고')
+            # 4. 기타/대안 (P)
+            elif row[COL['ETC']].strip():
+                is_late = True; info['type'] = '대안/기타'; info['school'] = _clean_school_name(row[COL['ETC']], '대안학교')
+            
+            if is_late:
+                late_students.append(info)
                 
-                if is_late:
-                    late_students.append(info)
-                    
     return early_students, late_students
 
+def compute_stats(student_list: List[Dict[str, Any]]) -> ReportStats:
+    """반 × 유형 × 성별 × 학교 × 합불 집계 (pandas 없이 한 번 순회)"""
+    records = (
+        {'class': s['class'], 'group': s['type'], 'gender': s['gender'], 'school': s['school'], 'status': s['result']}
+        for s in student_list
+    )
+    return ReportStats.from_records(records, vectorized=False)
+
 def _clean_school_name(text: str, default_type: str) -> str:
     """'O'나 '○'만 있으면 기본 유형명을, 텍스트가 있으면 텍스트를 반환"""
     text = text.strip()
@@ -142,36 +189,42 @@ def _clean_school_name(text: str, default_type: str) -> str:
         return default_type
     return text
 
+def canonicalize_schools(*student_lists: List[Dict[str, Any]]) -> None:
+    """표기만 다른 학교명('하나고등학교', '하나고(자사)' 등)을 표준 이름으로 통일 (전기/후기 명단 공통 매핑)"""
+    students = [s for lst in student_lists for s in lst]
+    resolver = get_resolver()
+    mapping = resolver.resolve_all(s['school'] for s in students)
+    for s in students:
+        s['school'] = mapping.get(s['school'], s['school'])
+    resolver.save()
+
 # ==========================================
 # 3. HTML 생성 (카드형 대시보드)
 # ==========================================
-def generate_html(student_list: List[Dict[str, Any]], title: str, filename: str) -> None:
-    cards_html = ""
-    
-    # 통계 계산
-    total_count = len(student_list)
-    pass_count = sum(1 for s in student_list if s['result'] == '합격')
+def _card_html(s: Dict[str, Any], card_id: str) -> str:
+    """학생 카드 한 장 (정적 리포트와 실시간 변경분이 같은 HTML 사용)"""
+    # 디자인 요소 결정
+    gender_color = "text-blue-600 bg-blue-50" if s['gender'] == '남' else "text-red-600 bg-red-50"
     
-    for s in student_list:
-        # 디자인 요소 결정
-        gender_color = "text-blue-600 bg-blue-50" if s['gender'] == '남' else "text-red-600 bg-red-50"
-        
-        # 상태 뱃지 (합격/불합격/지원중)
-        if s['result'] == '합격':
-            status_badge = '<span class="px-2 py-1 rounded bg-green-100 text-green-700 text-xs font-bold">🎉 합격</span>'
-            card_border = "border-green-400 ring-2 ring-green-100"
-        elif s['result'] == '불합격':
-            status_badge = '<span class="px-2 py-1 rounded bg-gray-200 text-gray-600 text-xs font-bold">불합격</span>'
-            card_border = "border-gray-200 opacity-70"
-        else:
-            status_badge = '<span class="px-2 py-1 rounded bg-indigo-50 text-indigo-600 text-xs font-bold">지원중</span>'
-            card_border = "border-gray-200 hover:border-indigo-300 hover:shadow-lg"
+    # 상태 뱃지 (합격/진행/불합격/지원중)
+    if s['result'] == '합격':
+        status_badge = '<span class="px-2 py-1 rounded bg-green-100 text-green-700 text-xs font-bold">🎉 합격</span>'
+        card_border = "border-green-400 ring-2 ring-green-100"
+    elif s['result'] == '진행':
+        status_badge = '<span class="px-2 py-1 rounded bg-amber-50 text-amber-700 text-xs font-bold">⏳ 진행</span>'
+        card_border = "border-amber-200 hover:border-amber-300 hover:shadow-lg"
+    elif s['result'] == '불합격':
+        status_badge = '<span class="px-2 py-1 rounded bg-gray-200 text-gray-600 text-xs font-bold">불합격</span>'
+        card_border = "border-gray-200 opacity-70"
+    else:
+        status_badge = '<span class="px-2 py-1 rounded bg-indigo-50 text-indigo-600 text-xs font-bold">지원중</span>'
+        card_border = "border-gray-200 hover:border-indigo-300 hover:shadow-lg"
 
-        # 학과 표시 (있으면)
-        dept_html = f'<div class="text-xs text-gray-500 mt-1">📌 {s["dept"]}</div>' if s['dept'] else ''
-        
-        card = f"""
-        <div class="bg-white rounded-xl p-5 border {card_border} transition-all duration-300 shadow-sm flex flex-col justify-between">
+    # 학과 표시 (있으면)
+    dept_html = f'<div class="text-xs text-gray-500 mt-1">📌 {s["dept"]}</div>' if s['dept'] else ''
+    
+    return f"""
+        <div id="{card_id}" class="bg-white rounded-xl p-5 border {card_border} transition-all duration-300 shadow-sm flex flex-col justify-between">
             <div>
                 <div class="flex justify-between items-start mb-3">
                     <div class="flex flex-col">
@@ -193,10 +246,19 @@ def generate_html(student_list: List[Dict[str, Any]], title: str, filename: str)
             </div>
         </div>
         """
-        cards_html += card
 
-    # 전체 HTML 템플릿
-    full_html = f"""
+def _summary_html(stats: ReportStats) -> str:
+    """머리글 통계 (총 지원 / 합격 인원)"""
+    total_count = stats.total()
+    pass_count = stats.total(status='합격')
+    return f"""
+                        총 <span class="text-indigo-600 font-bold">{total_count}</span>명 지원 
+                        {' | <span class="text-green-600 font-bold">🎉 ' + str(pass_count) + '명 합격</span>' if pass_count > 0 else ''}
+                    """
+
+def _page_html(title: str, cards_html: str, summary_html: str, updated: str) -> str:
+    # 전체 HTML 템플릿 (summary / updated / cards 는 실시간 모드에서 제자리 갱신되는 영역)
+    return f"""
     <!DOCTYPE html>
     <html lang="ko">
     <head>
@@ -207,11 +269,113 @@ def generate_html(student_list: List[Dict[str, Any]], title: str, filename: str)
         <link rel="stylesheet" as="style" crossorigin href="https://cdn.jsdelivr.net/gh/orioncactus/pretendard@v1.3.9/dist/web/static/pretendard.min.css" />
         <style>
             body {{ font-family: "Pretendard Variable", Pretendard, -apple-system, BlinkMacSystemFont, system-ui, Roboto, sans-serif; }}
+            [id]:target {{ outline: 3px solid #f59e0b; outline-offset: 2px; }} /* 통합 검색에서 이동한 카드 */
         </style>
     </head>
     <body class="bg-slate-50 min-h-screen p-6 md:p-12">
         <div class="max-w-7xl mx-auto">
             <header class="mb-10 flex flex-col md:flex-row md:items-end justify-between gap-4">
+                <div>
+                    <h1 class="text-3xl md:text-4xl font-black text-slate-800 mb-2">{title}</h1>
+                    <p id="summary" class="text-slate-500 font-medium">{summary_html}</p>
+                </div>
+                <div id="updated" class="text-right text-xs text-gray-400">{updated}</div>
+            </header>
+
+            <div id="cards" class="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-4 gap-6">
+                {cards_html}
+            </div>
+            
+            <footer class="mt-12 text-center text-gray-400 text-sm">
+                2025학년도 목일중학교 진학현황 대시보드
+            </footer>
+        </div>
+    </body>
+    </html>
+    """
+
+def generate_html(student_list: List[Dict[str, Any]], title: str, filename: str, stats: Optional[ReportStats] = None) -> None:
+    # 통계 (집계 엔진 결과 공유)
+    stats = stats or compute_stats(student_list)
+    cards_html = "".join(_card_html(s, f"s{i}") for i, s in enumerate(student_list))
+    updated = f"업데이트: {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+    full_html = _page_html(title, cards_html, _summary_html(stats), updated)
+    
+    status = write_text(filename, full_html)
+    print(f"✅ 파일 생성 완료: {filename}{status_note(status)}")
+
+# ==========================================
+# 3-1. HTML 생성 (가상화 카드 그리드 - 대규모 데이터용)
+# ==========================================
+# 청크 행 필드 순서: 반, 번호, 이름, 성별, 유형, 학교, 학과, 합불코드
+RESULT_CODES = {'': 0, '합격': 1, '불합격': 2, '진행': 3}
+
+def _write_card_chunks(student_list: List[Dict[str, Any]], data_dir: str, chunk_size: int) -> List[str]:
+    """
+    학생 목록을 청크 단위의 압축 JSON으로 나누어 저장하고 파일명 목록을 반환합니다.
+    file:// 로 열어도 동작하도록 JSON 문자열을 cardChunk() 호출로 감싼 .js 파일로 기록합니다.
+    """
+    chunk_files = []
+    for c_idx, start in enumerate(range(0, len(student_list), chunk_size)):
+        rows = [
+            [s['class'], s['num'], s['name'], s['gender'], s['type'], s['school'], s['dept'], RESULT_CODES.get(s['result'], 0)]
+            for s in student_list[start:start + chunk_size]
+        ]
+        payload = json.dumps(rows, ensure_ascii=False, separators=(',', ':'))
+        chunk_name = f"chunk_{c_idx:04d}.js"
+        # 내용이 같은 청크는 그대로 두어 동기화/백업 대상에서 빠지도록 함
+        write_text(os.path.join(data_dir, chunk_name), f"cardChunk({c_idx},{json.dumps(payload, ensure_ascii=False)});")
+        chunk_files.append(chunk_name)
+
+    # 이전 실행에서 남은 청크 정리 (학생 수가 줄어든 경우)
+    for old in os.listdir(data_dir):
+        if old.startswith('chunk_') and old.endswith('.js') and old not in chunk_files:
+            os.remove(os.path.join(data_dir, old))
+    return chunk_files
+
+def generate_virtual_html(student_list: List[Dict[str, Any]], title: str, filename: str, stats: Optional[ReportStats] = None,
+                          chunk_size: int = VIRTUAL_CHUNK_SIZE) -> None:
+    """
+    카드 데이터를 청크 파일로 분리하고, 화면에 보이는 카드만 그리는 가벼운 페이지를 생성합니다.
+    페이지 크기는 학생 수와 무관하게 일정하며, 청크는 스크롤/검색 시점에 필요한 만큼만 불러옵니다.
+    """
+    base = os.path.splitext(os.path.basename(filename))[0]
+    data_dir_name = f"{base}_data"
+    data_dir = os.path.join(os.path.dirname(filename), data_dir_name)
+
+    chunk_files = _write_card_chunks(student_list, data_dir, chunk_size)
+
+    stats = stats or compute_stats(student_list)
+    total_count = stats.total()
+    pass_count = stats.total(status='합격')
+    types = sorted(t for t in stats.by('group') if t)
+
+    manifest = {
+        'total': total_count,
+        'chunkSize': chunk_size,
+        'chunks': [f"{data_dir_name}/{c}" for c in chunk_files],
+    }
+    type_options = "".join(f'<option value="{t}">{t}</option>' for t in types)
+
+    full_html = f"""
+    <!DOCTYPE html>
+    <html lang="ko">
+    <head>
+        <meta charset="UTF-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <title>{title}</title>
+        <script src="https://cdn.tailwindcss.com"></script>
+        <link rel="stylesheet" as="style" crossorigin href="https://cdn.jsdelivr.net/gh/orioncactus/pretendard@v1.3.9/dist/web/static/pretendard.min.css" />
+        <style>
+            body {{ font-family: "Pretendard Variable", Pretendard, -apple-system, BlinkMacSystemFont, system-ui, Roboto, sans-serif; }}
+            #viewport {{ position: relative; }}
+            #window {{ position: absolute; left: 0; right: 0; }}
+            .card {{ height: 200px; overflow: hidden; }}
+        </style>
+    </head>
+    <body class="bg-slate-50 min-h-screen p-6 md:p-12">
+        <div class="max-w-7xl mx-auto">
+            <header class="mb-6 flex flex-col md:flex-row md:items-end justify-between gap-4">
                 <div>
                     <h1 class="text-3xl md:text-4xl font-black text-slate-800 mb-2">{title}</h1>
                     <p class="text-slate-500 font-medium">
@@ -224,37 +388,352 @@ def generate_html(student_list: List[Dict[str, Any]], title: str, filename: str)
                 </div>
             </header>
 
-            <div class="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-4 gap-6">
-                {cards_html}
+            <div class="mb-6 flex flex-wrap gap-3 items-center">
+                <input id="q" type="text" placeholder="이름 / 학교 / 학과 검색" class="px-3 py-2 rounded-lg border border-gray-300 text-sm w-64">
+                <select id="type" class="px-3 py-2 rounded-lg border border-gray-300 text-sm"><option value="">전체 유형</option>{type_options}</select>
+                <select id="result" class="px-3 py-2 rounded-lg border border-gray-300 text-sm">
+                    <option value="">전체 상태</option><option value="1">합격</option><option value="3">진행</option><option value="2">불합격</option><option value="0">지원중</option>
+                </select>
+                <span id="status" class="text-xs text-gray-400"></span>
             </div>
+
+            <div id="viewport"><div id="window" class="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-4 gap-6"></div></div>
             
             <footer class="mt-12 text-center text-gray-400 text-sm">
                 2025학년도 목일중학교 진학현황 대시보드
             </footer>
         </div>
+
+        <script>
+        const MANIFEST = {json.dumps(manifest, ensure_ascii=False)};
+        const ROW_HEIGHT = 224;      // 카드 높이(200) + gap(24)
+        const OVERSCAN = 3;          // 화면 위아래로 미리 그려둘 행 수
+        const MAX_DECODED = 8;       // 동시에 디코딩해 둘 청크 수 (메모리 상한)
+
+        const raw = {{}};            // 청크 번호 -> 압축 JSON 문자열
+        const decoded = new Map();   // 청크 번호 -> 디코딩된 행 배열 (LRU)
+        const pending = {{}};        // 청크 번호 -> 로딩 Promise
+        let view = null;             // 필터 적용 시 전역 인덱스 배열, 미적용 시 null
+
+        window.cardChunk = (idx, payload) => {{ raw[idx] = payload; }};
+
+        function loadChunk(idx) {{
+            if (raw[idx] !== undefined) return Promise.resolve();
+            if (!pending[idx]) {{
+                pending[idx] = new Promise((resolve, reject) => {{
+                    const tag = document.createElement('script');
+                    tag.src = MANIFEST.chunks[idx];
+                    tag.onload = () => {{ tag.remove(); resolve(); }};
+                    tag.onerror = reject;
+                    document.head.appendChild(tag);
+                }});
+            }}
+            return pending[idx];
+        }}
+
+        function rowsOf(idx) {{
+            if (decoded.has(idx)) {{
+                const rows = decoded.get(idx);
+                decoded.delete(idx); decoded.set(idx, rows);
+                return rows;
+            }}
+            if (raw[idx] === undefined) return null;
+            const rows = JSON.parse(raw[idx]);
+            decoded.set(idx, rows);
+            if (decoded.size > MAX_DECODED) decoded.delete(decoded.keys().next().value);
+            return rows;
+        }}
+
+        function studentAt(globalIdx) {{
+            const rows = rowsOf(Math.floor(globalIdx / MANIFEST.chunkSize));
+            return rows ? rows[globalIdx % MANIFEST.chunkSize] : null;
+        }}
+
+        const esc = (v) => String(v).replace(/[&<>"]/g, (c) => ({{'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'}})[c]);
+
+        // 통합 검색 포털에서 #s<번호> 로 들어온 카드 (가상화로 나중에 그려지므로 :target 대신 직접 강조)
+        const jump = /^#s(\d+)$/.exec(location.hash);
+        const TARGET = jump ? Number(jump[1]) : -1;
+
+        function cardHtml(s, g) {{
+            if (!s) return '<div class="card bg-white rounded-xl border border-gray-100 animate-pulse"></div>';
+            const [cls, num, name, gender, type, school, dept, result] = s;
+            const genderColor = gender === '남' ? 'text-blue-600 bg-blue-50' : 'text-red-600 bg-red-50';
+            let badge, border;
+            if (result === 1) {{
+                badge = '<span class="px-2 py-1 rounded bg-green-100 text-green-700 text-xs font-bold">🎉 합격</span>';
+                border = 'border-green-400 ring-2 ring-green-100';
+            }} else if (result === 3) {{
+                badge = '<span class="px-2 py-1 rounded bg-amber-50 text-amber-700 text-xs font-bold">⏳ 진행</span>';
+                border = 'border-amber-200 hover:border-amber-300 hover:shadow-lg';
+            }} else if (result === 2) {{
+                badge = '<span class="px-2 py-1 rounded bg-gray-200 text-gray-600 text-xs font-bold">불합격</span>';
+                border = 'border-gray-200 opacity-70';
+            }} else {{
+                badge = '<span class="px-2 py-1 rounded bg-indigo-50 text-indigo-600 text-xs font-bold">지원중</span>';
+                border = 'border-gray-200 hover:border-indigo-300 hover:shadow-lg';
+            }}
+            if (g === TARGET) border += ' outline outline-4 outline-amber-400';
+            const deptHtml = dept ? `<div class="text-xs text-gray-500 mt-1">📌 ${{esc(dept)}}</div>` : '';
+            return `<div id="s${{g}}" class="card bg-white rounded-xl p-5 border ${{border}} transition-all duration-300 shadow-sm flex flex-col justify-between">
+                <div>
+                    <div class="flex justify-between items-start mb-3">
+                        <div class="flex flex-col">
+                            <span class="text-xs font-bold text-gray-400 mb-1">${{esc(cls)}}반 ${{esc(num)}}번</span>
+                            <h3 class="text-lg font-extrabold text-gray-800">${{esc(name)}}</h3>
+                        </div>
+                        <span class="px-2 py-1 rounded text-xs font-bold ${{genderColor}}">${{esc(gender)}}</span>
+                    </div>
+                    <div class="mb-4">
+                        <span class="inline-block px-2 py-0.5 rounded text-xs font-medium bg-gray-100 text-gray-600 mb-2">${{esc(type)}}</span>
+                        <div class="text-gray-900 font-bold text-md leading-tight">${{esc(school)}}</div>
+                        ${{deptHtml}}
+                    </div>
+                </div>
+                <div class="pt-3 border-t border-gray-100 flex justify-between items-center">${{badge}}</div>
+            </div>`;
+        }}
+
+        const viewportEl = document.getElementById('viewport');
+        const windowEl = document.getElementById('window');
+        const statusEl = document.getElementById('status');
+
+        function columns() {{
+            const w = window.innerWidth;
+            return w >= 1024 ? 4 : (w >= 640 ? 2 : 1);
+        }}
+
+        function count() {{ return view ? view.length : MANIFEST.total; }}
+
+        function render() {{
+            const cols = columns();
+            const totalRows = Math.ceil(count() / cols);
+            viewportEl.style.height = (totalRows * ROW_HEIGHT) + 'px';
+
+            const top = viewportEl.getBoundingClientRect().top;
+            const firstRow = Math.max(0, Math.floor(-top / ROW_HEIGHT) - OVERSCAN);
+            const lastRow = Math.min(totalRows, Math.ceil((window.innerHeight - top) / ROW_HEIGHT) + OVERSCAN);
+
+            const start = firstRow * cols;
+            const end = Math.min(count(), lastRow * cols);
+            const missing = new Set();
+            let html = '';
+            for (let i = start; i < end; i++) {{
+                const g = view ? view[i] : i;
+                const s = studentAt(g);
+                if (!s) missing.add(Math.floor(g / MANIFEST.chunkSize));
+                html += cardHtml(s, g);
+            }}
+            windowEl.style.top = (firstRow * ROW_HEIGHT) + 'px';
+            windowEl.innerHTML = html;
+            missing.forEach((idx) => loadChunk(idx).then(scheduleRender));
+        }}
+
+        let frame = 0;
+        function scheduleRender() {{
+            if (frame) return;
+            frame = requestAnimationFrame(() => {{ frame = 0; render(); }});
+        }}
+
+        // 필터: 청크를 순서대로 불러오며 일치하는 전역 인덱스만 모음 (디코딩한 청크는 LRU로 정리)
+        let filterToken = 0;
+        async function applyFilter() {{
+            const token = ++filterToken;
+            const q = document.getElementById('q').value.trim().toLowerCase();
+            const type = document.getElementById('type').value;
+            const result = document.getElementById('result').value;
+            if (!q && !type && result === '') {{
+                view = null; statusEl.textContent = ''; scheduleRender();
+                return;
+            }}
+            const matched = [];
+            view = matched;
+            for (let c = 0; c < MANIFEST.chunks.length; c++) {{
+                await loadChunk(c);
+                if (token !== filterToken) return;
+                const rows = rowsOf(c);
+                rows.forEach((s, j) => {{
+                    if (type && s[4] !== type) return;
+                    if (result !== '' && s[7] !== Number(result)) return;
+                    if (q && !(s[2] + ' ' + s[5] + ' ' + s[6]).toLowerCase().includes(q)) return;
+                    matched.push(c * MANIFEST.chunkSize + j);
+                }});
+                statusEl.textContent = `검색 중... ${{matched.length}}명 (${{c + 1}}/${{MANIFEST.chunks.length}})`;
+                scheduleRender();
+            }}
+            statusEl.textContent = `${{matched.length}}명 표시`;
+        }}
+
+        let debounce = 0;
+        ['q', 'type', 'result'].forEach((id) => document.getElementById(id).addEventListener('input', () => {{
+            clearTimeout(debounce); debounce = setTimeout(applyFilter, 150);
+        }}));
+        window.addEventListener('scroll', scheduleRender, {{ passive: true }});
+        window.addEventListener('resize', scheduleRender);
+        if (TARGET >= 0) {{
+            const row = Math.floor(TARGET / columns());
+            window.scrollTo(0, viewportEl.getBoundingClientRect().top + window.scrollY + row * ROW_HEIGHT - 80);
+        }}
+        render();
+        </script>
     </body>
     </html>
     """
-    
-    with open(filename, 'w', encoding='utf-8') as f:
-        f.write(full_html)
-    print(f"✅ 파일 생성 완료: {filename}")
+
+    status = write_text(filename, full_html)
+    print(f"✅ 파일 생성 완료: {filename}{status_note(status)} (청크 {len(chunk_files)}개 → {data_dir})")
+
+def save_results_cube(student_list: List[Dict[str, Any]], title: str) -> None:
+    """지원자 전체(합격/불합격/지원중)를 연도 × 반 × 유형 × 성별 × 상태 큐브로 누적 저장하고 합격률 리포트 생성"""
+    year = year_from_title(title)
+    records = [{'year': year, 'class': s['class'], 'group': s['type'], 'gender': s['gender'], 'status': s['result'] or '지원중'}
+               for s in student_list]
+    path = cube_path(OUTPUT_DIR, 'generate_dashboard')
+    cube, status = update_cube(path, records)
+    print(f"🧊 결과 큐브 저장: {path} (연도 {', '.join(cube.axes['year'])}){status_note(status)}")
+    render_cube_html(cube, "목일중 지원 현황 통계 (반 · 유형 · 성별 · 연도)", OUTPUT_CUBE_HTML, year=year)
+
+def save_dashboard_search(student_list: List[Dict[str, Any]], title: str, filename: str) -> None:
+    """통합 검색용 부분 색인 (anchor s<번호> 는 정적/가상화 카드 id 와 같음)"""
+    key = 'dashboard_' + ('early' if filename == OUTPUT_EARLY_HTML else 'late')
+    docs = [{'anchor': f"s{i}", 'name': s['name'], 'class': f"{s['class']}반 {s['num']}번", 'group': s['type'],
+             'school': s['school'], 'dept': s['dept'], 'status': s['result'] or '지원중'}
+            for i, s in enumerate(student_list)]
+    save_search_partial(OUTPUT_DIR, key, title, os.path.relpath(filename, OUTPUT_DIR), docs)
+
+def render_dashboard(student_list: List[Dict[str, Any]], title: str, filename: str, virtual: Any = 'auto') -> None:
+    """virtual='auto'면 지원자 수가 VIRTUAL_THRESHOLD 이상일 때 가상화 모드로 생성합니다."""
+    if virtual == 'auto':
+        virtual = len(student_list) >= VIRTUAL_THRESHOLD
+    stats = compute_stats(student_list)
+    if virtual:
+        generate_virtual_html(student_list, title, filename, stats)
+    else:
+        generate_html(student_list, title, filename, stats)
+    save_dashboard_search(student_list, title, filename)
+
+# ==========================================
+# 3-2. 실시간 모드 (SSE 로 바뀐 카드만 전송)
+# ==========================================
+EARLY_TITLE = "2025학년도 전기고 지원 현황"
+LATE_TITLE = "2025학년도 후기고 지원 현황"
+
+def publish_dashboard(channel: LiveChannel, student_list: List[Dict[str, Any]], title: str) -> Optional[Dict[str, Any]]:
+    """카드 id 를 반/번호/이름으로 고정해 두고 채널에 새 상태를 넘김 (바뀐 카드와 머리글 통계만 페이지로 전송)"""
+    card_ids = unique_ids('c', [(s['class'], s['num'], s['name']) for s in student_list])
+    cards = [(card_id, _card_html(s, card_id)) for card_id, s in zip(card_ids, student_list)]
+    summary = _summary_html(compute_stats(student_list))
+    updated = f"업데이트: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+    page = _page_html(title, "".join(html for _, html in cards), summary, updated)
+    return channel.publish(page, {'cards': cards}, {'summary': summary, 'updated': updated}, stamps=('updated',))
+
+def refresh_live(hub: LiveHub) -> None:
+    """시트를 다시 읽어 전기/후기 채널에 반영 (스케줄러는 진행 중인 중복 요청만 합치므로 매번 새 값을 받음)"""
+    early_list, late_list = fetch_all_data()
+    if not (early_list or late_list):
+        print("⚠️ 가져온 지원자가 없어 이번 갱신은 건너뜁니다. (연결 실패 시 화면 유지)")
+        return
+    canonicalize_schools(early_list, late_list)
+    for name, title, student_list in (('early', EARLY_TITLE, early_list), ('late', LATE_TITLE, late_list)):
+        delta = publish_dashboard(hub.channel(name, title), student_list, title)
+        print(f"🔁 {title}: {describe_delta(delta)}")
 
 # ==========================================
 # 4. 실행
 # ==========================================
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="전기고/후기고 카드형 대시보드 생성기")
+    render_mode = parser.add_mutually_exclusive_group()
+    render_mode.add_argument('--virtual', dest='virtual', action='store_const', const=True, default='auto',
+                             help="카드 데이터를 JSON 청크로 분리하고 가상화된 그리드로 렌더링")
+    render_mode.add_argument('--static', dest='virtual', action='store_const', const=False,
+                             help="모든 카드를 정적 DOM으로 렌더링 (기존 방식)")
+    parser.add_argument('--no-cube', action='store_true', help="결과 큐브(.npz)와 통계 큐브 리포트 생략")
+    parser.add_argument('--no-validate', action='store_true',
+                        help="데이터 검증(중복/전기·후기 충돌/반 값/합불 모순) 생략")
+    parser.add_argument('--compact', action='store_true',
+                        help="HTML 축소 (반복 class 목록을 짧은 클래스로 합치고 공백/주석 제거)")
+    parser.add_argument('--gzip', action='store_true', help="HTML 옆에 미리 압축한 .html.gz 사본도 기록")
+    parser.add_argument('--workbook', nargs='?', const=workbook_url(SHEET_URL), default=None, metavar='PATH_OR_URL',
+                        help="시트 API 대신 스프레드시트 전체 XLSX 한 파일에서 읽기 (값 없이 쓰면 내려받아 .cache/workbooks 에 저장, 경로를 주면 오프라인)")
+    parser.add_argument('--budget', type=float, default=None, metavar='SECONDS',
+                        help="실행 전체 제한 시간(초). 수집/파싱이 넘으면 마지막 성공 데이터로 만들고 '최신 데이터 아님' 표시")
+    parser.add_argument('--stage-budget', type=stage_budget, nargs='+', default=[], metavar='STAGE=SECONDS',
+                        help="단계별 제한 시간 (예: fetch=20 parse=5 render=10)")
+    parser.add_argument('--live', nargs='?', type=int, const=DEFAULT_LIVE_PORT, default=None, metavar='PORT',
+                        help=f"파일 대신 실시간 서버 실행 (바뀐 카드만 SSE 로 전송, 기본 포트 {DEFAULT_LIVE_PORT})")
+    parser.add_argument('--interval', type=float, default=DEFAULT_POLL_SECONDS,
+                        help=f"실시간 모드에서 시트를 다시 읽는 간격(초, 기본 {DEFAULT_POLL_SECONDS})")
+    args = parser.parse_args()
+    enable_compact(args.compact, args.gzip)
+
+    if args.live is not None:
+        hub = LiveHub()
+        serve_live(hub, functools.partial(refresh_live, hub), port=args.live, interval=args.interval)
+        raise SystemExit(0)
+
     if not os.path.exists(OUTPUT_DIR):
         os.makedirs(OUTPUT_DIR)
-        
-    early_list, late_list = fetch_all_data()
-    
-    if early_list:
-        generate_html(early_list, "2025학년도 전기고 지원 현황", OUTPUT_EARLY_HTML)
-    else:
-        print("⚠️ 전기고 지원자가 없습니다.")
 
-    if late_list:
-        generate_html(late_list, "2025학년도 후기고 지원 현황", OUTPUT_LATE_HTML)
-    else:
-        print("⚠️ 후기고 지원자가 없습니다.")
\ No newline at end of file
+    # 수집 → 파싱 → 렌더링을 단계별 제한 시간 안에서 실행 (제한이 없으면 그대로 호출)
+    budget = RunBudget(args.budget, dict(args.stage_budget))
+
+    def parse(sheets: List[Tuple[Dict[str, Any], List[List[str]]]]) -> Dict[str, Any]:
+        checks: Optional[List[Dict[str, Any]]] = None if args.no_validate else []
+        early, late = fetch_all_data(checks, sheets=sheets)
+        return {'early': early, 'late': late, 'checks': checks}
+
+    def fetch() -> List[Tuple[Dict[str, Any], List[List[str]]]]:
+        try:
+            with METRICS.timer('fetch_seconds', source='sheets'):
+                return fetch_survey_sheets(open_workbook(args.workbook) if args.workbook else None)
+        except Exception as e:
+            raise SourceUnavailable(f"구글 시트 연결 실패: {e}") from e
+
+    try:
+        data = fetch_and_parse(budget, 'generate_dashboard', fetch, parse)
+    except SourceUnavailable as e:
+        # 제한 시간 없는 실행: 연결/인증 실패를 알리고 빈 데이터로 계속 (제한 시간 실행은 last-good 으로 대체됨)
+        print(f"❌ {e}")
+        data = {'early': [], 'late': [], 'checks': None if args.no_validate else []}
+    if data is None: raise SystemExit(1)
+    early_list, late_list, checks = data['early'], data['late'], data['checks']
+
+    def render() -> None:
+        if checks is not None:
+            # 대시보드는 pandas 를 쓰지 않으므로 dict 순회 경로로 검증
+            run_validation(checks, OUTPUT_DIR, vectorized=False)
+        canonicalize_schools(early_list, late_list)
+        for report, student_list in (('early', early_list), ('late', late_list)):
+            for type_name, n in Counter(s['type'] for s in student_list).items():
+                METRICS.set('students', n, report=report, group=type_name)
+
+        if early_list:
+            with METRICS.timer('render_seconds', report='early', stage='dashboard'):
+                render_dashboard(early_list, EARLY_TITLE, OUTPUT_EARLY_HTML, args.virtual)
+        else:
+            print("⚠️ 전기고 지원자가 없습니다.")
+
+        if late_list:
+            with METRICS.timer('render_seconds', report='late', stage='dashboard'):
+                render_dashboard(late_list, LATE_TITLE, OUTPUT_LATE_HTML, args.virtual)
+        else:
+            print("⚠️ 후기고 지원자가 없습니다.")
+
+        if not args.no_cube and (early_list or late_list):
+            with METRICS.timer('render_seconds', report='all', stage='cube'):
+                save_results_cube(early_list + late_list, "2025학년도 지원 현황")
+
+        save_portal(OUTPUT_DIR)
+
+    try:
+        budget.run('render', render)
+    except BudgetExceeded as e:
+        print(f"❌ {e} - 아직 기록하지 못한 리포트는 이전 파일이 그대로 남습니다.")
+    report_compaction()
+    save_run_manifest(OUTPUT_DIR)
+    record_scheduler(get_scheduler(), TRANSFER_STATS)
+    record_manifest(get_manifest())
+    record_resolver(get_resolver())
+    save_run_metrics(OUTPUT_DIR)
+    if budget.render_overrun: raise SystemExit(1)
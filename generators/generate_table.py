@@ -1,9 +1,22 @@
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
-import pandas as pd
 import re
 import os
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import functools
 from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sheets_client import authorize, get_scheduler, TRANSFER_STATS
+from sheet_manifest import fetch_target_sheets, get_manifest
+from output_writer import write_text, status_note, save_run_manifest
+from search_index import save_search_partial, save_portal
+from data_validation import survey_checks, run_validation
+from html_compact import enable_compact, report_compaction
+from workbook_source import WorkbookSource, open_workbook, workbook_url
+from run_budget import RunBudget, BudgetExceeded, fetch_and_parse, stage_budget
+from live_server import LiveHub, unique_ids, describe_delta, serve_live, DEFAULT_LIVE_PORT, DEFAULT_POLL_SECONDS
+from run_metrics import METRICS, record_scheduler, record_manifest, save_run_metrics
+from fragment_cache import FragmentCache, template_version
 
 # ==========================================
 # 1. 설정 정보
@@ -11,8 +24,12 @@ from datetime import datetime
 KEY_FILE = 'service_key.json'
 SHEET_URL = 'https://docs.google.com/spreadsheets/d/1I_Cy5TZEnG0GmoThLPJJR7ZrXxUgXzsDDzu2zOtmjQI/edit?gid=294818561#gid=294818561'
 
-# 컬럼 인덱스 (A=0 기준)
+# 컬럼 인덱스 (A=0 기준) - 시트에서는 이 열들만 읽음 (A:D, H:P, U:W)
 COL = {
+    'CLASS': 0,        # A: 반
+    'NUM': 1,          # B: 번호
+    'NAME': 2,         # C: 성명
+    'GENDER': 3,       # D: 성별
     'GIFTED': 7,       # H: 영재고
     'SCIENCE': 8,      # I: 과학고
     'ARTS': 9,         # J: 예술고
@@ -27,117 +44,169 @@ COL = {
     'RES_LATE': 22     # W: 후기고 합불
 }
 
-def get_data_with_waterfall():
+# 명단 표 열 (머리글, 너비 class) - 학과 열은 특성화고 표에만
+TABLE_HEADERS = [('No', 'w-8 '), ('반', 'w-10 '), ('이름', 'w-16 '), ('성별', 'w-10 '), ('지원학교', ''), ('학과', 'w-24 '), ('진행상황', 'w-24 ')]
+# 그룹 id → 학생 목록 (전기: gifted/science/arts/meister, 후기: jasa/foreign/etc)
+GroupReport = Dict[str, List[Dict[str, Any]]]
+
+def parse_sheet(title: str, rows: List[List[str]], with_checks: bool = False) -> Tuple[GroupReport, GroupReport, List[Dict[str, Any]]]:
+    # 설문 시트 한 장 → (전기 부분 리포트, 후기 부분 리포트, 검증 레코드)
+    # 프로세스 풀 작업자에서도 돌 수 있도록 모듈 최상위 함수 + 순수 함수 (공유 상태 없음)
+    early_report: GroupReport = {'gifted': [], 'science': [], 'arts': [], 'meister': []}
+    late_report: GroupReport = {'jasa': [], 'foreign': [], 'etc': []}
+    checks: List[Dict[str, Any]] = []
+    
+    for row_no, r in enumerate(rows[2:], start=3):
+        if not r[COL['NAME']].strip(): continue
+        if with_checks: checks.extend(survey_checks(title, row_no, r))
+        row = r
+        base = {'class': row[COL['CLASS']], 'name': row[COL['NAME']], 'gender': row[COL['GENDER']]}
+        history_note = []
+        
+        # --- 1. 영재고 ---
+        sch = row[COL['GIFTED']].strip()
+        res = row[COL['RES_GIFTED']].strip()
+        
+        if sch and sch != 'nan':
+            sch_name = sch if sch not in ['O','o'] else "영재학교"
+            # 상태 판별
+            if "합격" in res and "불합" not in res: status = "최종합격"
+            elif "2차" in res: status = "2차합격"
+            elif "1차" in res: status = "1차합격"
+            elif "불합" in res: status = "불합격"
+            else: status = "지원" # 기본값
+
+            if status == "최종합격":
+                early_report['gifted'].append({**base, 'school': sch_name, 'status': status, 'note': ''})
+                continue
+            elif status == "불합격":
+                history_note.append("영재불합")
+            else: # 진행중 (1차, 2차, 지원)
+                early_report['gifted'].append({**base, 'school': sch_name, 'status': status, 'note': ''})
+                continue
+
+        # --- 2. 전기고 ---
+        sch_sci = row[COL['SCIENCE']].strip()
+        sch_art = row[COL['ARTS']].strip()
+        sch_mei = row[COL['MEISTER']].strip()
+        res_early = row[COL['RES_EARLY']].strip()
+        
+        if sch_sci or sch_art or sch_mei:
+            if "합격" in res_early and "불합" not in res_early: status = "최종합격"
+            elif "2차" in res_early: status = "2차합격"
+            elif "1차" in res_early: status = "1차합격"
+            elif "불합" in res_early: status = "불합격"
+            else: status = "지원"
+
+            final_note = "/".join(history_note)
+
+            if sch_sci:
+                sch_name = sch_sci if sch_sci not in ['O','o'] else "과학고"
+                if status != "불합격":
+                    early_report['science'].append({**base, 'school': sch_name, 'status': status, 'note': final_note})
+                    continue
+                else: history_note.append("과고불합")
+            
+            elif sch_art:
+                sch_name = sch_art if sch_art not in ['O','o'] else "예술고"
+                if status != "불합격":
+                    early_report['arts'].append({**base, 'school': sch_name, 'status': status, 'note': final_note})
+                    continue
+                else: history_note.append("예고불합")
+
+            elif sch_mei:
+                sch_name = sch_mei if sch_mei not in ['O','o'] else "특성화고"
+                dept = row[COL['DEPT']].strip()
+                if status != "불합격":
+                    early_report['meister'].append({**base, 'school': sch_name, 'dept': dept, 'status': status, 'note': final_note})
+                    continue
+                else: history_note.append("특성불합")
+
+        # --- 3. 후기고 ---
+        sch_jasa = row[COL['JASA']].strip()
+        sch_for = row[COL['FOREIGN']].strip()
+        sch_etc = row[COL['ETC']].strip()
+        res_late = row[COL['RES_LATE']].strip()
+        
+        if "합격" in res_late and "불합" not in res_late: status = "최종합격"
+        elif "1차" in res_late or "면접" in res_late: status = "1차합격"
+        elif "불합" in res_late: status = "불합격"
+        else: status = "지원"
+        
+        final_note = "/".join(history_note)
+
+        if sch_jasa:
+            sch_name = sch_jasa if sch_jasa not in ['O','o'] else "자사고"
+            late_report['jasa'].append({**base, 'school': sch_name, 'status': status, 'note': final_note})
+        elif sch_for:
+            sch_name = sch_for if sch_for not in ['O','o'] else "외고/국제고"
+            late_report['foreign'].append({**base, 'school': sch_name, 'status': status, 'note': final_note})
+        elif sch_etc:
+            sch_name = sch_etc if sch_etc not in ['O','o'] else "기타"
+            late_report['etc'].append({**base, 'school': sch_name, 'status': status, 'note': final_note})
+
+    return early_report, late_report, checks
+
+def survey_sheets(workbook: Optional[WorkbookSource] = None) -> Iterator[Tuple[Dict[str, Any], List[List[str]]]]:
+    # 설문 시트마다 (시트 정보, 행 목록) - workbook(WorkbookSource) 을 주면 시트 API 대신 통합 문서(XLSX)에서 읽음
+    target_pattern = re.compile(r"진학희망 및 지원유형 조사\(3\d{2}\)_Sheet1")
+    if workbook is not None:
+        return workbook.sheets(target_pattern, columns=list(COL.values()))
+    # 시트 목록은 매니페스트 캐시에서, 모든 gspread 호출은 쿼터 스케줄러를 거침 (인증은 google-auth 공용 헬퍼 사용)
+    client = authorize(KEY_FILE)
+    # COL 에 있는 열만 읽음 (행은 원래 열 위치를 유지한 고정 폭이라 칸 채우기 불필요)
+    return fetch_target_sheets(client, SHEET_URL, target_pattern, columns=list(COL.values()))
+
+def timed_sheets(sheets: Iterable[Tuple[Dict[str, Any], List[List[str]]]]) -> Iterator[Tuple[Dict[str, Any], List[List[str]]]]:
+    # 시트를 하나씩 받는 시간만 fetch_seconds 에 누적 (받는 대로 파싱하는 경로에서도 파싱 시간은 빼고 잼)
+    it = iter(sheets)
+    while True:
+        with METRICS.timer('fetch_seconds', source='sheets'):
+            item = next(it, None)
+        if item is None: return
+        yield item
+
+def get_data_with_waterfall(checks: Optional[List[Dict[str, Any]]] = None, workers: int = 0,
+                            workbook: Optional[WorkbookSource] = None,
+                            sheets: Optional[Iterable[Tuple[Dict[str, Any], List[List[str]]]]] = None) -> Tuple[GroupReport, GroupReport]:
+    # checks 를 주면 데이터 검증용 레코드(행마다 전형별)를 함께 모음
+    # sheets 를 주면 내려받지 않고 이미 받은 시트 목록(제한 시간 실행의 수집 단계 결과)을 파싱만 함
+    # workers > 1 이면 시트마다 받는 대로 프로세스 풀에 넘겨 파싱하고, 시트 순서대로 합쳐 직렬 실행과 같은 결과를 만듦
     print("🔄 데이터 수집 및 상태별 배지 로직 적용 중...")
-    scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
-    creds = ServiceAccountCredentials.from_json_keyfile_name(KEY_FILE, scope)
-    client = gspread.authorize(creds)
-    doc = client.open_by_url(SHEET_URL)
     
-    early_report = {'gifted': [], 'science': [], 'arts': [], 'meister': []}
-    late_report = {'jasa': [], 'foreign': [], 'etc': []}
+    early_report: GroupReport = {'gifted': [], 'science': [], 'arts': [], 'meister': []}
+    late_report: GroupReport = {'jasa': [], 'foreign': [], 'etc': []}
     
-    target_pattern = re.compile(r"진학희망 및 지원유형 조사\(3\d{2}\)_Sheet1")
+    target_sheets = sheets if sheets is not None else survey_sheets(workbook)
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    partials: List[Any] = []  # 시트 순서대로 parse_sheet 결과 (프로세스 풀이면 Future)
     
-    for sht in doc.worksheets():
-        if target_pattern.search(sht.title):
-            rows = sht.get_all_values()
+    try:
+        for sheet, rows in target_sheets:
             if len(rows) < 3: continue
-            
-            for r in rows[2:]:
-                if len(r) < 3 or not r[2].strip(): continue
-                row = r + [''] * (30 - len(r))
-                base = {'class': row[0], 'name': row[2], 'gender': row[3]}
-                history_note = []
-                
-                # --- 1. 영재고 ---
-                sch = row[COL['GIFTED']].strip()
-                res = row[COL['RES_GIFTED']].strip()
-                
-                if sch and sch != 'nan':
-                    sch_name = sch if sch not in ['O','o'] else "영재학교"
-                    # 상태 판별
-                    if "합격" in res and "불합" not in res: status = "최종합격"
-                    elif "2차" in res: status = "2차합격"
-                    elif "1차" in res: status = "1차합격"
-                    elif "불합" in res: status = "불합격"
-                    else: status = "지원" # 기본값
-
-                    if status == "최종합격":
-                        early_report['gifted'].append({**base, 'school': sch_name, 'status': status, 'note': ''})
-                        continue
-                    elif status == "불합격":
-                        history_note.append("영재불합")
-                    else: # 진행중 (1차, 2차, 지원)
-                        early_report['gifted'].append({**base, 'school': sch_name, 'status': status, 'note': ''})
-                        continue
-
-                # --- 2. 전기고 ---
-                sch_sci = row[COL['SCIENCE']].strip()
-                sch_art = row[COL['ARTS']].strip()
-                sch_mei = row[COL['MEISTER']].strip()
-                res_early = row[COL['RES_EARLY']].strip()
-                
-                if sch_sci or sch_art or sch_mei:
-                    if "합격" in res_early and "불합" not in res_early: status = "최종합격"
-                    elif "2차" in res_early: status = "2차합격"
-                    elif "1차" in res_early: status = "1차합격"
-                    elif "불합" in res_early: status = "불합격"
-                    else: status = "지원"
-
-                    final_note = "/".join(history_note)
-
-                    if sch_sci:
-                        sch_name = sch_sci if sch_sci not in ['O','o'] else "과학고"
-                        if status != "불합격":
-                            early_report['science'].append({**base, 'school': sch_name, 'status': status, 'note': final_note})
-                            continue
-                        else: history_note.append("과고불합")
-                    
-                    elif sch_art:
-                        sch_name = sch_art if sch_art not in ['O','o'] else "예술고"
-                        if status != "불합격":
-                            early_report['arts'].append({**base, 'school': sch_name, 'status': status, 'note': final_note})
-                            continue
-                        else: history_note.append("예고불합")
-
-                    elif sch_mei:
-                        sch_name = sch_mei if sch_mei not in ['O','o'] else "특성화고"
-                        dept = row[COL['DEPT']].strip()
-                        if status != "불합격":
-                            early_report['meister'].append({**base, 'school': sch_name, 'dept': dept, 'status': status, 'note': final_note})
-                            continue
-                        else: history_note.append("특성불합")
-
-                # --- 3. 후기고 ---
-                sch_jasa = row[COL['JASA']].strip()
-                sch_for = row[COL['FOREIGN']].strip()
-                sch_etc = row[COL['ETC']].strip()
-                res_late = row[COL['RES_LATE']].strip()
-                
-                if "합격" in res_late and "불합" not in res_late: status = "최종합격"
-                elif "1차" in res_late or "면접" in res_late: status = "1차합격"
-                elif "불합" in res_late: status = "불합격"
-                else: status = "지원"
-                
-                final_note = "/".join(history_note)
-
-                if sch_jasa:
-                    sch_name = sch_jasa if sch_jasa not in ['O','o'] else "자사고"
-                    late_report['jasa'].append({**base, 'school': sch_name, 'status': status, 'note': final_note})
-                elif sch_for:
-                    sch_name = sch_for if sch_for not in ['O','o'] else "외고/국제고"
-                    late_report['foreign'].append({**base, 'school': sch_name, 'status': status, 'note': final_note})
-                elif sch_etc:
-                    sch_name = sch_etc if sch_etc not in ['O','o'] else "기타"
-                    late_report['etc'].append({**base, 'school': sch_name, 'status': status, 'note': final_note})
+            METRICS.add('rows_scanned', len(rows) - 2, source='sheets')
+            if pool is not None:
+                partials.append(pool.submit(parse_sheet, sheet['title'], rows, checks is not None))
+            else:
+                partials.append(parse_sheet(sheet['title'], rows, checks is not None))
+        # 시트 순서대로 합침 (작업자 완료 순서와 무관)
+        for part in partials:
+            part_early, part_late, part_checks = part.result() if pool is not None else part
+            for group, students in part_early.items(): early_report[group].extend(students)
+            for group, students in part_late.items(): late_report[group].extend(students)
+            if checks is not None: checks.extend(part_checks)
+    finally:
+        if pool is not None: pool.shutdown()
 
     return early_report, late_report
 
 # ==========================================
 # 2. HTML 생성 (컬러 배지 적용)
 # ==========================================
-def generate_html_with_badges(data_dict, title, filename, mode='early'):
+def generate_html_with_badges(data_dict, title, filename, mode='early', live=None, cache=None):
+    # live: 실시간 서버 채널 → 파일 대신 채널에 넘김 (행 id 는 반/이름으로 고정, No 열은 CSS counter 로 매겨
+    #       중간에 행이 끼거나 빠져도 그 행만 전송)
+    # cache: 표별 행 조각 캐시 (FragmentCache) - 명단이 그대로인 표는 다시 렌더링하지 않음
     
     # [핵심] 상태별 배지 디자인 함수
     def make_badge(status):
@@ -162,11 +231,17 @@ def generate_html_with_badges(data_dict, title, filename, mode='early'):
         else:
             return f'<span class="text-xs text-gray-400">{status}</span>'
 
-    def make_table(section_title, data, cols):
-        rows = ""
+    search_docs = []  # 통합 검색용 (anchor = 표 번호-행 번호)
+    fragments = {}    # 실시간 모드: tbody id → [(행 id, HTML), ...]
+    counts = {}       # 실시간 모드: 표 제목 옆 인원 수
+
+    def make_rows(data, cols, prefix, n_cols):
+        # 표 한 개의 tbody 행들 → [(행 id, HTML), ...]
+        items = []
         if not data:
-            rows = f'<tr><td colspan="{len(cols)+5}" class="text-center py-8 text-gray-300">해당 없음</td></tr>'
+            items.append((f"{prefix}-empty", f'<tr id="{prefix}-empty"><td colspan="{n_cols}" class="text-center py-8 text-gray-300">해당 없음</td></tr>'))
         
+        row_ids = unique_ids(prefix, [(s['class'], s['name']) for s in data]) if live else [f"{prefix}-{idx}" for idx in range(len(data))]
         for idx, s in enumerate(data):
             badge = make_badge(s['status'])
             note_html = f'<div class="text-[10px] text-gray-400 mt-0.5">({s["note"]})</div>' if s['note'] else ""
@@ -174,9 +249,9 @@ def generate_html_with_badges(data_dict, title, filename, mode='early'):
             # 학교명이 길어질 경우를 대비해 truncate 적용 가능
             school_display = s.get('school','-')
             
-            rows += f"""
-            <tr class="hover:bg-gray-50 border-b border-gray-200 transition-colors">
-                <td class="text-center border-r border-gray-200 py-2.5 font-mono text-gray-500">{idx+1}</td>
+            items.append((row_ids[idx], f"""
+            <tr id="{row_ids[idx]}" class="hover:bg-gray-50 border-b border-gray-200 transition-colors">
+                <td class="text-center border-r border-gray-200 py-2.5 font-mono text-gray-500{' live-no' if live else ''}">{'' if live else idx+1}</td>
                 <td class="text-center border-r border-gray-200 py-2.5">{s['class']}</td>
                 <td class="text-center border-r border-gray-200 py-2.5 font-semibold text-gray-700">{s['name']}</td>
                 <td class="text-center border-r border-gray-200 py-2.5 text-xs text-gray-500">{s['gender']}</td>
@@ -187,45 +262,58 @@ def generate_html_with_badges(data_dict, title, filename, mode='early'):
                 {'<td class="text-center border-r border-gray-200 py-2.5 text-xs text-gray-600">' + s.get('dept','-') + '</td>' if '학과' in cols else ''}
                 <td class="text-center py-2.5">{badge}</td>
             </tr>
-            """
+            """))
+        return items
+
+    def make_table(section_title, data, cols, prefix):
+        # 열 구성 (머리글 / 빈 표 안내 칸의 colspan 이 같은 목록을 따름 - 학과는 cols 에 있을 때만)
+        headers = [h for h in TABLE_HEADERS if h[0] != '학과' or '학과' in cols]
+        # 행 조각: 명단(표 데이터)이 지난 실행과 같으면 조각 캐시의 행들을 그대로 씀
+        if cache is not None:
+            key = {'prefix': prefix, 'dept': '학과' in cols, 'live': bool(live), 'rows': data}
+            items = [tuple(item) for item in cache.render(key, lambda: make_rows(data, cols, prefix, len(headers)))]
+        else:
+            items = make_rows(data, cols, prefix, len(headers))
+        for idx, s in enumerate(data):
+            search_docs.append({'anchor': f"{prefix}-{idx}", 'name': s['name'], 'class': s['class'], 'group': section_title,
+                                'school': s.get('school', ''), 'dept': s.get('dept', ''), 'status': s['status']})
+
+        fragments[f"{prefix}-rows"] = items
+        counts[f"{prefix}-count"] = str(len(data))
+        rows = "".join(html for _, html in items)
 
         return f"""
         <div class="flex-1 min-w-0 bg-white rounded-xl shadow-sm border border-gray-200 overflow-hidden">
             <h3 class="text-center font-bold bg-slate-50 py-3 border-b border-gray-200 text-slate-700">
                 {section_title} 
-                <span class="ml-1 inline-flex items-center justify-center px-2 py-0.5 rounded-full text-xs font-medium bg-slate-200 text-slate-600">{len(data)}</span>
+                <span class="ml-1 inline-flex items-center justify-center px-2 py-0.5 rounded-full text-xs font-medium bg-slate-200 text-slate-600" id="{prefix}-count">{len(data)}</span>
             </h3>
             <table class="w-full text-xs">
                 <thead class="bg-slate-100 border-b border-gray-200 text-slate-500 uppercase tracking-wider">
                     <tr>
-                        <th class="py-2 w-8 font-semibold">No</th>
-                        <th class="py-2 w-10 font-semibold">반</th>
-                        <th class="py-2 w-16 font-semibold">이름</th>
-                        <th class="py-2 w-10 font-semibold">성별</th>
-                        <th class="py-2 font-semibold">지원학교</th>
-                        {'<th class="py-2 w-24 font-semibold">학과</th>' if '학과' in cols else ''}
-                        <th class="py-2 w-24 font-semibold">진행상황</th>
+                        {"".join(f'<th class="py-2 {width}font-semibold">{label}</th>' for label, width in headers)}
                     </tr>
                 </thead>
-                <tbody class="divide-y divide-gray-100">{rows}</tbody>
+                <tbody id="{prefix}-rows" class="divide-y divide-gray-100">{rows}</tbody>
             </table>
         </div>
         """
 
     content = ""
     if mode == 'early':
-        content += make_table("영재학교", data_dict['gifted'], [])
+        content += make_table("영재학교", data_dict['gifted'], [], 't1')
         content += '<div class="w-6"></div>'
-        content += make_table("과학고/예술고", data_dict['science'] + data_dict['arts'], [])
+        content += make_table("과학고/예술고", data_dict['science'] + data_dict['arts'], [], 't2')
         content += '<div class="w-6"></div>'
-        content += make_table("특성화/마이스터고", data_dict['meister'], ['학과'])
+        content += make_table("특성화/마이스터고", data_dict['meister'], ['학과'], 't3')
     else:
-        content += make_table("자사고", data_dict['jasa'], [])
+        content += make_table("자사고", data_dict['jasa'], [], 't1')
         content += '<div class="w-6"></div>'
-        content += make_table("외고/국제고", data_dict['foreign'], [])
+        content += make_table("외고/국제고", data_dict['foreign'], [], 't2')
         content += '<div class="w-6"></div>'
-        content += make_table("기타/비평준", data_dict['etc'], [])
+        content += make_table("기타/비평준", data_dict['etc'], [], 't3')
 
+    updated = f"업데이트: {datetime.now().strftime('%Y-%m-%d %H:%M' + (':%S' if live else ''))}"
     full_html = f"""
     <!DOCTYPE html>
     <html lang="ko">
@@ -242,6 +330,8 @@ def generate_html_with_badges(data_dict, title, filename, mode='early'):
                 body {{ background: white; padding: 0; }}
                 .shadow-sm {{ box-shadow: none; }}
             }}
+            tr:target {{ background: #fef3c7; outline: 2px solid #f59e0b; }} /* 통합 검색에서 이동한 행 */
+            {'tbody { counter-reset: live-no; } tbody tr { counter-increment: live-no; } .live-no::before { content: counter(live-no); }' if live else ''}
         </style>
     </head>
     <body class="p-8 bg-slate-50 min-h-screen">
@@ -256,7 +346,7 @@ def generate_html_with_badges(data_dict, title, filename, mode='early'):
                     </div>
                 </div>
                 <div class="text-right">
-                    <p class="text-xs text-slate-400 mb-2 font-mono">업데이트: {datetime.now().strftime('%Y-%m-%d %H:%M')}</p>
+                    <p id="updated" class="text-xs text-slate-400 mb-2 font-mono">{updated}</p>
                     <button onclick="window.print()" class="no-print bg-slate-800 hover:bg-slate-900 text-white px-4 py-2 rounded-lg text-sm font-bold transition shadow-lg flex items-center gap-2 ml-auto">
                         <svg class="w-4 h-4" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M17 17h2a2 2 0 002-2v-4a2 2 0 00-2-2H5a2 2 0 00-2 2v4a2 2 0 002 2h2m2 4h6a2 2 0 002-2v-4a2 2 0 00-2-2H9a2 2 0 00-2 2v4a2 2 0 002 2zm8-12V5a2 2 0 00-2-2H9a2 2 0 00-2 2v4h10z"></path></svg>
                         인쇄하기
@@ -279,16 +369,102 @@ def generate_html_with_badges(data_dict, title, filename, mode='early'):
     </html>
     """
     
-    with open(filename, 'w', encoding='utf-8') as f:
-        f.write(full_html)
-    print(f"✅ 리포트 생성 완료: {filename}")
+    if live is not None:
+        return live.publish(full_html, fragments, {**counts, 'updated': updated}, stamps=('updated',))
+    status = write_text(filename, full_html)
+    print(f"✅ 리포트 생성 완료: {filename}{status_note(status)}")
+    output_dir = os.path.dirname(filename)
+    save_search_partial(output_dir, f"table_{mode}", title, os.path.relpath(filename, output_dir), search_docs)
 
-if __name__ == "__main__":
+REPORT_TITLES = {'early': "2025학년도 전기고 전형 진행 현황", 'late': "2025학년도 후기고 전형 진행 현황"}
+
+def fragment_cache(enabled: bool = True) -> FragmentCache:
+    # 컬러 리포트 표별 행 조각 캐시 (렌더링 코드/행 id 규칙(unique_ids)/열 구성이 바뀌면 버림)
+    return FragmentCache('generate_table', template_version(generate_html_with_badges, unique_ids, TABLE_HEADERS), enabled=enabled)
+
+def refresh_live(hub: LiveHub, cache: Optional[FragmentCache] = None) -> None:
+    # 실시간 모드: 시트를 다시 읽어 전기/후기 채널에 반영 (스케줄러는 진행 중인 중복 요청만 합치므로 매번 새 값을 받음)
     early, late = get_data_with_waterfall()
+    for mode, data_dict in (('early', early), ('late', late)):
+        title = REPORT_TITLES[mode]
+        delta = generate_html_with_badges(data_dict, title, None, mode=mode, live=hub.channel(mode, title), cache=cache)
+        print(f"🔁 {title}: {describe_delta(delta)}")
+    if cache is not None: cache.save()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="전기고/후기고 전형 진행 현황 컬러 리포트 생성기")
+    parser.add_argument('--no-validate', action='store_true',
+                        help="데이터 검증(중복/전기·후기 충돌/반 값/합불 모순) 생략")
+    parser.add_argument('--no-fragment-cache', action='store_true',
+                        help="표별 HTML 조각 캐시(.cache/fragments) 없이 매번 모든 표를 렌더링")
+    parser.add_argument('--compact', action='store_true',
+                        help="HTML 축소 (반복 class 목록을 짧은 클래스로 합치고 공백/주석 제거)")
+    parser.add_argument('--gzip', action='store_true', help="HTML 옆에 미리 압축한 .html.gz 사본도 기록")
+    parser.add_argument('--workers', nargs='?', type=int, const=os.cpu_count() or 1, default=0, metavar='N',
+                        help="시트 파싱을 N개 프로세스로 병렬 처리 (값 없이 쓰면 CPU 코어 수, 결과는 직렬 실행과 같음)")
+    parser.add_argument('--workbook', nargs='?', const=workbook_url(SHEET_URL), default=None, metavar='PATH_OR_URL',
+                        help="시트 API 대신 스프레드시트 전체 XLSX 한 파일에서 읽기 (값 없이 쓰면 내려받아 .cache/workbooks 에 저장, 경로를 주면 오프라인)")
+    parser.add_argument('--budget', type=float, default=None, metavar='SECONDS',
+                        help="실행 전체 제한 시간(초). 수집/파싱이 넘으면 마지막 성공 데이터로 만들고 '최신 데이터 아님' 표시")
+    parser.add_argument('--stage-budget', type=stage_budget, nargs='+', default=[], metavar='STAGE=SECONDS',
+                        help="단계별 제한 시간 (예: fetch=20 parse=5 render=10)")
+    parser.add_argument('--live', nargs='?', type=int, const=DEFAULT_LIVE_PORT, default=None, metavar='PORT',
+                        help=f"파일 대신 실시간 서버 실행 (바뀐 행만 SSE 로 전송, 기본 포트 {DEFAULT_LIVE_PORT})")
+    parser.add_argument('--interval', type=float, default=DEFAULT_POLL_SECONDS,
+                        help=f"실시간 모드에서 시트를 다시 읽는 간격(초, 기본 {DEFAULT_POLL_SECONDS})")
+    args = parser.parse_args()
+    enable_compact(args.compact, args.gzip)
+
+    if args.live is not None:
+        hub = LiveHub()
+        cache = fragment_cache(not args.no_fragment_cache)
+        serve_live(hub, functools.partial(refresh_live, hub, cache), port=args.live, interval=args.interval)
+        raise SystemExit(0)
+
+    # 수집 → 파싱 → 렌더링을 단계별 제한 시간 안에서 실행 (제한이 없으면 그대로 호출)
+    budget = RunBudget(args.budget, dict(args.stage_budget))
+
+    def fetch():
+        with METRICS.timer('fetch_seconds', source='sheets'):
+            sheets = timed_sheets(survey_sheets(open_workbook(args.workbook) if args.workbook else None))
+        # 제한 시간이 있으면 수집 단계에서 모두 받아 둠 (없으면 받는 대로 파싱해 --workers 와 겹쳐 실행)
+        return list(sheets) if budget.enabled else sheets
+
+    def parse(sheets: List[Tuple[Dict[str, Any], List[List[str]]]]) -> Dict[str, Any]:
+        checks: Optional[List[Dict[str, Any]]] = None if args.no_validate else []
+        early, late = get_data_with_waterfall(checks, workers=args.workers, sheets=sheets)
+        return {'early': early, 'late': late, 'checks': checks}
+
+    data = fetch_and_parse(budget, 'generate_table', fetch, parse)
+    if data is None: raise SystemExit(1)
+    early, late, checks = data['early'], data['late'], data['checks']
+    for report, data_dict in (('early', early), ('late', late)):
+        for group, students in data_dict.items():
+            METRICS.set('students', len(students), report=report, group=group)
     
     output_dir = "reports"
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
-        
-    generate_html_with_badges(early, "2025학년도 전기고 전형 진행 현황", os.path.join(output_dir, "목일중_전기고_컬러리포트.html"), mode='early')
-    generate_html_with_badges(late, "2025학년도 후기고 전형 진행 현황", os.path.join(output_dir, "목일중_후기고_컬러리포트.html"), mode='late')
\ No newline at end of file
+
+    def render():
+        if checks is not None:
+            run_validation(checks, output_dir, vectorized=False)
+        cache = fragment_cache(not args.no_fragment_cache)
+        with METRICS.timer('render_seconds', report='early', stage='color_report'):
+            generate_html_with_badges(early, REPORT_TITLES['early'], os.path.join(output_dir, "목일중_전기고_컬러리포트.html"), mode='early', cache=cache)
+        with METRICS.timer('render_seconds', report='late', stage='color_report'):
+            generate_html_with_badges(late, REPORT_TITLES['late'], os.path.join(output_dir, "목일중_후기고_컬러리포트.html"), mode='late', cache=cache)
+        print(cache.summary())
+        cache.save()
+        save_portal(output_dir)
+
+    try:
+        budget.run('render', render)
+    except BudgetExceeded as e:
+        print(f"❌ {e} - 아직 기록하지 못한 리포트는 이전 파일이 그대로 남습니다.")
+    report_compaction()
+    save_run_manifest(output_dir)
+    record_scheduler(get_scheduler(), TRANSFER_STATS)
+    record_manifest(get_manifest())
+    save_run_metrics(output_dir)
+    if budget.render_overrun: raise SystemExit(1)
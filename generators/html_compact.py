@@ -0,0 +1,220 @@
+import io
+import re
+import gzip
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple
+
+# ==========================================
+# 1. 설정 정보
+# ==========================================
+# --compact / --gzip 옵션으로 켜짐 (output_writer.write_text 가 .html 출력에 적용)
+COMPACT_OPTIONS = {'enabled': False, 'gzip': False}
+GZIP_LEVEL = 9
+GENERATED_PREFIX = '_'   # 생성 클래스 이름: _0, _1, ... _a, ... (Tailwind/기존 클래스와 겹치지 않음)
+MIN_REPEATS = 2          # 이 횟수 이상 반복된 class 목록만 짧은 이름으로 합침
+# 그룹 표시용이라 @apply 할 수 없는 Tailwind 클래스
+TAILWIND_MARKERS = frozenset({'group', 'peer', 'dark'})
+
+TAILWIND_CDN = 'cdn.tailwindcss.com'
+PROTECTED_PATTERN = re.compile(r"(<(script|style|pre|textarea)\b[^>]*>.*?</\2\s*>)", re.S | re.I)
+CLASS_ATTR_PATTERN = re.compile(r'(\sclass=")([^"]*)(")')
+COMMENT_PATTERN = re.compile(r"<!--(?!\[if).*?-->", re.S)
+TOKEN_PATTERN = re.compile(r"[A-Za-z_][\w\-:\[\]./%#]*")
+# 앞뒤 공백을 없애도 화면이 바뀌지 않는 블록 태그
+BLOCK_TAGS = ('html', 'head', 'body', 'meta', 'title', 'link', 'style', 'script', 'div', 'header', 'footer',
+              'section', 'nav', 'main', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'ul', 'ol', 'li',
+              'table', 'thead', 'tbody', 'tfoot', 'tr', 'th', 'td', 'select', 'option', 'br', '!DOCTYPE')
+BLOCK_SPACE_PATTERN = re.compile(r"\s*(</?(?:%s)\b[^>]*>)\s*" % '|'.join(re.escape(t) for t in BLOCK_TAGS), re.I)
+
+def enable_compact(enabled: bool = True, gzip_copy: bool = False) -> None:
+    COMPACT_OPTIONS['enabled'] = enabled
+    COMPACT_OPTIONS['gzip'] = gzip_copy
+
+def _short_name(i: int) -> str:
+    digits = '0123456789abcdefghijklmnopqrstuvwxyz'
+    name = ''
+    while True:
+        name = digits[i % 36] + name
+        i //= 36
+        if not i: return GENERATED_PREFIX + name
+
+# ==========================================
+# 2. 반복 class 목록 → 짧은 생성 클래스
+# ==========================================
+def _split_protected(html: str) -> List[Tuple[bool, str]]:
+    """(보호 구간 여부, 조각) 목록. script/style/pre/textarea 안은 건드리지 않음"""
+    parts, pos = [], 0
+    for m in PROTECTED_PATTERN.finditer(html):
+        parts.append((False, html[pos:m.start()]))
+        parts.append((True, m.group(1)))
+        pos = m.end()
+    parts.append((False, html[pos:]))
+    return parts
+
+def _class_key(value: str) -> Optional[str]:
+    # 템플릿 조각({...}, ${...})이 남은 값은 대상 아님
+    if '{' in value or '$' in value: return None
+    tokens = value.split()
+    return ' '.join(tokens) if len(tokens) > 1 or (tokens and len(tokens[0]) > 3) else None
+
+def _plain_css(html: str) -> str:
+    """페이지 자체 CSS (Tailwind 용 style 제외)"""
+    blocks = re.findall(r"<style\b([^>]*)>(.*?)</style\s*>", html, re.S | re.I)
+    return '\n'.join(css for attrs, css in blocks if 'tailwindcss' not in attrs)
+
+def _script_tokens(html: str) -> Set[str]:
+    scripts = re.findall(r"<script\b[^>]*>(.*?)</script\s*>", html, re.S | re.I)
+    return set(TOKEN_PATTERN.findall('\n'.join(scripts)))
+
+def dedupe_classes(html: str) -> str:
+    """
+    여러 번 반복되는 class 목록을 _0, _1 ... 같은 짧은 클래스로 바꿉니다.
+    - Tailwind 페이지: <style type="text/tailwindcss"> 에 `._0 {@apply ...}` 로 정의
+    - 일반 CSS 페이지: 기존 선택자 `.thick-top` → `:is(.thick-top,._0)` 로 바꿔 같은 규칙이 적용되게 함
+    스크립트가 참조하는 클래스(querySelector 등)와, Tailwind 페이지에서 자체 CSS 가 참조하는 클래스는
+    생성 클래스 옆에 그대로 남깁니다.
+    """
+    tailwind = TAILWIND_CDN in html
+    parts = _split_protected(html)
+    counts = Counter(key for protected, text in parts if not protected
+                     for key in map(_class_key, (m.group(2) for m in CLASS_ATTR_PATTERN.finditer(text))) if key)
+    repeated = [key for key, n in counts.most_common() if n >= MIN_REPEATS]
+    if not repeated: return html
+
+    css = _plain_css(html)
+    reserved = _script_tokens(html)
+    if tailwind:
+        reserved |= TAILWIND_MARKERS | set(re.findall(r"\.([A-Za-z_][\w\-]*)", css))
+
+    names: Dict[str, str] = {}
+    replacement: Dict[str, str] = {}
+    definitions: List[str] = []
+    aliases: Dict[str, List[str]] = {}  # 원래 클래스 → 그것을 대신하는 생성 클래스들 (일반 CSS 용)
+    for key in repeated:
+        tokens = key.split()
+        kept = [t for t in tokens if t in reserved]
+        merged = [t for t in tokens if t not in reserved]
+        if len(merged) < 1 or (len(merged) == 1 and len(merged[0]) <= 3): continue
+        name = _short_name(len(names))
+        new_value = ' '.join([name] + kept)
+        # 정의(@apply 한 줄 또는 :is 별칭) 비용보다 아끼는 양이 클 때만
+        saved = counts[key] * (len(key) - len(new_value))
+        cost = len(name) + len(' '.join(merged)) + 12 if tailwind else sum(len(name) + 2 for _ in merged)
+        if saved <= cost: continue
+        names[key] = name
+        replacement[key] = new_value
+        if tailwind:
+            definitions.append(f".{name}{{@apply {' '.join(merged)}}}")
+        else:
+            for t in merged:
+                aliases.setdefault(t, []).append(name)
+    if not replacement: return html
+
+    def swap(m: 're.Match[str]') -> str:
+        key = _class_key(m.group(2))
+        return m.group(1) + replacement[key] + m.group(3) if key in replacement else m.group(0)
+
+    out = []
+    for protected, text in parts:
+        if not protected:
+            text = CLASS_ATTR_PATTERN.sub(swap, text)
+        elif not tailwind and aliases and re.match(r"<style\b", text, re.I):
+            text = _alias_selectors(text, aliases)
+        out.append(text)
+    html = ''.join(out)
+
+    if tailwind:
+        block = f'<style type="text/tailwindcss">{"".join(definitions)}</style>'
+        html = re.sub(r"</head\s*>", lambda m: block + m.group(0), html, count=1, flags=re.I) if re.search(r"</head\s*>", html, re.I) else block + html
+    return html
+
+def _alias_selectors(style: str, aliases: Dict[str, List[str]]) -> str:
+    """선택자 안의 .token 을 :is(.token,._0,...) 로 바꿈 (명시도는 클래스 하나 그대로)"""
+    def repl(m: 're.Match[str]') -> str:
+        token = m.group(1)
+        if token not in aliases: return m.group(0)
+        return ':is(' + ','.join('.' + t for t in [token] + aliases[token]) + ')'
+
+    def rewrite_rule(m: 're.Match[str]') -> str:
+        return re.sub(r"\.([A-Za-z_][\w\-]*)(?![\w\-])", repl, m.group(1)) + m.group(2)
+    # 중괄호 앞(선택자 부분)만 바꿈. 선언 값 안의 숫자(0.5 등)는 건드리지 않음
+    return re.sub(r"([^{}]*)(\{)", rewrite_rule, style)
+
+# ==========================================
+# 3. 공백/주석 축소
+# ==========================================
+def _minify_css(css: str) -> str:
+    css = re.sub(r"/\*.*?\*/", '', css, flags=re.S)
+    css = re.sub(r"\s+", ' ', css)
+    css = re.sub(r"\s*([{};,])\s*", r"\1", css)
+    return re.sub(r":\s+", ':', css).replace(';}', '}').strip()
+
+def _minify_protected(block: str) -> str:
+    m = re.match(r"(<(\w+)\b[^>]*>)(.*)(</\2\s*>)$", block, re.S)
+    if not m: return block
+    open_tag, tag, body, close_tag = m.group(1), m.group(2).lower(), m.group(3), m.group(4)
+    if tag == 'style':
+        body = _minify_css(body)
+    elif tag == 'script':
+        # 줄바꿈은 유지 (// 주석, 세미콜론 생략 코드 보호). 들여쓰기와 빈 줄만 제거
+        body = '\n'.join(line.strip() for line in body.splitlines() if line.strip())
+    return open_tag + body + close_tag
+
+def minify_html(html: str) -> str:
+    parts = _split_protected(html)
+    out = []
+    for i, (protected, text) in enumerate(parts):
+        if protected:
+            out.append(_minify_protected(text))
+            continue
+        text = COMMENT_PATTERN.sub('', text)
+        text = BLOCK_SPACE_PATTERN.sub(r"\1", re.sub(r"\s+", ' ', text))
+        # script/style 앞뒤의 공백 (pre/textarea 옆은 그대로)
+        if i > 0 and re.match(r"<(script|style)\b", parts[i - 1][1], re.I): text = text.lstrip()
+        if i + 1 < len(parts) and re.match(r"<(script|style)\b", parts[i + 1][1], re.I): text = text.rstrip()
+        out.append(text)
+    return ''.join(out).strip()
+
+def compact_html(html: str) -> str:
+    """반복 class 목록 합치기 + 공백/주석 축소"""
+    return minify_html(dedupe_classes(html))
+
+# ==========================================
+# 4. gzip 사본 + 크기 기록
+# ==========================================
+SIZE_STATS: List[Dict[str, object]] = []
+_stats_lock = threading.Lock()
+
+def gzip_bytes(text: str) -> bytes:
+    """mtime=0, 파일 이름 없이 압축 (내용이 같으면 바이트도 같음)"""
+    buf = io.BytesIO()
+    with gzip.GzipFile(filename='', mode='wb', fileobj=buf, compresslevel=GZIP_LEVEL, mtime=0) as gz:
+        gz.write(text.encode('utf-8'))
+    return buf.getvalue()
+
+def record_size(path: str, original: int, written: int, gzipped: Optional[int] = None) -> None:
+    with _stats_lock:
+        SIZE_STATS.append({'path': path, 'original': original, 'written': written, 'gzip': gzipped})
+
+def _pct(before: int, after: int) -> str:
+    return f"-{100.0 * (before - after) / before:.0f}%" if before else '-'
+
+def report_compaction() -> None:
+    """파일별 크기 변화 (원본 → 축소 → gzip) 출력"""
+    with _stats_lock:
+        entries = sorted(SIZE_STATS, key=lambda e: str(e['path']))
+    if not entries: return
+    print("📦 출력 크기 (원본 → 축소 / gzip):")
+    total_o = total_w = total_g = 0
+    for e in entries:
+        o, w, g = int(e['original']), int(e['written']), e['gzip']
+        line = f"   - {e['path']}: {o / 1024:.1f}KB → {w / 1024:.1f}KB ({_pct(o, w)})"
+        if g is not None:
+            line += f" / gzip {int(g) / 1024:.1f}KB ({_pct(o, int(g))})"
+            total_g += int(g)
+        print(line)
+        total_o += o; total_w += w
+    summary = f"   = 합계 {total_o / 1024:.1f}KB → {total_w / 1024:.1f}KB ({_pct(total_o, total_w)})"
+    if total_g: summary += f" / gzip {total_g / 1024:.1f}KB ({_pct(total_o, total_g)})"
+    print(summary)
@@ -0,0 +1,292 @@
+import json
+import time
+import queue
+import hashlib
+import threading
+from collections import deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+# ==========================================
+# 1. 설정 정보
+# ==========================================
+DEFAULT_LIVE_PORT = 8765
+DEFAULT_POLL_SECONDS = 30      # 시트를 다시 읽는 간격 (설문 시트 15개 기준 분당 30회 읽기 → 쿼터 60회의 절반)
+HISTORY_SIZE = 64              # 재접속한 페이지에 다시 보내 줄 최근 변경 수 (더 오래되면 전체 재전송)
+HEARTBEAT_SECONDS = 15         # 프록시/브라우저가 연결을 끊지 않도록 보내는 빈 이벤트 간격
+
+# 조각 목록: 컨테이너 id → [(조각 id, HTML), ...] (화면 순서)
+Fragments = Dict[str, List[Tuple[str, str]]]
+
+# ==========================================
+# 2. 리포트 채널 (현재 상태 + 변경분 계산 + 구독자)
+# ==========================================
+class LiveChannel:
+    """
+    리포트 하나의 현재 상태(컨테이너별 조각 목록, 머리글 등 개별 영역)와 최근 변경 이력.
+    publish() 로 새 상태를 넘기면 바뀐 조각만 골라 버전을 올리고 구독 중인 페이지에 보냅니다.
+    """
+
+    def __init__(self, name: str, title: str):
+        self.name = name
+        self.title = title
+        self.page = ''
+        self.version = 0
+        self.fragments: Fragments = {}
+        self.parts: Dict[str, str] = {}
+        self.history: Deque[Tuple[int, str]] = deque(maxlen=HISTORY_SIZE)
+        self.subscribers: List['queue.Queue[str]'] = []
+        self.lock = threading.Lock()
+
+    def publish(self, page: str, fragments: Fragments, parts: Dict[str, str],
+                stamps: Tuple[str, ...] = ()) -> Optional[Dict[str, Any]]:
+        """
+        새 상태를 반영하고 변경분을 반환합니다 (바뀐 것이 없으면 None).
+        변경분: upsert [[조각 id, HTML, 컨테이너 id, 다음 조각 id], ...], remove [조각 id, ...],
+        reset {컨테이너 id: 전체 HTML} (순서가 바뀐 컨테이너만), parts {영역 id: HTML}
+        stamps: '업데이트 시각'처럼 매번 달라지는 영역 → 변경 판단에서 빼고, 다른 변경이 있을 때만 함께 보냄
+        """
+        with self.lock:
+            delta: Dict[str, Any] = {'upsert': [], 'remove': [], 'reset': {}, 'parts': {}}
+            for cid, items in fragments.items():
+                old = dict(self.fragments.get(cid, []))
+                new_keys = [k for k, _ in items]
+                kept_old = [k for k, _ in self.fragments.get(cid, []) if k in set(new_keys)]
+                if kept_old != [k for k in new_keys if k in old]:
+                    # 기존 조각끼리 순서가 바뀜 (드묾) → 그 컨테이너만 통째로
+                    delta['reset'][cid] = ''.join(html for _, html in items)
+                    continue
+                delta['remove'] += [k for k in old if k not in set(new_keys)]
+                for pos, (key, html) in enumerate(items):
+                    if old.get(key) != html:
+                        after = new_keys[pos + 1] if pos + 1 < len(new_keys) else None
+                        delta['upsert'].append([key, html, cid, after])
+            for cid in self.fragments:
+                if cid not in fragments:
+                    delta['reset'][cid] = ''
+            delta['parts'] = {pid: html for pid, html in parts.items() if pid not in stamps and self.parts.get(pid) != html}
+            if not any(delta.values()) and self.page: return None
+            delta['parts'].update({pid: parts[pid] for pid in stamps if pid in parts})
+
+            self.page, self.fragments, self.parts = page, fragments, dict(parts)
+            self.version += 1
+            delta = {k: v for k, v in delta.items() if v}
+            delta['v'] = self.version
+            payload = json.dumps(delta, ensure_ascii=False, separators=(',', ':'))
+            self.history.append((self.version, payload))
+            for q in self.subscribers:
+                q.put(_event(self.version, payload))
+            return delta
+
+    def snapshot_event(self) -> str:
+        """현재 상태 전체 (이력에 없는 오래된 버전에서 재접속한 페이지용)"""
+        reset = {cid: ''.join(html for _, html in items) for cid, items in self.fragments.items()}
+        return _event(self.version, json.dumps({'reset': reset, 'parts': self.parts, 'v': self.version},
+                                               ensure_ascii=False, separators=(',', ':')))
+
+    def subscribe(self, since: Optional[int]) -> 'queue.Queue[str]':
+        """since 이후의 변경분을 먼저 넣은 구독 큐 (이력에 없으면 전체 상태)"""
+        q: 'queue.Queue[str]' = queue.Queue()
+        with self.lock:
+            if since is not None and since < self.version:
+                missed = [(v, p) for v, p in self.history if v > since]
+                if missed and missed[0][0] == since + 1:
+                    for v, p in missed: q.put(_event(v, p))
+                else:
+                    q.put(self.snapshot_event())
+            self.subscribers.append(q)
+        return q
+
+    def unsubscribe(self, q: 'queue.Queue[str]') -> None:
+        with self.lock:
+            if q in self.subscribers: self.subscribers.remove(q)
+
+def _event(version: int, payload: str) -> str:
+    return f"id: {version}\nevent: delta\ndata: {payload}\n\n"
+
+def fragment_id(prefix: str, *fields: Any) -> str:
+    """학생 식별 값(반/번호/이름 등)으로 만든 고정 id (순서가 바뀌거나 앞에 행이 끼어도 그대로)"""
+    digest = hashlib.sha1('|'.join(str(f).strip() for f in fields).encode('utf-8')).hexdigest()[:10]
+    return f"{prefix}-{digest}"
+
+def unique_ids(prefix: str, keys: List[Tuple[Any, ...]]) -> List[str]:
+    """fragment_id 목록 (같은 학생이 두 번 나오면 -2, -3 ... 을 붙여 구분)"""
+    seen: Dict[str, int] = {}
+    ids = []
+    for key in keys:
+        base = fragment_id(prefix, *key)
+        seen[base] = seen.get(base, 0) + 1
+        ids.append(base if seen[base] == 1 else f"{base}-{seen[base]}")
+    return ids
+
+def describe_delta(delta: Optional[Dict[str, Any]]) -> str:
+    if delta is None: return '변경 없음'
+    size = len(json.dumps(delta, ensure_ascii=False).encode('utf-8'))
+    pieces = [f"갱신 {len(delta.get('upsert', []))}개", f"삭제 {len(delta.get('remove', []))}개"]
+    if delta.get('reset'): pieces.append(f"전체 교체 {len(delta['reset'])}곳")
+    return f"v{delta['v']} " + ', '.join(pieces) + f" ({size / 1024:.1f}KB)"
+
+# ==========================================
+# 3. 페이지 쪽 스크립트 (변경분을 제자리에 반영)
+# ==========================================
+LIVE_CSS = """
+.live-flash { animation: live-flash 2s ease-out; }
+@keyframes live-flash { from { box-shadow: 0 0 0 4px #fbbf24; } to { box-shadow: 0 0 0 0 transparent; } }
+#live-status { position: fixed; right: 12px; bottom: 12px; font-size: 12px; padding: 4px 10px; border-radius: 9999px;
+  background: #ecfdf5; color: #047857; border: 1px solid #a7f3d0; font-family: sans-serif; z-index: 50; }
+#live-status.off { background: #fef2f2; color: #b91c1c; border-color: #fecaca; }
+"""
+
+LIVE_CLIENT_JS = r"""
+(() => {
+    const statusEl = document.getElementById('live-status');
+    const toNode = (html) => { const t = document.createElement('template'); t.innerHTML = html.trim(); return t.content.firstElementChild; };
+    const flash = (el) => { el.classList.add('live-flash'); setTimeout(() => el.classList.remove('live-flash'), 2000); };
+
+    function apply(d) {
+        Object.entries(d.reset || {}).forEach(([cid, html]) => { const box = document.getElementById(cid); if (box) box.innerHTML = html; });
+        (d.remove || []).forEach((key) => { const el = document.getElementById(key); if (el) el.remove(); });
+        (d.upsert || []).forEach(([key, html, cid, after]) => {
+            const node = toNode(html);
+            const old = document.getElementById(key);
+            if (old) { old.replaceWith(node); }
+            else {
+                const box = document.getElementById(cid);
+                const next = after && document.getElementById(after);
+                if (box) box.insertBefore(node, next && next.parentNode === box ? next : null);
+            }
+            flash(node);
+        });
+        Object.entries(d.parts || {}).forEach(([pid, html]) => { const el = document.getElementById(pid); if (el) el.innerHTML = html; });
+    }
+
+    const es = new EventSource(`/events?report=${encodeURIComponent(LIVE.report)}&since=${LIVE.version}`);
+    es.addEventListener('delta', (e) => {
+        const t0 = performance.now();
+        apply(JSON.parse(e.data));
+        statusEl.className = '';
+        statusEl.textContent = `● 실시간 · ${new Date().toLocaleTimeString()} 반영 (${e.data.length.toLocaleString()}자, ${(performance.now() - t0).toFixed(1)}ms)`;
+    });
+    es.onopen = () => { statusEl.className = ''; statusEl.textContent = '● 실시간 연결됨'; };
+    es.onerror = () => { statusEl.className = 'off'; statusEl.textContent = '○ 연결 끊김 - 재연결 중...'; };
+})();
+"""
+
+def live_page(channel: LiveChannel, page: str) -> str:
+    """정적 리포트 HTML 에 실시간 스크립트와 상태 표시를 붙임 (현재 버전을 함께 기록해 놓친 변경분을 이어 받음)"""
+    boot = json.dumps({'report': channel.name, 'version': channel.version}, ensure_ascii=False)
+    tail = (f'<style>{LIVE_CSS}</style><div id="live-status">● 연결 중...</div>'
+            f'<script>const LIVE = {boot};{LIVE_CLIENT_JS}</script>')
+    return page.replace('</body>', tail + '</body>', 1) if '</body>' in page else page + tail
+
+# ==========================================
+# 4. HTTP 서버 (페이지 + /events 스트림)
+# ==========================================
+class LiveHub:
+    """여러 리포트 채널을 묶어 한 포트에서 제공합니다."""
+
+    def __init__(self) -> None:
+        self.channels: Dict[str, LiveChannel] = {}
+
+    def channel(self, name: str, title: str) -> LiveChannel:
+        if name not in self.channels:
+            self.channels[name] = LiveChannel(name, title)
+        return self.channels[name]
+
+    def index_html(self) -> str:
+        links = ''.join(f'<li><a href="/r/{c.name}">{c.title}</a> (버전 {c.version})</li>' for c in self.channels.values())
+        return (f'<!DOCTYPE html><html lang="ko"><head><meta charset="UTF-8"><title>실시간 진학 현황</title></head>'
+                f'<body style="font-family:sans-serif;padding:30px"><h2>실시간 진학 현황</h2><ul>{links}</ul>'
+                f'<p style="color:#666;font-size:10pt">시작: {datetime.now().strftime("%Y-%m-%d %H:%M")}</p></body></html>')
+
+def _handler_class(hub: LiveHub) -> type:
+    class LiveHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _send(self, status: int, content_type: str, body: bytes) -> None:
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self) -> None:
+            parts = urlsplit(self.path)
+            if parts.path == '/':
+                return self._send(200, 'text/html; charset=utf-8', hub.index_html().encode('utf-8'))
+            if parts.path.startswith('/r/'):
+                channel = hub.channels.get(parts.path[3:])
+                if channel is None or not channel.page:
+                    return self._send(404, 'text/plain; charset=utf-8', '리포트가 아직 준비되지 않았습니다.'.encode('utf-8'))
+                with channel.lock:
+                    body = live_page(channel, channel.page)
+                return self._send(200, 'text/html; charset=utf-8', body.encode('utf-8'))
+            if parts.path == '/events':
+                return self._stream(parse_qs(parts.query))
+            self._send(404, 'text/plain; charset=utf-8', b'not found')
+
+        def _stream(self, query: Dict[str, List[str]]) -> None:
+            channel = hub.channels.get((query.get('report') or [''])[0])
+            if channel is None:
+                return self._send(404, 'text/plain; charset=utf-8', b'unknown report')
+            # 브라우저가 자동 재접속할 때는 Last-Event-ID 헤더로 마지막 버전을 알려 줌
+            since = self.headers.get('Last-Event-ID') or (query.get('since') or [None])[0]
+            q = channel.subscribe(int(since) if since and since.isdigit() else None)
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            self.close_connection = True
+            try:
+                self.wfile.write(b'retry: 3000\n\n')
+                while True:
+                    try:
+                        message = q.get(timeout=HEARTBEAT_SECONDS)
+                    except queue.Empty:
+                        message = ': ping\n\n'
+                    self.wfile.write(message.encode('utf-8'))
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError, OSError):
+                pass
+            finally:
+                channel.unsubscribe(q)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    return LiveHandler
+
+def start_live_server(hub: LiveHub, host: str = '127.0.0.1', port: int = DEFAULT_LIVE_PORT) -> Tuple[ThreadingHTTPServer, str]:
+    """백그라운드 스레드에서 실시간 서버를 띄우고 (서버, 기본 URL) 을 반환 (port=0 이면 빈 포트)"""
+    server = ThreadingHTTPServer((host, port), _handler_class(hub))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+def _safe_refresh(refresh: Callable[[], None]) -> None:
+    """갱신 한 번이 실패해도(연결 끊김, 쿼터 초과 등) 서버는 마지막 상태로 계속 제공"""
+    try:
+        refresh()
+    except Exception as e:
+        print(f"❌ 갱신 실패 (마지막 화면 유지): {e}")
+
+def serve_live(hub: LiveHub, refresh: Callable[[], None], port: int = DEFAULT_LIVE_PORT,
+               interval: float = DEFAULT_POLL_SECONDS, host: str = '127.0.0.1') -> None:
+    """첫 refresh() 로 채널을 채운 뒤 서버를 띄우고, interval 초마다 refresh() 를 반복 (Ctrl+C 로 종료)"""
+    _safe_refresh(refresh)
+    server, url = start_live_server(hub, host, port)
+    for channel in hub.channels.values():
+        print(f"📡 실시간 리포트: {url}/r/{channel.name} ({channel.title})")
+    print(f"   {interval:g}초마다 시트를 다시 읽어 바뀐 카드/행만 보냅니다. (Ctrl+C 로 종료)")
+    try:
+        while True:
+            time.sleep(interval)
+            _safe_refresh(refresh)
+    except KeyboardInterrupt:
+        print("\n🛑 실시간 서버 종료")
+    finally:
+        server.shutdown()
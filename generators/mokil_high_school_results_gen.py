@@ -1,13 +1,35 @@
-import pandas as pd
-import requests
 import io
+import sys
 import datetime
 import os
-import re
-from typing import List, Dict, Any, Optional, Tuple
-# openpyxl 라이브러리 필수
-from openpyxl.styles import Alignment, Border, Side, Font, PatternFill
-from openpyxl.utils import get_column_letter
+import csv
+import json
+import argparse
+import copy
+import tempfile
+import contextlib
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple, Iterator, Iterable, Sequence, TYPE_CHECKING
+
+from report_stats import ReportStats
+from school_names import get_resolver
+from sheets_client import endpoint_url
+from output_writer import write_text, atomic_output, status_note, save_run_manifest, mark_stale, STALE_NOTICE
+from run_metrics import METRICS, record_resolver, save_run_metrics
+from table_snapshot import save_snapshot, find_snapshot, load_snapshot, iter_rows
+from html_compact import enable_compact, report_compaction
+from results_cube import cube_path, update_cube, render_cube_html, year_from_title
+from search_index import save_search_partial, save_portal
+from data_validation import parse_class, classify_result, run_validation
+from workbook_source import open_workbook, workbook_url
+from class_layout import FIELD_LABELS, FOOTER_ROWS, HEADER_ROWS, build_class_layout, group_fields
+from run_budget import RunBudget, BudgetExceeded, SourceUnavailable, fetch_and_parse, stage_budget
+from fragment_cache import FragmentCache, template_version
+
+# pandas / requests / openpyxl 은 실제로 쓰는 시점에 import (짧은 예약 작업의 기동 시간 단축)
+if TYPE_CHECKING:
+    import pandas as pd
 
 # --- [설정] 구글 스프레드시트 URL ---
 SHEET_URLS = {
@@ -15,13 +37,82 @@ SHEET_URLS = {
     'late': "https://docs.google.com/spreadsheets/d/1I_Cy5TZEnG0GmoThLPJJR7ZrXxUgXzsDDzu2zOtmjQI/export?format=csv&gid=1675631175"
 }
 
+# 통합 문서(--workbook) 모드의 시트 이름 (XLSX 에는 gid 가 없음 → 시트 매니페스트에 gid 가 있으면 그 이름 우선)
+SHEET_TITLES = {'early': "전기고 결과", 'late': "후기고 결과"}
+
+OUTPUT_DIR = "reports"
+# 내보내기 형식 (모든 형식은 한 번 만든 리포트 모델에서 동시에 기록됨)
+EXPORT_FORMATS = ('html', 'xlsx', 'csv', 'json')
+# 표(반별 레이아웃)가 필요 없는 형식 - 이 형식만 요청되면 레이아웃 계산을 건너뜀
+SUMMARY_FORMATS = ('summary',)
+# 라이트 모드: pandas/openpyxl 없이 표준 csv 모듈로 파싱하고 HTML/CSV/JSON만 기록
+LIGHT_FORMATS = ('html', 'csv', 'json')
+# 청크 모드: 헤더를 찾을 때 앞에서부터 살펴볼 행 수, 기본 청크 크기(행)
+HEADER_SCAN_ROWS = 50
+DEFAULT_CHUNK_ROWS = 5000
+DOWNLOAD_BLOCK = 1 << 16
+# 반별 분할 리포트: 반마다 한 페이지 (담임 선생님은 자기 반 페이지만 열면 됨) + reports/main.html 목차
+SHARD_FORMATS = ('shards',)
+MAIN_INDEX = "main.html"
+SHARD_WORKERS = 8
+CUBE_REPORT = "목일중_통계큐브.html"
+
+def _report(msg: str) -> None:
+    """writer 스레드들의 완료 메시지가 한 줄에 섞이지 않도록 한 번의 write 로 출력"""
+    sys.stdout.write(msg + "\n")
+    sys.stdout.flush()
+
+def _cell(row: Sequence[Any], idx: int) -> str:
+    """행에서 idx번째 값을 문자열로 반환 (범위 밖 / 빈 값 / NaN은 '')"""
+    if idx < 0 or idx >= len(row): return ''
+    val = row[idx]
+    if val is None or val != val: return ''  # NaN은 자기 자신과 같지 않음
+    return str(val)
+
+# 통계 요약 블록 스타일 (전체 리포트 / 요약 전용 리포트 공용)
+STATS_CSS = """.stats-container { margin-top: 30px; border-top: 2px solid #000; padding-top: 20px; font-size: 11pt; line-height: 1.6; }
+        .stats-header { font-size: 13pt; font-weight: bold; text-decoration: underline; margin-bottom: 15px; }
+        .stats-row { margin-bottom: 8px; }
+        .stats-label { display: inline-block; font-weight: bold; width: 160px; }
+        .stats-school-list { margin-left: 10px; color: #444; font-size: 10pt; }
+        .stats-total-box { margin-top: 20px; padding-top: 15px; border-top: 1px solid #aaa; font-weight: bold; font-size: 12pt; }"""
+
+# 반별 표 HTML: 열 머리글 스타일 / 본문 칸 class (빈 칸 제외) / 합계 행(남·여·계) class
+HEAD_STYLES = {'name': ' style="width:60px;"', 'gender': ' style="width:40px;"'}
+BODY_CLASSES = {'name': ' col-name', 'gender': ' col-gender', 'school': ' col-school'}
+FOOT_ROW_CLASSES = ('thick-top bg-gray-50 font-bold', 'bg-gray-50 font-bold', 'thick-top bg-group font-bold border-b-2 border-black')
+# 엑셀 열 너비 (학반 열 / 그룹 묶음의 열별)
+EXCEL_CLASS_WIDTH = 8
+EXCEL_FIELD_WIDTHS = {'name': 10, 'gender': 6, 'school': 18, 'dept': 18}
+# 반별 tbody 를 그리는 형식 (이 형식을 기록한 실행만 조각 캐시를 갱신)
+FRAGMENT_FORMATS = {'html', 'shards'}
+
 class MokilReportGenerator:
-    def __init__(self, mode: str):
+    def __init__(self, mode: str, light: bool = False, source: Optional[str] = None, chunk_rows: Optional[int] = None,
+                 snapshot: Optional[str] = None, typed: bool = False, workbook: Optional[str] = None,
+                 budget: Optional[RunBudget] = None, fragment_cache: bool = True):
         self.mode = mode
-        self.raw_df: Optional[pd.DataFrame] = None
+        self.light = light
+        self.typed = typed and not light  # 레이아웃 기반 로딩: 필요한 열만, 반/성별/합불/학교는 범주형(category)
+        self.chunk_rows = chunk_rows  # 지정하면 전체를 메모리에 올리지 않고 청크 단위로 처리
+        self.source = source or SHEET_URLS[mode]  # URL 또는 로컬 CSV 경로
+        self.snapshot = snapshot      # 지정하면 다운로드/파싱 없이 저장된 스냅샷에서 읽음 ('latest' 또는 수집 시각)
+        self.workbook = workbook      # 지정하면 CSV export 대신 통합 문서(XLSX, 경로 또는 URL)의 시트에서 읽음
+        self.budget = budget or RunBudget()  # 수집/파싱/렌더링 제한 시간 (기본: 제한 없음)
+        self.stale: Optional[Dict[str, Any]] = None  # 마지막 성공 데이터로 대체했으면 그 수집 시각/사유
+        # 반별 tbody 조각 캐시 (반 데이터 해시 → HTML, 렌더링 코드가 바뀌면 버림)
+        self.fragments = FragmentCache(f"mokil_{mode}", template_version(self._render_class_rows, self._field_cells, self._anchor, BODY_CLASSES),
+                                       enabled=fragment_cache)
+        self.raw_df: Optional['pd.DataFrame'] = None
+        self.raw_rows: Optional[List[List[str]]] = None  # 라이트 모드 파싱 결과
+        self.raw_cols: Optional[List[Any]] = None        # 스냅샷 열 배열 (mmap)
+        self.typed_df: Optional['pd.DataFrame'] = None   # 레이아웃 기반 로딩 결과 (필요한 열만, 열 번호 = 원본 위치)
         self.classes: Dict[int, Dict[str, List[Dict[str, str]]]] = {i: {'g1': [], 'g2': [], 'g3': [], 'g4': []} for i in range(1, 16)}
         self.counts = {'g1': 0, 'g2': 0, 'g3': 0, 'g4': 0}
         self.report_date = "" 
+        self.model: Optional[Dict[str, Any]] = None  # 마지막으로 내보낸 리포트 모델 (main.html 목차용)
+        self.checks: List[Dict[str, Any]] = []         # 데이터 검증용 레코드 (분류에서 걸러진 행 포함)
+        self.next_row = 0                              # 다음에 분류할 행의 원본 행 번호 (1부터)
         
         if mode == 'early':
             self.title = "2026학년도 목일중 전기고 진학 현황"
@@ -55,36 +146,203 @@ class MokilReportGenerator:
         print(f"   👉 기준일 설정 완료: {self.report_date}")
         print("-" * 50)
 
+    def _download_text(self) -> str:
+        if os.path.exists(self.source):
+            with open(self.source, encoding='utf-8') as f:
+                return f.read()
+        url = endpoint_url(self.source)
+        if self.light:
+            # 라이트 모드는 requests 대신 표준 라이브러리로 다운로드
+            from urllib.request import urlopen
+            with urlopen(url) as resp:
+                return resp.read().decode('utf-8')
+        import requests
+        response = requests.get(url)
+        response.raise_for_status()
+        return response.content.decode('utf-8')
+
     def fetch_google_sheet(self) -> bool:
-        url = SHEET_URLS[self.mode]
         print(f"📥 [{self.mode.upper()}] 데이터 다운로드 중...", end=" ", flush=True)
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            self.raw_df = pd.read_csv(io.StringIO(response.content.decode('utf-8')), header=None)
+            with METRICS.timer('fetch_seconds', source=self.mode):
+                text = self._download_text()
+            METRICS.set('fetch_bytes', len(text.encode('utf-8')), source=self.mode)
+            if self.light:
+                self.raw_rows = list(csv.reader(io.StringIO(text)))
+            else:
+                import pandas as pd
+                # 빈 줄도 행으로 유지 (행 번호가 원본 시트/csv 모듈 파싱과 같도록)
+                self.raw_df = pd.read_csv(io.StringIO(text), header=None, dtype=str, skip_blank_lines=False)
             print("완료!")
-            return True
         except Exception as e:
             print(f"\n❌ [오류] 데이터 다운로드 실패: {e}")
             return False
+        if self.raw_df is not None: self._save_snapshot()
+        return True
 
-    def find_column_indices(self) -> Optional[Tuple[int, Dict[str, Dict[str, int]]]]:
-        df = self.raw_df
-        if df is None: return None
-        
+    def _save_snapshot(self) -> None:
+        """파싱 결과를 열 단위 스냅샷으로 저장 (다음 --from-snapshot 실행용, 라이트 모드는 numpy 를 쓰지 않으므로 제외)"""
+        try:
+            columns = [self.raw_df.iloc[:, j].fillna('').tolist() for j in range(self.raw_df.shape[1])]
+            save_snapshot(self.source, columns)
+        except Exception as e:
+            print(f"⚠️ [{self.mode.upper()}] 스냅샷 저장 실패 (리포트 생성은 계속): {e}")
+
+    def load_from_workbook(self) -> bool:
+        """통합 문서(XLSX)에서 이 모드의 시트를 행 목록으로 읽음 (다운로드는 전기/후기 합쳐 한 번)"""
+        book = open_workbook(self.workbook)
+        title = book.title_for(SHEET_URLS[self.mode], SHEET_TITLES[self.mode])
+        if title is None:
+            print(f"❌ [{self.mode.upper()}] 통합 문서에서 시트를 찾지 못했습니다 ('{SHEET_TITLES[self.mode]}'). 시트 목록: {', '.join(book.titles)}")
+            return False
+        self.raw_rows = book.rows(title)
+        print(f"📗 [{self.mode.upper()}] 통합 문서에서 읽음: {title} ({len(self.raw_rows)}행)")
+        return True
+
+    def load_from_snapshot(self) -> bool:
+        """저장된 스냅샷을 mmap 으로 열어 원본 표로 사용 (CSV 다운로드/파싱/타입 추론 없음)"""
+        path = find_snapshot(self.source, self.snapshot or 'latest')
+        if path is None:
+            print(f"❌ [{self.mode.upper()}] 스냅샷이 없습니다 ({self.snapshot}). 먼저 --from-snapshot 없이 한 번 실행하세요.")
+            return False
+        try:
+            meta, self.raw_cols = load_snapshot(path)
+        except Exception as e:
+            print(f"❌ [{self.mode.upper()}] 스냅샷 읽기 실패: {e}")
+            return False
+        METRICS.add('cache_hits', 1, cache='snapshot')
+        print(f"⚡ [{self.mode.upper()}] 스냅샷에서 불러옴: {meta['fetched_at']} 수집, {meta['n_rows']}행 × {meta['n_cols']}열")
+        return True
+
+    def _iter_rows(self) -> Iterator[Sequence[Any]]:
+        """파싱 방식(pandas / csv)과 무관하게 원본 행을 위치 기반 시퀀스로 순회"""
+        if self.raw_cols is not None: return iter_rows(self.raw_cols)
+        if self.raw_rows is not None: return iter(self.raw_rows)
+        if self.raw_df is not None: return self.raw_df.itertuples(index=False, name=None)
+        return iter(())
+
+    @contextlib.contextmanager
+    def _source_file(self) -> Iterator[str]:
+        """원본 CSV를 로컬 파일 경로로 제공 (URL이면 블록 단위로 임시 파일에 내려받아 메모리 사용을 제한)"""
+        if os.path.exists(self.source):
+            METRICS.set('fetch_bytes', os.path.getsize(self.source), source=self.mode)
+            yield self.source
+            return
+        url = endpoint_url(self.source)
+        fd, tmp_path = tempfile.mkstemp(suffix='.csv')
+        try:
+            with METRICS.timer('fetch_seconds', source=self.mode), os.fdopen(fd, 'wb') as out:
+                if self.light:
+                    from urllib.request import urlopen
+                    with urlopen(url) as resp:
+                        for block in iter(lambda: resp.read(DOWNLOAD_BLOCK), b''):
+                            out.write(block)
+                else:
+                    import requests
+                    with requests.get(url, stream=True) as resp:
+                        resp.raise_for_status()
+                        for block in resp.iter_content(DOWNLOAD_BLOCK):
+                            out.write(block)
+            METRICS.set('fetch_bytes', os.path.getsize(tmp_path), source=self.mode)
+            yield tmp_path
+        finally:
+            os.remove(tmp_path)
+
+    def _iter_chunks(self, path: str, skip_rows: int, n_cols: int) -> Iterator[Iterable[Sequence[Any]]]:
+        """헤더 다음 행부터 chunk_rows 행씩 잘라서 순회 (한 번에 한 청크만 메모리에 존재)"""
+        if self.light:
+            with open(path, encoding='utf-8', newline='') as f:
+                reader = islice(csv.reader(f), skip_rows, None)
+                while True:
+                    chunk = list(islice(reader, self.chunk_rows))
+                    if not chunk: break
+                    yield chunk
+        else:
+            import pandas as pd
+            reader = pd.read_csv(path, header=None, dtype=str, skiprows=skip_rows, names=range(n_cols),
+                                 skip_blank_lines=False, chunksize=self.chunk_rows)
+            for chunk_df in reader:
+                yield chunk_df.itertuples(index=False, name=None)
+
+    def process_chunked(self) -> bool:
+        """
+        청크 모드: 앞부분(HEADER_SCAN_ROWS 행)에서 헤더를 찾은 뒤 나머지 행을 고정 크기 청크로 흘려보내며 분류합니다.
+        원본 전체(raw_df)를 보관하지 않으므로 입력 크기와 무관하게 최대 메모리가 일정합니다.
+        """
+        print(f"📥 [{self.mode.upper()}] 데이터 다운로드 중 (청크 모드, {self.chunk_rows}행 단위)...", end=" ", flush=True)
+        try:
+            with self._source_file() as path:
+                with open(path, encoding='utf-8', newline='') as f:
+                    head_rows = list(islice(csv.reader(f), HEADER_SCAN_ROWS))
+                result = self.find_column_indices(head_rows)
+                if not result:
+                    print("\n❌ [오류] 헤더(이름/성명) 행을 찾지 못했습니다.")
+                    return False
+                h_idx, indices = result
+                self.next_row = h_idx + 2
+                n_cols = max(len(r) for r in head_rows)
+                for chunk in self._iter_chunks(path, h_idx + 1, n_cols):
+                    self._classify_rows(chunk, indices)
+            print("완료!")
+            return True
+        except Exception as e:
+            print(f"\n❌ [오류] 데이터 처리 실패: {e}")
+            return False
+
+    def load_typed(self) -> Optional[Tuple[int, Dict[str, Dict[str, int]]]]:
+        """
+        레이아웃 기반 로딩: 앞부분(HEADER_SCAN_ROWS 행)에서 헤더와 그룹별 열 위치를 찾은 뒤 그 열만 읽습니다.
+        이름 열은 문자열, 반/성별/학교/학과/합불 열은 범주형(category)으로 읽어 값 종류만큼만 문자열을 보관하고,
+        분류는 범주 코드로 조회합니다 (_classify_frame). 스냅샷은 전체 열이 필요하므로 저장하지 않습니다.
+        """
+        print(f"📥 [{self.mode.upper()}] 데이터 다운로드 중 (필요한 열만, 범주형)...", end=" ", flush=True)
+        try:
+            with METRICS.timer('fetch_seconds', source=self.mode):
+                text = self._download_text()
+            METRICS.set('fetch_bytes', len(text.encode('utf-8')), source=self.mode)
+            head_rows = list(islice(csv.reader(io.StringIO(text)), HEADER_SCAN_ROWS))
+            result = self.find_column_indices(head_rows)
+            if not result:
+                print("\n❌ [오류] 헤더(이름/성명) 행을 찾지 못했습니다.")
+                return None
+            h_idx, indices = result
+            n_cols = max(len(r) for r in head_rows)
+            names = {idx['name'] for idx in indices.values() if idx['name'] != -1}
+            fields = {idx[k] for idx in indices.values() if idx['name'] != -1 for k in ('class', 'gender', 'school', 'dept', 'pass')}
+            usecols = sorted(c for c in names | fields if 0 <= c < n_cols)
+            dtype = {c: ('str' if c in names else 'category') for c in usecols}
+
+            import pandas as pd
+            options = {'header': None, 'dtype': dtype, 'skiprows': h_idx + 1, 'skip_blank_lines': False}
+            try:
+                # 필요한 가장 오른쪽 열까지만 이름을 붙이고 그 뒤 칸은 버림
+                self.typed_df = pd.read_csv(io.StringIO(text), names=range(usecols[-1] + 1), usecols=usecols, **options)
+            except ValueError:
+                # 끝 빈칸이 잘려 행마다 칸 수가 다른 파일 → 전체 폭으로 읽은 뒤 필요한 열만 남김
+                self.typed_df = pd.read_csv(io.StringIO(text), names=range(n_cols), **options)[usecols]
+            mb = self.typed_df.memory_usage(deep=True).sum() / (1 << 20)
+            print(f"완료! ({len(self.typed_df)}행 × {len(usecols)}/{n_cols}열, {mb:.1f}MB)")
+            return result
+        except Exception as e:
+            print(f"\n❌ [오류] 데이터 다운로드 실패: {e}")
+            return None
+
+    def find_column_indices(self, rows: Optional[Iterable[Sequence[Any]]] = None) -> Optional[Tuple[int, Dict[str, Dict[str, int]]]]:
         header_row_idx = -1
-        for i, row in df.iterrows():
-            row_str = " ".join([str(x) for x in row.values])
+        header_row: Sequence[Any] = ()
+        for i, row in enumerate(rows if rows is not None else self._iter_rows()):
+            row_str = " ".join([_cell(row, j) for j in range(len(row))])
             if "이름" in row_str or "성명" in row_str:
                 header_row_idx = i
+                header_row = row
                 break
         
         if header_row_idx == -1: return None
-        header_row = df.iloc[header_row_idx]
         
         name_cols = []
-        for idx, val in header_row.items():
-            if "이름" in str(val) or "성명" in str(val): name_cols.append(idx)
+        for idx in range(len(header_row)):
+            val = _cell(header_row, idx)
+            if "이름" in val or "성명" in val: name_cols.append(idx)
         
         group_indices = {}
         for i, group in enumerate(self.groups):
@@ -100,52 +358,167 @@ class MokilReportGenerator:
                 
         return header_row_idx, group_indices
 
-    def _detect_columns(self, name_idx: int, header_row: pd.Series) -> Dict[str, int]:
+    def _detect_columns(self, name_idx: int, header_row: Sequence[Any]) -> Dict[str, int]:
         info = {'name': name_idx, 'class': name_idx - 1, 'gender': name_idx + 1, 'school': name_idx + 2, 'dept': name_idx + 3, 'pass': -1}
         for offset in range(1, 7):
             check_idx = info['school'] + offset
-            if check_idx in header_row.index:
-                val = str(header_row[check_idx])
+            if check_idx < len(header_row):
+                val = _cell(header_row, check_idx)
                 if any(x in val for x in ['합', '불', '당락', '합격', '결과']):
                     info['pass'] = check_idx
                     break
         return info
 
-    def process(self) -> None:
+    def process(self, formats: Tuple[str, ...] = EXPORT_FORMATS) -> None:
         self.set_date()
-        if not self.fetch_google_sheet(): return
-        result = self.find_column_indices()
-        if not result: return
+        # 수집/파싱은 작업 사본에서 (제한 시간을 넘겨 버려진 단계가 나중에 이 객체의 분류 결과를 건드리지 않도록)
+        work = self._scratch()
+        try:
+            data = fetch_and_parse(self.budget, f"mokil_{self.mode}", work._fetch_stage, work._parse_stage)
+        except SourceUnavailable as e:
+            print(f"❌ {e}")
+            return
+        if data is None: return
+        self.classes = {int(c): groups for c, groups in data['classes'].items()}  # last-good(JSON) 은 반 번호가 문자열
+        self.counts = data['counts']
+        self.checks = data['checks']
+        self.stale = dict(STALE_NOTICE) if STALE_NOTICE['fetched_at'] else None
+        try:
+            self.budget.run('render', self._render, formats)
+        except BudgetExceeded as e:
+            print(f"❌ [{self.mode.upper()}] {e} - 아직 기록하지 못한 리포트는 이전 파일이 그대로 남습니다.")
+        mark_stale(None)  # 다음 리포트(전기 → 후기)는 자기 데이터 기준으로 표시
+
+    def _scratch(self) -> 'MokilReportGenerator':
+        work = copy.copy(self)
+        work.classes = {c: {gid: [] for gid in groups} for c, groups in self.classes.items()}
+        work.counts = {gid: 0 for gid in self.counts}
+        work.checks = []
+        return work
 
-        h_idx, indices = result
-        df = self.raw_df.iloc[h_idx+1:] 
+    def _fetch_stage(self) -> Tuple[int, Dict[str, Dict[str, int]]]:
+        """수집 단계: 원본을 읽고 헤더/그룹별 열 위치를 찾음 (청크 모드는 읽으면서 분류까지 끝내므로 빈 열 위치)"""
+        preloaded = bool(self.snapshot) or self.workbook is not None   # 스냅샷/통합 문서는 이미 행 단위라 청크/범주형 경로를 쓰지 않음
+        if self.chunk_rows and not preloaded:
+            if not self.process_chunked(): raise SourceUnavailable(f"[{self.mode.upper()}] 원본 데이터를 읽지 못했습니다.")
+            return -1, {}
+        if self.typed and not preloaded:
+            result = self.load_typed()
+        else:
+            if self.workbook is not None: loaded = self.load_from_workbook()
+            else: loaded = self.load_from_snapshot() if self.snapshot else self.fetch_google_sheet()
+            result = self.find_column_indices() if loaded else None
+        if not result: raise SourceUnavailable(f"[{self.mode.upper()}] 원본 데이터를 읽지 못했습니다.")
+        return result
+
+    def _parse_stage(self, layout: Tuple[int, Dict[str, Dict[str, int]]]) -> Dict[str, Any]:
+        """파싱 단계: 헤더 아래 행을 그룹별로 분류하고 분류 결과를 반환 (제한 시간 실행에서는 last-good 으로 저장)"""
+        h_idx, indices = layout
+        if indices:
+            self.next_row = h_idx + 2
+            if self.typed_df is not None: self._classify_frame(self.typed_df, indices)
+            else: self._classify_rows(islice(self._iter_rows(), h_idx + 1, None), indices)
+        return {'classes': self.classes, 'counts': self.counts, 'checks': self.checks}
 
-        for _, row in df.iterrows():
+    def _render(self, formats: Tuple[str, ...]) -> None:
+        self.canonicalize_schools()
+        for group in self.groups:
+            METRICS.set('students', self.counts[group['id']], report=self.mode, group=group['label'])
+        self.export(formats)
+
+    def _classify_rows(self, rows: Iterable[Sequence[Any]], indices: Dict[str, Dict[str, int]]) -> None:
+        """헤더 아래 행들을 그룹별로 분류해 self.classes 에 누적 (전체/청크 모드 공용)"""
+        scanned = 0
+        for row in rows:
+            scanned += 1
+            row_no = self.next_row
+            self.next_row += 1
             for group in self.groups:
                 gid = group['id']
                 idx = indices[gid]
-                if idx['name'] == -1 or pd.isna(row[idx['name']]): continue
-                cls_num = self._parse_class(str(row[idx['class']]))
-                if not cls_num: continue
-                if idx['pass'] != -1:
-                    pass_val = str(row[idx['pass']]).strip()
-                    if "합" not in pass_val: continue
-
-                school_name = str(row[idx['school']]).strip()
+                if idx['name'] == -1 or _cell(row, idx['name']) == '': continue
+                cls_val = _cell(row, idx['class'])
+                pass_val = _cell(row, idx['pass']).strip() if idx['pass'] != -1 else ''
+                self.checks.append({'source': self.mode, 'row': row_no, 'track': self.mode, 'group': group['label'],
+                                    'class': cls_val, 'num': '', 'name': _cell(row, idx['name']).strip(),
+                                    'results': [pass_val] if idx['pass'] != -1 else []})
+                cls_num = self._parse_class(cls_val)
+                if cls_num not in self.classes: continue
+                # '불합격'도 '합'을 포함하므로 판정 함수로 확인 (최종 합격 + 1차/2차/면접/예비 합격은 '진행')
+                outcome = classify_result(pass_val) if idx['pass'] != -1 else '지원'
+                if outcome not in ('합격', '진행', '지원'): continue
+
+                school_name = _cell(row, idx['school']).strip()
                 if self.mode == 'early' and gid == 'g3': school_name = self._clean_arts_school(school_name)
                 else: school_name = school_name.split('(')[0]
 
-                student = {'name': str(row[idx['name']]).strip(), 'gender': '남' if '남' in str(row[idx['gender']]) else '여', 'school': school_name, 'dept': str(row[idx['dept']]).strip() if group['has_dept'] else ''}
+                student = {'name': _cell(row, idx['name']).strip(), 'gender': '남' if '남' in _cell(row, idx['gender']) else '여', 'school': school_name, 'dept': _cell(row, idx['dept']).strip() if group['has_dept'] else ''}
+                student['status'] = outcome
                 self.classes[cls_num][gid].append(student)
                 self.counts[gid] += 1
+        METRICS.add('rows_scanned', scanned, source=self.mode)
+
+    def _classify_frame(self, df: 'pd.DataFrame', indices: Dict[str, Dict[str, int]]) -> None:
+        """
+        _classify_rows 와 같은 분류를 범주 코드로 처리 (load_typed 결과용).
+        반/합불/성별/학교 판정은 범주(값 종류)마다 한 번만 계산해 조회표로 만들고 코드로 펼치므로
+        셀마다 str()/strip()/정규식을 반복하지 않습니다. 이름은 sys.intern 으로 같은 문자열을 공유합니다.
+        """
+        import numpy as np
+        n = len(df)
+        first_row = self.next_row
+        self.next_row += n
+
+        def lookup(col: int, fn: Any) -> Any:
+            # 열 값마다 fn 을 적용한 배열 (없는 열/빈 칸은 fn(''))
+            if col < 0 or col not in df.columns: return np.full(n, fn(''), dtype=object)
+            series = df[col]
+            if series.dtype.name != 'category': series = series.astype('category')
+            table = np.array([fn(str(v)) for v in series.cat.categories] + [fn('')], dtype=object)
+            return table[series.cat.codes.to_numpy()]  # 코드 -1(빈 칸) → 마지막 칸 fn('')
+
+        for group in self.groups:
+            gid = group['id']
+            idx = indices[gid]
+            if idx['name'] == -1 or idx['name'] not in df.columns: continue
+            raw_names = df[idx['name']].to_numpy()
+            named = np.flatnonzero(df[idx['name']].notna().to_numpy() & (raw_names != ''))
+            if not len(named): continue
+            has_pass = idx['pass'] != -1
+            cls_vals = lookup(idx['class'], str)
+            cls_nums = lookup(idx['class'], self._parse_class)
+            pass_vals = lookup(idx['pass'], str.strip)
+            # '불합격'도 '합'을 포함하므로 판정 함수로 확인 (최종 합격 + 1차/2차/면접/예비 합격은 '진행')
+            outcomes = lookup(idx['pass'], lambda v: classify_result(v.strip())) if has_pass else np.full(n, '지원', dtype=object)
+            genders = lookup(idx['gender'], lambda v: '남' if '남' in v else '여')
+            if self.mode == 'early' and gid == 'g3': schools = lookup(idx['school'], lambda v: self._clean_arts_school(v.strip()))
+            else: schools = lookup(idx['school'], lambda v: v.strip().split('(')[0])
+            depts = lookup(idx['dept'], str.strip) if group['has_dept'] else np.full(n, '', dtype=object)
+
+            for i in named:
+                name = sys.intern(raw_names[i].strip())
+                self.checks.append({'source': self.mode, 'row': first_row + int(i), 'track': self.mode, 'group': group['label'],
+                                    'class': cls_vals[i], 'num': '', 'name': name,
+                                    'results': [pass_vals[i]] if has_pass else []})
+                if cls_nums[i] not in self.classes or outcomes[i] not in ('합격', '진행', '지원'): continue
+                self.classes[cls_nums[i]][gid].append({'name': name, 'gender': genders[i], 'school': schools[i],
+                                                       'dept': depts[i], 'status': outcomes[i]})
+                self.counts[gid] += 1
+        METRICS.add('rows_scanned', n, source=self.mode)
 
-        self.save_html()
-        self.save_excel()
+    def canonicalize_schools(self) -> None:
+        """'하나고등학교' / '하나고(자사)' 처럼 표기만 다른 학교명을 표준 이름으로 통일 (학교별 집계가 나뉘지 않도록)"""
+        students = [s for c_data in self.classes.values() for st_list in c_data.values() for s in st_list]
+        resolver = get_resolver()
+        mapping = resolver.resolve_all(s['school'] for s in students)
+        for s in students:
+            s['school'] = mapping.get(s['school'], s['school'])
+        resolver.save()
+        merged = len(mapping) - len(set(mapping.values()))
+        if merged: print(f"🏫 [{self.mode.upper()}] 학교명 표준화: {len(mapping)}개 표기 → {len(set(mapping.values()))}개 학교")
 
     def _parse_class(self, val: str) -> Optional[int]:
-        if '-' in val: return int(val.split('-')[1])
-        nums = re.findall(r'\d+', val)
-        return int(nums[-1]) if nums else None
+        return parse_class(val)
 
     def _clean_arts_school(self, name: str) -> str:
         name = name.split('(')[0].strip()
@@ -155,98 +528,202 @@ class MokilReportGenerator:
             if idx > 1: return name[:idx].strip()
         return name.split(' ')[0]
 
-    def save_html(self):
-        visible_groups = [g for g in self.groups if self.counts[g['id']] > 0]
-        
-        # 헤더 생성 (검색창 포함)
-        thead1 = '<tr><th rowspan="3" class="thick-right" style="width:50px;">학반</th>'
+    def compute_stats(self) -> ReportStats:
+        """반 × 그룹 × 성별 × 학교 × 상태 인원을 한 번에 집계 (라이트 모드는 pandas 없이)"""
+        records = (
+            {'class': i, 'group': gid, 'gender': s['gender'], 'school': s['school'], 'status': s['status']}
+            for i, c_data in self.classes.items() for gid, st_list in c_data.items() for s in st_list
+        )
+        return ReportStats.from_records(records, vectorized=not self.light)
+
+    def build_report_model(self, with_layout: bool = True) -> Dict[str, Any]:
+        """
+        모든 출력 형식이 공유하는 리포트 모델을 한 번만 만듭니다.
+        반별 행 수, 빈 칸 패딩, 병합 범위는 class_layout 격자(layout)로 확정하므로 각 writer는 격자만 내보냅니다.
+        with_layout=False 이면 집계(stats)만 채우고 반별 레이아웃은 만들지 않습니다 (요약 전용).
+        """
+        layout = build_class_layout(self.classes, self.groups, self.counts, range(1, 16) if with_layout else ())
+        return {
+            'mode': self.mode,
+            'title': self.title,
+            'report_date': self.report_date,
+            'groups': self.groups,
+            'visible_groups': layout['visible_groups'],
+            'classes': layout['blocks'],  # rows[r][k]: r번째 행, k번째 표시 그룹의 학생 (없으면 None = 빈 칸)
+            'layout': layout,
+            'stats': self.compute_stats(),
+        }
+
+    def _output_path(self, ext: str) -> str:
+        if not os.path.exists(OUTPUT_DIR):
+            os.makedirs(OUTPUT_DIR, exist_ok=True)
+        return os.path.join(OUTPUT_DIR, f"목일중_{self.mode}_진학현황.{ext}")
+
+    def _shard_dir(self) -> str:
+        """반별 페이지 폴더 이름 (OUTPUT_DIR 기준 상대 경로)"""
+        return f"목일중_{self.mode}_반별"
+
+    def _shard_name(self, block: Dict[str, Any]) -> str:
+        return f"{block['label']}.html"
+
+    def export(self, formats: Tuple[str, ...] = EXPORT_FORMATS) -> None:
+        """리포트 모델을 한 번 만든 뒤, 요청된 형식들을 스레드 풀에서 동시에 기록합니다."""
+        writers = {'html': self.save_html, 'xlsx': self.save_excel, 'csv': self.save_csv, 'json': self.save_json,
+                   'summary': self.save_summary, 'shards': self.save_shards}
+        if self.light and 'xlsx' in formats:
+            print("⚠️ 라이트 모드에서는 엑셀(xlsx)을 생성하지 않습니다.")
+            formats = tuple(f for f in formats if f != 'xlsx')
+        unknown = [f for f in formats if f not in writers]
+        if unknown:
+            print(f"⚠️ 지원하지 않는 출력 형식: {', '.join(unknown)}")
+
+        model = self.build_report_model(with_layout=any(f not in SUMMARY_FORMATS for f in formats))
+        self.model = model
+        targets = [f for f in formats if f in writers]
+
+        def run(fmt: str) -> None:
+            with METRICS.timer('render_seconds', report=self.mode, stage=fmt):
+                writers[fmt](model)
+
+        with ThreadPoolExecutor(max_workers=max(1, len(targets))) as pool:
+            futures = [pool.submit(run, f) for f in targets]
+            for fut in futures:
+                fut.result()
+        if FRAGMENT_FORMATS & set(targets):
+            _report(f"{self.fragments.summary()} [{self.mode.upper()}]")
+            self.fragments.save()
+
+    def _summary_html(self, model: Dict[str, Any]) -> str:
+        stats: ReportStats = model['stats']
+        summary_html = '<div class="stats-container"><div class="stats-header">통계 요약</div>'
+        for g in model['groups']:
+            m, f = stats.total(group=g['id'], gender='남'), stats.total(group=g['id'], gender='여')
+            sch_str = ", ".join([f"{k}: {v}명" for k, v in sorted(stats.by('school', group=g['id']).items())])
+            summary_html += f'<div class="stats-row"><span class="stats-label">{g["label"]}:</span> <span>총 {m + f}명 (남: {m}명, 여: {f}명)</span>'
+            if sch_str: summary_html += f'<div class="stats-school-list">└ {sch_str}</div>'
+            summary_html += '</div>'
+        total_m, total_f = stats.total(gender='남'), stats.total(gender='여')
+        summary_html += f'<div class="stats-total-box">전체 합격 인원: 총 {total_m + total_f}명 (남: {total_m}명, 여: {total_f}명)</div></div>'
+        return summary_html
+
+    def save_summary(self, model: Dict[str, Any]) -> None:
+        """표 없이 통계 요약 블록만 담은 가벼운 HTML"""
+        filename = os.path.join(os.path.dirname(self._output_path('html')), f"목일중_{self.mode}_통계요약.html")
+        full_html = f"""<!DOCTYPE html><html lang="ko"><head><meta charset="UTF-8"><title>{model['title']} - 통계 요약</title><style>
+        body {{ font-family: 'Malgun Gothic', 'Noto Sans KR', sans-serif; padding: 30px; background: #f9fafb; }}
+        .container {{ max-width: 900px; margin: 0 auto; background: white; padding: 40px; box-shadow: 0 4px 6px rgba(0,0,0,0.1); border-radius: 8px; }}
+        {STATS_CSS}
+        </style></head><body><div class="container">
+        <h2 style="text-align:center; font-weight:bold; margin-bottom: 20px;">{model['title']}</h2>
+        <p style="text-align:right; font-size:10pt; margin-bottom: 5px;">(기준: {model['report_date']} 최종 합불)</p>
+        {self._summary_html(model)}</div></body></html>"""
+
+        status = write_text(filename, full_html)
+        _report(f"✅ [{self.mode.upper()}] 통계 요약 생성 완료: {os.path.abspath(filename)}{status_note(status)}")
+
+    def _thead_html(self, layout: Dict[str, Any], with_filter: bool = True) -> str:
+        """표 헤더 (with_filter=False 이면 검색창 행 없이 2줄)"""
+        rowspan = HEADER_ROWS + 1 if with_filter else HEADER_ROWS
+        thead1 = f'<tr><th rowspan="{rowspan}" class="thick-right" style="width:50px;">학반</th>'
         thead2 = '<tr>'
         thead3 = '<tr>' # 검색 필터 행 추가
         
-        for g in visible_groups:
-            cols = 4 if g['has_dept'] else 3
+        for span in layout['spans']:
+            g, cols = span['group'], span['width']
             thead1 += f'<th colspan="{cols}" class="bg-group thick-right">{g["label"]}</th>'
-            thead2 += '<th style="width:60px;">이름</th><th style="width:40px;">성별</th>'
+            for field, last in self._field_cells(g):
+                right = ' class="thick-right"' if last else ''
+                thead2 += f'<th{HEAD_STYLES.get(field, "")}{right}>{FIELD_LABELS[field]}</th>'
             
             # 검색창 셀 생성 (colspan 적용)
             thead3 += f'<th colspan="{cols}" class="filter-cell thick-right"><input type="text" class="col-filter" data-group="{g["id"]}" placeholder="{g["label"]} 검색" onkeyup="applyColumnFilter()"></th>'
-
-            if g['has_dept']: thead2 += '<th>학교명</th><th class="thick-right">학과</th>'
-            else: thead2 += '<th class="thick-right">학교명</th>'
             
         thead1 += '</tr>'; thead2 += '</tr>'; thead3 += '</tr>'
+        return thead1 + thead2 + (thead3 if with_filter else '')
+
+    @staticmethod
+    def _field_cells(group: Dict[str, Any]) -> List[Tuple[str, bool]]:
+        """그룹 묶음의 (열 이름, 묶음 마지막 열 여부) - 마지막 열은 굵은 오른쪽 테두리"""
+        fields = group_fields(group)
+        return [(field, i == len(fields) - 1) for i, field in enumerate(fields)]
+
+    @staticmethod
+    def _anchor(block: Dict[str, Any], group: Dict[str, Any], r: int) -> str:
+        """학생 이름 칸의 id (통합 검색 포털에서 바로 이동). 예: c3-g2-0"""
+        return f"c{block['num']}-{group['id']}-{r}"
+
+    def _search_docs(self, model: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """통합 검색용 문서 (표의 행 순서, anchor 는 _class_rows_html 의 id 와 같음)"""
+        return [
+            {'anchor': self._anchor(block, g, r), 'name': s['name'], 'class': block['label'], 'group': g['label'],
+             'school': s['school'], 'dept': s['dept'], 'status': s['status']}
+            for block in model['classes'] for r, row in enumerate(block['rows'])
+            for g, s in zip(model['visible_groups'], row) if s is not None
+        ]
+
+    def _class_rows_html(self, block: Dict[str, Any], layout: Dict[str, Any]) -> str:
+        """한 반(block)의 tbody 행들 - 그 반의 표시 데이터가 지난 실행과 같으면 조각 캐시의 HTML 을 그대로 씀"""
+        spans = layout['spans']
+        data = {'num': block['num'], 'label': block['label'], 'height': block['height'],
+                'groups': [[span['group']['id'], group_fields(span['group'])] for span in spans],
+                'rows': [[[s[field] for field in group_fields(span['group'])] if s is not None else None for span, s in zip(spans, row)]
+                         for row in block['rows']]}
+        return self.fragments.render(data, lambda: self._render_class_rows(block, layout))
 
+    def _render_class_rows(self, block: Dict[str, Any], layout: Dict[str, Any]) -> str:
+        """한 반(block)의 tbody 행들을 렌더링 (행 수/빈 칸/학반 rowspan 은 격자 그대로)"""
         tbody = ''
-        stats = {g['id']: {'m':0, 'f':0, 'schools':{}} for g in self.groups}
+        groups = [(span['group'], self._field_cells(span['group'])) for span in layout['spans']]
         
-        for i in range(1, 16):
-            c_data = self.classes[i]
-            row_counts = [len(c_data[g['id']]) for g in visible_groups]
-            max_rows = max(row_counts) if row_counts else 0
-            if max_rows == 0: max_rows = 1
+        for r, row in enumerate(block['rows']):
+            cls_border = 'thick-top' if r == 0 else ''
+            row_cells_html = ""
             
-            for r in range(max_rows):
-                cls_border = 'thick-top' if r == 0 else ''
-                row_cells_html = ""
-                
-                for g in visible_groups:
-                    st_list = c_data[g['id']]
-                    if r < len(st_list):
-                        s = st_list[r]
-                        stats[g['id']]['m' if s['gender']=='남' else 'f'] += 1
-                        sch = s['school']
-                        stats[g['id']]['schools'][sch] = stats[g['id']]['schools'].get(sch, 0) + 1
-                        
-                        # 데이터 속성 추가 (그룹별 검색용)
-                        # school, name, gender 정보를 모두 포함하여 검색 가능하게 함
-                        search_meta = f"{s['school']} {s['name']} {s['gender']}".lower()
-                        data_attrs = f'data-group="{g["id"]}" data-meta="{search_meta}"'
-                        
-                        row_cells_html += f'<td class="{cls_border} col-name" {data_attrs}>{s["name"]}</td><td class="{cls_border} col-gender" {data_attrs}>{s["gender"]}</td>'
-                        if g['has_dept']: row_cells_html += f'<td class="{cls_border} col-school" {data_attrs}>{s["school"]}</td><td class="{cls_border} thick-right" {data_attrs}>{s["dept"]}</td>'
-                        else: row_cells_html += f'<td class="{cls_border} thick-right col-school" {data_attrs}>{s["school"]}</td>'
-                    else:
-                        # 빈 셀 (검색 대상 아님)
-                        row_cells_html += f'<td class="{cls_border}"></td><td class="{cls_border}"></td>'
-                        if g['has_dept']: row_cells_html += f'<td class="{cls_border}"></td><td class="{cls_border} thick-right"></td>'
-                        else: row_cells_html += f'<td class="{cls_border} thick-right"></td>'
-
-                tbody += '<tr>'
-                if r == 0: tbody += f'<td rowspan="{max_rows}" class="{cls_border} thick-right font-bold class-cell">3-{i}</td>'
-                tbody += row_cells_html + '</tr>'
-
-        tfoot = f'<tfoot><tr class="thick-top bg-gray-50 font-bold"><td class="thick-right">남</td>'
-        for g in visible_groups:
-            col = 4 if g['has_dept'] else 3
-            tfoot += f'<td colspan="{col}" class="thick-right">{stats[g["id"]]["m"]}명</td>'
-        tfoot += '</tr><tr class="bg-gray-50 font-bold"><td class="thick-right">여</td>'
-        for g in visible_groups:
-            col = 4 if g['has_dept'] else 3
-            tfoot += f'<td colspan="{col}" class="thick-right">{stats[g["id"]]["f"]}명</td>'
-        tfoot += '</tr><tr class="thick-top bg-group font-bold border-b-2 border-black"><td class="thick-right">계</td>'
-        for g in visible_groups:
-            col = 4 if g['has_dept'] else 3
-            tfoot += f'<td colspan="{col}" class="thick-right">{stats[g["id"]]["m"] + stats[g["id"]]["f"]}명</td>'
-        tfoot += '</tr></tfoot>'
+            for (g, cells), s in zip(groups, row):
+                if s is not None:
+                    # 데이터 속성 추가 (그룹별 검색용)
+                    # school, name, gender 정보를 모두 포함하여 검색 가능하게 함 (검색어는 그룹 첫 칸(이름)에만 한 번)
+                    data_attrs = f'data-group="{g["id"]}"'
+                    for field, last in cells:
+                        css = f'{cls_border}{" thick-right" if last else ""}{BODY_CLASSES.get(field, "")}'
+                        if field == 'name':
+                            search_meta = f"{s['school']} {s['name']} {s['gender']}".lower()
+                            row_cells_html += f'<td id="{self._anchor(block, g, r)}" class="{css}" {data_attrs} data-meta="{search_meta}">{s["name"]}</td>'
+                        else:
+                            row_cells_html += f'<td class="{css}" {data_attrs}>{s[field]}</td>'
+                else:
+                    # 빈 칸 패딩 (검색 대상 아님)
+                    row_cells_html += ''.join(f'<td class="{cls_border}{" thick-right" if last else ""}"></td>' for _, last in cells)
 
-        summary_html = '<div class="stats-container"><div class="stats-header">통계 요약</div>'
-        total_all, total_m, total_f = 0, 0, 0
-        for g in self.groups:
-            st = stats[g['id']]
-            sub_tot = st['m'] + st['f']
-            total_all += sub_tot; total_m += st['m']; total_f += st['f']
-            sch_str = ", ".join([f"{k}: {v}명" for k, v in sorted(st['schools'].items())])
-            summary_html += f'<div class="stats-row"><span class="stats-label">{g["label"]}:</span> <span>총 {sub_tot}명 (남: {st["m"]}명, 여: {st["f"]}명)</span>'
-            if sch_str: summary_html += f'<div class="stats-school-list">└ {sch_str}</div>'
-            summary_html += '</div>'
-        summary_html += f'<div class="stats-total-box">전체 합격 인원: 총 {total_all}명 (남: {total_m}명, 여: {total_f}명)</div></div>'
+            tbody += '<tr>'
+            if r == 0: tbody += f'<td rowspan="{block["height"]}" class="{cls_border} thick-right font-bold class-cell">{block["label"]}</td>'
+            tbody += row_cells_html + '</tr>'
+        return tbody
 
-        output_dir = "reports"
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
-            
-        filename = os.path.join(output_dir, f"목일중_{self.mode}_진학현황.html")
-        full_html = f"""<!DOCTYPE html><html lang="ko"><head><meta charset="UTF-8"><title>{self.title}</title><style>
+    def _tfoot_html(self, layout: Dict[str, Any], stats: ReportStats, **filters: Any) -> str:
+        """남/여/계 합계 행 (filters 로 특정 반만 집계 가능. 예: **{'class': 3})"""
+        tfoot = '<tfoot>'
+        for (label, gender), row_cls in zip(FOOTER_ROWS, FOOT_ROW_CLASSES):
+            tfoot += f'<tr class="{row_cls}"><td class="thick-right">{label}</td>'
+            for span in layout['spans']:
+                n = stats.total(group=span['group']['id'], **({'gender': gender} if gender else {}), **filters)
+                tfoot += f'<td colspan="{span["width"]}" class="thick-right">{n}명</td>'
+            tfoot += '</tr>'
+        tfoot += '</tfoot>'
+        return tfoot
+
+    def save_html(self, model: Dict[str, Any]) -> None:
+        layout = model['layout']
+        stats: ReportStats = model['stats']
+
+        thead = self._thead_html(layout)
+        tbody = ''.join(self._class_rows_html(block, layout) for block in model['classes'])
+        tfoot = self._tfoot_html(layout, stats)
+
+        summary_html = self._summary_html(model)
+
+        filename = self._output_path('html')
+        full_html = f"""<!DOCTYPE html><html lang="ko"><head><meta charset="UTF-8"><title>{model['title']}</title><style>
         body {{ font-family: 'Malgun Gothic', 'Noto Sans KR', sans-serif; padding: 30px; background: #f9fafb; }}
         .container {{ max-width: 1600px; margin: 0 auto; background: white; padding: 40px; box-shadow: 0 4px 6px rgba(0,0,0,0.1); border-radius: 8px; }}
         .print-hide {{ }} @media print {{ .print-hide, .filter-cell {{ display: none !important; }} body {{ padding: 0; background: white; }} .container {{ box-shadow: none; padding: 0; }} }}
@@ -258,18 +735,14 @@ class MokilReportGenerator:
         .bg-group {{ background-color: #e9ecef !important; border-bottom: 2px solid #000 !important; }}
         .thick-top {{ border-top: 2px solid #000 !important; }}
         .thick-right {{ border-right: 2px solid #000 !important; }}
-        .stats-container {{ margin-top: 30px; border-top: 2px solid #000; padding-top: 20px; font-size: 11pt; line-height: 1.6; }}
-        .stats-header {{ font-size: 13pt; font-weight: bold; text-decoration: underline; margin-bottom: 15px; }}
-        .stats-row {{ margin-bottom: 8px; }}
-        .stats-label {{ display: inline-block; font-weight: bold; width: 160px; }}
-        .stats-school-list {{ margin-left: 10px; color: #444; font-size: 10pt; }}
-        .stats-total-box {{ margin-top: 20px; padding-top: 15px; border-top: 1px solid #aaa; font-weight: bold; font-size: 12pt; }}
+        {STATS_CSS}
         .hidden-cell {{ color: transparent; user-select: none; }} /* 텍스트만 숨김 */
+        td:target {{ background: #fef3c7; outline: 3px solid #f59e0b; }} /* 통합 검색에서 이동한 학생 */
         </style></head><body><div class="container">
-        <h2 style="text-align:center; font-weight:bold; margin-bottom: 20px;">{self.title}</h2>
-        <p style="text-align:right; font-size:10pt; margin-bottom: 5px;">(기준: {self.report_date} 최종 합불)</p>
+        <h2 style="text-align:center; font-weight:bold; margin-bottom: 20px;">{model['title']}</h2>
+        <p style="text-align:right; font-size:10pt; margin-bottom: 5px;">(기준: {model['report_date']} 최종 합불)</p>
         
-        <table id="dataTable"><thead>{thead1}{thead2}{thead3}</thead><tbody>{tbody}</tbody>{tfoot}</table>
+        <table id="dataTable"><thead>{thead}</thead><tbody>{tbody}</tbody>{tfoot}</table>
         {summary_html}</div>
         
         <script>
@@ -286,6 +759,8 @@ class MokilReportGenerator:
                     
                     // 해당 행, 해당 그룹의 데이터 셀들 찾기
                     const cells = row.querySelectorAll(`td[data-group="${{groupId}}"]`);
+                    // 검색어는 그룹 첫 칸(이름)에만 있음
+                    const meta = cells.length ? (cells[0].getAttribute('data-meta') || "") : "";
                     
                     cells.forEach(cell => {{
                         if (!keyword) {{
@@ -293,8 +768,6 @@ class MokilReportGenerator:
                             return;
                         }}
                         
-                        const meta = cell.getAttribute('data-meta') || "";
-                        
                         // 메타데이터(학교명,이름,성별)에 키워드가 포함되면 보임, 아니면 숨김(투명화)
                         if (meta.includes(keyword)) {{
                             cell.style.opacity = '1';
@@ -307,63 +780,97 @@ class MokilReportGenerator:
         }}
         </script></body></html>"""
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(full_html)
-        print(f"✅ [{self.mode.upper()}] HTML 파일 생성 완료: {os.path.abspath(filename)}")
-
-    def save_excel(self):
-        output_dir = "reports"
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
-            
-        filename = os.path.join(output_dir, f"목일중_{self.mode}_진학현황.xlsx")
-        visible_groups = [g for g in self.groups if self.counts[g['id']] > 0]
-        data_rows = []
-        
-        header1 = ["학반"]
-        for g in visible_groups:
-            cols = 4 if g['has_dept'] else 3
-            header1.append(g['label']); header1.extend([""] * (cols - 1))
-        data_rows.append(header1)
-
-        header2 = [""]
-        for g in visible_groups:
-            header2.extend(["이름", "성별", "학교명"])
-            if g['has_dept']: header2.append("학과")
-        data_rows.append(header2)
-
-        merge_info = []
-        current_row = 3
-
-        for i in range(1, 16):
-            c_data = self.classes[i]
-            row_counts = [len(c_data[g['id']]) for g in visible_groups]
-            max_rows = max(row_counts) if row_counts else 0
-            if max_rows == 0: max_rows = 1
-            
-            merge_info.append((current_row, current_row + max_rows - 1, 1, f"3-{i}"))
-
-            for r in range(max_rows):
-                row_data = [""] 
-                for g in visible_groups:
-                    st_list = c_data[g['id']]
-                    if r < len(st_list):
-                        s = st_list[r]
-                        row_data.extend([s['name'], s['gender'], s['school']])
-                        if g['has_dept']: row_data.append(s['dept'])
-                    else:
-                        row_data.extend(["", "", ""])
-                        if g['has_dept']: row_data.append("")
-                data_rows.append(row_data)
-            current_row += max_rows
-
-        df_excel = pd.DataFrame(data_rows)
+        status = write_text(filename, full_html)
+        _report(f"✅ [{self.mode.upper()}] HTML 파일 생성 완료: {os.path.abspath(filename)}{status_note(status)}")
+        save_search_partial(OUTPUT_DIR, f"mokil_{self.mode}", model['title'], os.path.basename(filename), self._search_docs(model))
+
+    def _shard_html(self, model: Dict[str, Any], pos: int) -> str:
+        """한 반만 담은 가벼운 페이지 (검색 스크립트 없음, 이전/다음 반 + 목차 링크)"""
+        block = model['classes'][pos]
+        layout = model['layout']
+        stats: ReportStats = model['stats']
+        class_filter = {'class': block['num']}
+
+        nav = f'<a href="../{MAIN_INDEX}">← 전체 목차</a>'
+        if pos > 0: nav += f' · <a href="{self._shard_name(model["classes"][pos - 1])}">◀ {model["classes"][pos - 1]["label"]}</a>'
+        if pos < len(model['classes']) - 1: nav += f' · <a href="{self._shard_name(model["classes"][pos + 1])}">{model["classes"][pos + 1]["label"]} ▶</a>'
+        m, f = stats.total(gender='남', **class_filter), stats.total(gender='여', **class_filter)
+
+        return f"""<!DOCTYPE html><html lang="ko"><head><meta charset="UTF-8"><title>{model['title']} - {block['label']}</title><style>
+        body {{ font-family: 'Malgun Gothic', 'Noto Sans KR', sans-serif; padding: 30px; background: #f9fafb; }}
+        .container {{ max-width: 1200px; margin: 0 auto; background: white; padding: 40px; box-shadow: 0 4px 6px rgba(0,0,0,0.1); border-radius: 8px; }}
+        @media print {{ .print-hide {{ display: none !important; }} body {{ padding: 0; background: white; }} .container {{ box-shadow: none; padding: 0; }} }}
+        .nav {{ font-size: 10pt; margin-bottom: 15px; }} .nav a {{ color: #1d4ed8; text-decoration: none; }}
+        table {{ width: 100%; border-collapse: collapse; text-align: center; border: 2px solid #000; font-size: 10pt; }}
+        th, td {{ border: 1px solid #000; padding: 5px 2px; vertical-align: middle; white-space: nowrap; }}
+        thead th {{ background-color: #f8f9fa; font-weight: bold; border-bottom: 1px solid #000; height: 30px; }}
+        .bg-group {{ background-color: #e9ecef !important; border-bottom: 2px solid #000 !important; }}
+        .thick-top {{ border-top: 2px solid #000 !important; }}
+        .thick-right {{ border-right: 2px solid #000 !important; }}
+        td:target {{ background: #fef3c7; outline: 3px solid #f59e0b; }}
+        </style></head><body><div class="container">
+        <div class="nav print-hide">{nav}</div>
+        <h2 style="text-align:center; font-weight:bold; margin-bottom: 20px;">{model['title']} - {block['label']}</h2>
+        <p style="text-align:right; font-size:10pt; margin-bottom: 5px;">(기준: {model['report_date']} 최종 합불 · {block['label']} 합계 {m + f}명, 남 {m}명 / 여 {f}명)</p>
+        <table><thead>{self._thead_html(layout, with_filter=False)}</thead><tbody>{self._class_rows_html(block, layout)}</tbody>{self._tfoot_html(layout, stats, **class_filter)}</table>
+        </div></body></html>"""
+
+    def save_shards(self, model: Dict[str, Any]) -> None:
+        """반별 페이지(3-1 … 3-15)를 스레드 풀에서 동시에 렌더링/기록합니다."""
+        shard_dir = os.path.join(OUTPUT_DIR, self._shard_dir())
+        os.makedirs(shard_dir, exist_ok=True)
+
+        def render(pos: int) -> str:
+            path = os.path.join(shard_dir, self._shard_name(model['classes'][pos]))
+            return write_text(path, self._shard_html(model, pos))
+
+        try:
+            with ThreadPoolExecutor(max_workers=SHARD_WORKERS) as pool:
+                statuses = list(pool.map(render, range(len(model['classes']))))
+            changed = sum(1 for st in statuses if st != 'unchanged')
+            _report(f"✅ [{self.mode.upper()}] 반별 페이지 {len(statuses)}개 생성 완료 (변경 {changed}개): {os.path.abspath(shard_dir)}")
+        except Exception as e:
+            _report(f"❌ 반별 페이지 저장 실패: {e}")
+
+    def save_excel(self, model: Dict[str, Any]) -> None:
+        """HTML 표와 같은 격자(layout)를 값·서식·병합까지 한 번에 기록 (머리글 2행 + 반별 본문 + 합계 3행)"""
+        filename = self._output_path('xlsx')
+        layout = model['layout']
+        stats: ReportStats = model['stats']
+
+        # grid[r][c]: 표 전체 격자 (0부터, 병합 범위의 첫 칸에만 값)
+        grid: List[List[Any]] = []
+        header1: List[Any] = ["학반"] + [None] * (layout['n_cols'] - 1)
+        header2: List[Any] = [None]
+        for span in layout['spans']:
+            header1[span['col']] = span['group']['label']
+            header2.extend(FIELD_LABELS[field] for field in group_fields(span['group']))
+        grid += [header1, header2]
+
+        for block in model['classes']:
+            for r, row in enumerate(block['rows']):
+                cells: List[Any] = [block['label'] if r == 0 else None]
+                for span, s in zip(layout['spans'], row):
+                    cells.extend(s[field] if s is not None else None for field in group_fields(span['group']))
+                grid.append(cells)
+
+        # 남/여/계 합계 행 (HTML tfoot 과 같은 집계 사용)
+        for label, gender in FOOTER_ROWS:
+            cells = [label] + [None] * (layout['n_cols'] - 1)
+            for span in layout['spans']:
+                n = stats.total(group=span['group']['id'], **({'gender': gender} if gender else {}))
+                cells[span['col']] = f"{n}명"
+            grid.append(cells)
+
+        import openpyxl
+        from openpyxl.styles import Alignment, Border, Side, Font, PatternFill
+        from openpyxl.utils import get_column_letter
 
         try:
-            with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-                df_excel.to_excel(writer, sheet_name='Sheet1', header=False, index=False)
-                workbook = writer.book
-                worksheet = writer.sheets['Sheet1']
+            with atomic_output(filename) as out:
+                workbook = openpyxl.Workbook()
+                worksheet = workbook.active
+                worksheet.title = 'Sheet1'
 
                 thin_border = Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin'))
                 center_align = Alignment(horizontal='center', vertical='center')
@@ -371,42 +878,206 @@ class MokilReportGenerator:
                 header_font = Font(name='맑은 고딕', size=10, bold=True)
                 base_font = Font(name='맑은 고딕', size=10)
 
-                for row in worksheet.iter_rows():
-                    for cell in row:
-                        cell.border = thin_border; cell.alignment = center_align; cell.font = base_font
-                        if cell.row <= 2: cell.fill = header_fill; cell.font = header_font
-
-                col_idx = 2
-                for g in visible_groups:
-                    cols = 4 if g['has_dept'] else 3
-                    if cols > 1:
-                        worksheet.merge_cells(start_row=1, start_column=col_idx, end_row=1, end_column=col_idx + cols - 1)
-                        worksheet.cell(row=1, column=col_idx).value = g['label']
-                    col_idx += cols
-
-                for r_start, r_end, c_idx, val in merge_info:
-                    if r_start == r_end: worksheet.cell(row=r_start, column=c_idx).value = val
-                    else:
-                        worksheet.merge_cells(start_row=r_start, start_column=c_idx, end_row=r_end, end_column=c_idx)
-                        worksheet.cell(row=r_start, column=c_idx).value = val
-
-                worksheet.column_dimensions['A'].width = 8
-                curr_col = 2
-                for g in visible_groups:
-                    worksheet.column_dimensions[get_column_letter(curr_col)].width = 10
-                    worksheet.column_dimensions[get_column_letter(curr_col+1)].width = 6
-                    worksheet.column_dimensions[get_column_letter(curr_col+2)].width = 18
-                    if g['has_dept']:
-                        worksheet.column_dimensions[get_column_letter(curr_col+3)].width = 18
-                        curr_col += 4
-                    else: curr_col += 3
-
-            print(f"✅ [{self.mode.upper()}] 엑셀 파일 생성 완료: {os.path.abspath(filename)}")
+                for r, cells in enumerate(grid):
+                    emphasized = r < HEADER_ROWS or r >= layout['footer_top']
+                    for c, value in enumerate(cells):
+                        cell = worksheet.cell(row=r + 1, column=c + 1, value=value)
+                        cell.border = thin_border; cell.alignment = center_align
+                        cell.font = header_font if emphasized else base_font
+                        if emphasized: cell.fill = header_fill
+
+                for r0, c0, r1, c1 in layout['merges']:
+                    worksheet.merge_cells(start_row=r0 + 1, start_column=c0 + 1, end_row=r1 + 1, end_column=c1 + 1)
+
+                worksheet.column_dimensions['A'].width = EXCEL_CLASS_WIDTH
+                for span in layout['spans']:
+                    for i, field in enumerate(group_fields(span['group'])):
+                        worksheet.column_dimensions[get_column_letter(span['col'] + i + 1)].width = EXCEL_FIELD_WIDTHS[field]
+                workbook.save(out.tmp)
+
+            _report(f"✅ [{self.mode.upper()}] 엑셀 파일 생성 완료: {os.path.abspath(filename)}{status_note(out.status)}")
+        except Exception as e:
+            _report(f"❌ 엑셀 저장 실패: {e}")
+
+    def save_csv(self, model: Dict[str, Any]) -> None:
+        """학생 한 명당 한 행의 CSV (엑셀에서 바로 열리도록 utf-8-sig)"""
+        filename = self._output_path('csv')
+        try:
+            with atomic_output(filename) as out, open(out.tmp, 'w', encoding='utf-8-sig', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(["학반", "구분", "이름", "성별", "학교명", "학과"])
+                for block in model['classes']:
+                    for row in block['rows']:
+                        for g, s in zip(model['visible_groups'], row):
+                            if s is None: continue
+                            writer.writerow([block['label'], g['label'], s['name'], s['gender'], s['school'], s['dept']])
+            _report(f"✅ [{self.mode.upper()}] CSV 파일 생성 완료: {os.path.abspath(filename)}{status_note(out.status)}")
+        except Exception as e:
+            _report(f"❌ CSV 저장 실패: {e}")
+
+    def save_json(self, model: Dict[str, Any]) -> None:
+        """반 → 그룹 → 학생 구조의 JSON (빈 칸 패딩 없이 실제 학생만 기록)"""
+        filename = self._output_path('json')
+        payload = {
+            'title': model['title'],
+            'mode': model['mode'],
+            'report_date': model['report_date'],
+            'groups': [{'id': g['id'], 'label': g['label']} for g in model['visible_groups']],
+            'classes': [
+                {
+                    'class': block['label'],
+                    'students': {
+                        g['id']: [row[k] for row in block['rows'] if row[k] is not None]
+                        for k, g in enumerate(model['visible_groups'])
+                    },
+                }
+                for block in model['classes']
+            ],
+        }
+        try:
+            status = write_text(filename, json.dumps(payload, ensure_ascii=False, indent=1))
+            _report(f"✅ [{self.mode.upper()}] JSON 파일 생성 완료: {os.path.abspath(filename)}{status_note(status)}")
         except Exception as e:
-            print(f"❌ 엑셀 저장 실패: {e}")
+            _report(f"❌ JSON 저장 실패: {e}")
+
+def save_results_cube(generators: List[MokilReportGenerator]) -> None:
+    """
+    전기고/후기고 학생 레코드를 연도 × 반 × 그룹 × 성별 × 상태 큐브로 집계해
+    reports/.cube/ 에 누적 저장(같은 연도는 교체)하고 단면 리포트를 만듭니다.
+    """
+    records = [
+        {'year': year_from_title(g.title), 'class': f"3-{i}", 'group': grp['label'], 'gender': s['gender'], 'status': s['status']}
+        for g in generators for i, c_data in g.classes.items() for grp in g.groups for s in c_data[grp['id']]
+    ]
+    if not records: return
+    path = cube_path(OUTPUT_DIR, 'mokil_high_school_results_gen')
+    with METRICS.timer('render_seconds', report='all', stage='cube'):
+        cube, status = update_cube(path, records)
+        print(f"🧊 결과 큐브 저장: {path} (연도 {', '.join(cube.axes['year'])}){status_note(status)}")
+        render_cube_html(cube, "목일중 진학 현황 통계 (반 · 유형 · 성별 · 연도)", os.path.join(OUTPUT_DIR, CUBE_REPORT),
+                         year=year_from_title(generators[0].title))
+
+def save_main_index(generators: List[MokilReportGenerator]) -> None:
+    """
+    reports/main.html: 전기고/후기고 반별 페이지 링크와 학교 전체 합계를 담은 목차.
+    각 생성기가 export() 에서 만든 리포트 모델(집계 포함)만 사용합니다.
+    """
+    reports = [g for g in generators if g.model is not None and g.model['classes']]
+    if not reports: return
+
+    # 학교 전체 합계 (모드별 + 합산)
+    total_cards = ''
+    grand_m = grand_f = 0
+    for g in reports:
+        stats: ReportStats = g.model['stats']
+        m, f = stats.total(gender='남'), stats.total(gender='여')
+        grand_m += m; grand_f += f
+        groups = ' · '.join(f"{grp['label']} {stats.total(group=grp['id'])}명" for grp in g.model['visible_groups'])
+        total_cards += f"""<div class="card"><div class="card-title">{g.model['title']}</div>
+            <div class="card-num">{m + f}명</div><div class="card-sub">남 {m}명 / 여 {f}명</div><div class="card-sub">{groups or '-'}</div>
+            <div class="card-sub"><a href="{os.path.basename(g._output_path('html'))}">전체 표 보기</a></div></div>"""
+
+    # 반별 링크 표 (행: 반, 열: 모드)
+    head = '<tr><th>학반</th>' + ''.join(f"<th>{g.model['title']}</th>" for g in reports) + '</tr>'
+    by_class = [g.model['stats'].by('class') for g in reports]
+    body = ''
+    for num in range(1, 16):
+        body += f'<tr><td class="font-bold">3-{num}</td>'
+        for g, counts in zip(reports, by_class):
+            block = next((b for b in g.model['classes'] if b['num'] == num), None)
+            if block is None: body += '<td>-</td>'; continue
+            body += f'<td><a href="{g._shard_dir()}/{g._shard_name(block)}">{counts.get(num, 0)}명</a></td>'
+        body += '</tr>'
+
+    updated = datetime.datetime.now().strftime('%Y-%m-%d %H:%M')
+    html = f"""<!DOCTYPE html><html lang="ko"><head><meta charset="UTF-8"><title>목일중 진학 현황</title><style>
+        body {{ font-family: 'Malgun Gothic', 'Noto Sans KR', sans-serif; padding: 30px; background: #f9fafb; }}
+        .container {{ max-width: 900px; margin: 0 auto; background: white; padding: 40px; box-shadow: 0 4px 6px rgba(0,0,0,0.1); border-radius: 8px; }}
+        .cards {{ display: flex; gap: 15px; margin-bottom: 25px; flex-wrap: wrap; }}
+        .card {{ flex: 1; min-width: 220px; border: 1px solid #ddd; border-radius: 8px; padding: 15px; text-align: center; }}
+        .card-title {{ font-size: 10pt; color: #555; }} .card-num {{ font-size: 22pt; font-weight: bold; }} .card-sub {{ font-size: 10pt; color: #444; margin-top: 4px; }}
+        table {{ width: 100%; border-collapse: collapse; text-align: center; font-size: 11pt; }}
+        th, td {{ border: 1px solid #000; padding: 6px; }} thead th {{ background-color: #e9ecef; }}
+        a {{ color: #1d4ed8; text-decoration: none; }} .font-bold {{ font-weight: bold; }}
+        </style></head><body><div class="container">
+        <h2 style="text-align:center; font-weight:bold; margin-bottom: 5px;">목일중 진학 현황</h2>
+        <p style="text-align:right; font-size:10pt; color:#666;">학교 전체 합격 인원: 총 {grand_m + grand_f}명 (남: {grand_m}명, 여: {grand_f}명) · 업데이트: {updated}</p>
+        <div class="cards">{total_cards}</div>
+        <table><thead>{head}</thead><tbody>{body}</tbody></table>
+        </div></body></html>"""
+
+    filename = os.path.join(OUTPUT_DIR, MAIN_INDEX)
+    status = write_text(filename, html)
+    print(f"✅ 목차 페이지 생성 완료: {os.path.abspath(filename)}{status_note(status)}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="목일중 진학 현황 자동 생성기")
+    parser.add_argument('--formats', default=None,
+                        help=f"출력 형식 (쉼표 구분, 기본: {','.join(EXPORT_FORMATS)} / 라이트 모드: {','.join(LIGHT_FORMATS)})")
+    parser.add_argument('--light', action='store_true',
+                        help="pandas/openpyxl 없이 표준 csv 모듈로 파싱하고 HTML/CSV/JSON만 생성")
+    parser.add_argument('--early-source', default=None, help="전기고 데이터 URL 또는 로컬 CSV 경로")
+    parser.add_argument('--late-source', default=None, help="후기고 데이터 URL 또는 로컬 CSV 경로")
+    parser.add_argument('--summary-only', action='store_true', help="표 없이 통계 요약 HTML만 생성")
+    parser.add_argument('--chunked', type=int, nargs='?', const=DEFAULT_CHUNK_ROWS, default=None, metavar='ROWS',
+                        help=f"대용량 입력용 청크 모드 (ROWS행 단위 처리, 기본 {DEFAULT_CHUNK_ROWS})")
+    parser.add_argument('--typed', action='store_true',
+                        help="헤더 위치로 필요한 열만 읽고 반/성별/합불/학교를 범주형으로 로딩 (대용량 입력 메모리 절감, 스냅샷 저장 안 함)")
+    parser.add_argument('--workbook', nargs='?', const=workbook_url(SHEET_URLS['early']), default=None, metavar='PATH_OR_URL',
+                        help="전기/후기 CSV 두 번 대신 스프레드시트 전체 XLSX 한 파일에서 읽기 (값 없이 쓰면 내려받아 .cache/workbooks 에 저장, "
+                             "경로를 주면 오프라인 / --chunked, --typed, --from-snapshot 보다 우선)")
+    parser.add_argument('--budget', type=float, default=None, metavar='SECONDS',
+                        help="실행 전체 제한 시간(초). 수집/파싱이 넘으면 마지막 성공 데이터로 만들고 HTML 에 '최신 데이터 아님' 표시")
+    parser.add_argument('--stage-budget', type=stage_budget, nargs='+', default=[], metavar='STAGE=SECONDS',
+                        help="단계별 제한 시간 (예: fetch=20 parse=5 render=10, 전기/후기 합산)")
+    parser.add_argument('--sharded', action='store_true',
+                        help=f"반별 페이지(3-1 … 3-15)와 {OUTPUT_DIR}/{MAIN_INDEX} 목차를 함께 생성")
+    parser.add_argument('--from-snapshot', nargs='?', const='latest', default=None, metavar='WHEN',
+                        help="다운로드/파싱 없이 저장된 스냅샷에서 읽기 (기본 latest, 또는 수집 시각 예: 20261019-0930)")
+    parser.add_argument('--no-cube', action='store_true',
+                        help=f"결과 큐브(.npz)와 {CUBE_REPORT} 생략 (라이트 모드는 항상 생략)")
+    parser.add_argument('--no-validate', action='store_true',
+                        help="데이터 검증(중복/전기·후기 충돌/반 값/합불 모순) 생략")
+    parser.add_argument('--no-fragment-cache', action='store_true',
+                        help="반별 표 HTML 조각 캐시(.cache/fragments) 없이 매번 모든 반을 렌더링")
+    parser.add_argument('--compact', action='store_true',
+                        help="HTML 축소 (반복 class 목록을 짧은 클래스로 합치고 공백/주석 제거)")
+    parser.add_argument('--gzip', action='store_true', help="HTML 옆에 미리 압축한 .html.gz 사본도 기록")
+    args = parser.parse_args()
+    enable_compact(args.compact, args.gzip)
+    default_formats = LIGHT_FORMATS if args.light else EXPORT_FORMATS
+    formats = tuple(f.strip() for f in args.formats.split(',') if f.strip()) if args.formats else default_formats
+    if args.summary_only: formats = SUMMARY_FORMATS
+    if args.sharded and 'shards' not in formats: formats += SHARD_FORMATS
+
     print("=== 목일중 진학 현황 자동 생성기 (V22: Independent Filter) ===")
-    MokilReportGenerator('early').process()
+    budget = RunBudget(args.budget, dict(args.stage_budget))
+    early = MokilReportGenerator('early', light=args.light, source=args.early_source, chunk_rows=args.chunked,
+                                 snapshot=args.from_snapshot, typed=args.typed, workbook=args.workbook, budget=budget,
+                                 fragment_cache=not args.no_fragment_cache)
+    early.process(formats)
     print("\n" + "-"*50 + "\n")
-    MokilReportGenerator('late').process()
\ No newline at end of file
+    late = MokilReportGenerator('late', light=args.light, source=args.late_source, chunk_rows=args.chunked,
+                                snapshot=args.from_snapshot, typed=args.typed, workbook=args.workbook, budget=budget,
+                                fragment_cache=not args.no_fragment_cache)
+    late.process(formats)
+
+    def finish() -> None:
+        # 전기/후기 공용 출력 (둘 중 하나라도 대체 데이터면 오래된 쪽 수집 시각으로 표시)
+        stale = [g.stale for g in (early, late) if g.stale]
+        if stale: mark_stale(**min(stale, key=lambda n: n['fetched_at']))
+        if not args.no_validate and (early.checks or late.checks):
+            run_validation(early.checks + late.checks, OUTPUT_DIR, max_class=max(early.classes), vectorized=not args.light)
+        if 'shards' in formats: save_main_index([early, late])
+        if not (args.light or args.no_cube): save_results_cube([early, late])
+        save_portal(OUTPUT_DIR)
+
+    try:
+        budget.run('render', finish)
+    except BudgetExceeded as e:
+        print(f"❌ {e} - 아직 기록하지 못한 리포트는 이전 파일이 그대로 남습니다.")
+    report_compaction()
+    save_run_manifest(OUTPUT_DIR)
+    record_resolver(get_resolver())
+    save_run_metrics(OUTPUT_DIR)
+    if budget.render_overrun: raise SystemExit(1)
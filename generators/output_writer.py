@@ -0,0 +1,217 @@
+import os
+import re
+import sys
+import gzip
+import json
+import time
+import hashlib
+import zipfile
+import threading
+import contextlib
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Pattern
+
+from html_compact import COMPACT_OPTIONS, compact_html, gzip_bytes, record_size
+
+# ==========================================
+# 1. 설정 정보
+# ==========================================
+# 내용 비교 시 무시할 값 (실행할 때마다 바뀌는 생성 시각 등)
+VOLATILE_PATTERNS: List[Pattern[str]] = [
+    re.compile(r"업데이트: [0-9\-: ]+"),
+]
+# 엑셀(zip) 안에서 저장 시각만 담긴 멤버
+VOLATILE_ZIP_MEMBERS = ('docProps/core.xml',)
+# 멤버 단위로 비교하는 zip 형식 (zip 헤더의 저장 시각은 무시)
+ZIP_EXTENSIONS = ('.xlsx', '.npz')
+TEXT_EXTENSIONS = ('.html', '.htm', '.csv', '.json', '.js', '.txt', '.svg')
+RUN_MANIFEST_DIR = '.runs'
+# 마지막 성공 데이터로 대체한 실행이면 HTML 맨 위에 붙이는 표시 (run_budget.use_last_good 이 mark_stale 로 설정)
+STALE_NOTICE: Dict[str, Any] = {'fetched_at': None, 'reason': ''}
+STALE_BANNER = ('<div class="stale-banner" role="alert" style="background:#fff3cd;color:#7a4b00;border-bottom:2px solid #e0a800;'
+                'padding:10px 16px;font-weight:bold;text-align:center;">⚠️ 최신 데이터가 아닙니다 - '
+                '{when} 에 수집한 데이터로 만든 리포트입니다 ({reason})</div>')
+BODY_TAG = re.compile(r"<body[^>]*>", re.IGNORECASE)
+
+# ==========================================
+# 2. 내용 해시 (휘발성 필드 제외)
+# ==========================================
+def content_digest(path: str) -> str:
+    """생성 시각처럼 매 실행마다 바뀌는 부분을 제외한 내용 해시"""
+    h = hashlib.sha256()
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ZIP_EXTENSIONS:
+        with zipfile.ZipFile(path) as zf:
+            for name in sorted(zf.namelist()):
+                if name in VOLATILE_ZIP_MEMBERS: continue
+                h.update(name.encode('utf-8')); h.update(zf.read(name))
+    elif ext in TEXT_EXTENSIONS or (ext == '.gz' and os.path.splitext(path[:-3])[1].lower() in TEXT_EXTENSIONS):
+        # .html.gz 는 압축을 풀어 같은 기준(휘발성 필드 제외)으로 비교
+        opener = gzip.open if ext == '.gz' else open
+        with opener(path, 'rt', encoding='utf-8', errors='surrogateescape') as f:
+            text = f.read()
+        for pattern in VOLATILE_PATTERNS:
+            text = pattern.sub('', text)
+        h.update(text.encode('utf-8', errors='surrogateescape'))
+    else:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 16), b''):
+                h.update(block)
+    return h.hexdigest()
+
+# ==========================================
+# 3. 실행 매니페스트
+# ==========================================
+class RunManifest:
+    """이번 실행에서 기록을 시도한 파일과 결과(new / updated / unchanged)"""
+
+    def __init__(self) -> None:
+        self.started = datetime.now()
+        self.entries: List[Dict[str, Any]] = []
+        self.lock = threading.Lock()
+
+    def record(self, path: str, status: str, digest: str, seconds: float = 0.0) -> None:
+        with self.lock:
+            self.entries.append({'path': path, 'status': status, 'sha256': digest, 'seconds': round(seconds, 4)})
+
+    def changed(self) -> List[str]:
+        return [e['path'] for e in self.entries if e['status'] != 'unchanged']
+
+    def save(self, output_dir: str, name: Optional[str] = None) -> str:
+        """output_dir/.runs/<생성기>.json 에 기록하고 경로를 반환합니다."""
+        name = name or os.path.splitext(os.path.basename(sys.argv[0]))[0] or 'run'
+        run_dir = os.path.join(output_dir, RUN_MANIFEST_DIR)
+        os.makedirs(run_dir, exist_ok=True)
+        path = os.path.join(run_dir, f"{name}.json")
+        with self.lock:
+            payload = {
+                'generator': name,
+                'started': self.started.isoformat(timespec='seconds'),
+                'finished': datetime.now().isoformat(timespec='seconds'),
+                'changed': sum(1 for e in self.entries if e['status'] != 'unchanged'),
+                'files': sorted(self.entries, key=lambda e: e['path']),
+            }
+        _replace_text(path, json.dumps(payload, ensure_ascii=False, indent=1))
+        return path
+
+RUN_MANIFEST = RunManifest()
+
+def save_run_manifest(output_dir: str, name: Optional[str] = None) -> None:
+    path = RUN_MANIFEST.save(output_dir, name)
+    changed = RUN_MANIFEST.changed()
+    print(f"🗂️ 변경된 파일 {len(changed)}개 / 전체 {len(RUN_MANIFEST.entries)}개 (기록: {path})")
+
+# ==========================================
+# 4. 원자적 기록
+# ==========================================
+def _temp_path(path: str) -> str:
+    # 확장자를 유지해야 엑셀 writer 등이 형식을 올바르게 판단함
+    base, ext = os.path.splitext(path)
+    if ext.lower() == '.gz':  # .html.gz 처럼 이중 확장자는 통째로 유지
+        base, inner = os.path.splitext(base)
+        ext = inner + ext
+    return f"{base}.tmp-{os.getpid()}-{threading.get_ident()}{ext}"
+
+def _replace_text(path: str, text: str) -> None:
+    tmp = _temp_path(path)
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+def commit_output(tmp_path: str, path: str, started: Optional[float] = None) -> str:
+    """
+    임시 파일을 기존 파일과 비교해 내용이 같으면 버리고, 다르면 원자적으로 교체합니다.
+    반환값: 'new' / 'updated' / 'unchanged' (started 를 주면 그때부터의 기록 시간도 매니페스트에 남김)
+    """
+    started = time.perf_counter() if started is None else started
+    digest = content_digest(tmp_path)
+    if os.path.exists(path):
+        try:
+            same = content_digest(path) == digest
+        except (OSError, zipfile.BadZipFile):
+            same = False
+        if same:
+            os.remove(tmp_path)
+            RUN_MANIFEST.record(path, 'unchanged', digest, time.perf_counter() - started)
+            return 'unchanged'
+        status = 'updated'
+    else:
+        status = 'new'
+    os.replace(tmp_path, path)
+    RUN_MANIFEST.record(path, status, digest, time.perf_counter() - started)
+    return status
+
+class OutputsClosed(Exception):
+    """close_outputs() 이후의 기록 시도 (제한 시간을 넘겨 버려진 렌더링 스레드 등)"""
+
+_outputs_closed = threading.Event()
+
+def close_outputs() -> None:
+    """이후 atomic_output 기록을 반영하지 않음 (렌더링이 제한 시간을 넘으면 남은 출력은 이전 파일 유지)"""
+    _outputs_closed.set()
+
+class PendingOutput:
+    """atomic_output 이 넘겨주는 임시 경로와, 반영 후의 결과 상태"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.tmp = _temp_path(path)
+        self.status = ''
+        self.started = time.perf_counter()
+
+@contextlib.contextmanager
+def atomic_output(path: str) -> Iterator[PendingOutput]:
+    """
+    with atomic_output(path) as out: ... out.tmp 에 기록한 뒤 블록이 끝나면 commit_output 으로 반영합니다.
+    기록 중 예외가 나면 임시 파일만 지우고 기존 파일은 그대로 둡니다. close_outputs() 이후에는 반영하지 않습니다.
+    """
+    if _outputs_closed.is_set(): raise OutputsClosed(path)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    out = PendingOutput(path)
+    try:
+        yield out
+        if _outputs_closed.is_set(): raise OutputsClosed(path)
+    except BaseException:
+        if os.path.exists(out.tmp): os.remove(out.tmp)
+        raise
+    out.status = commit_output(out.tmp, path, out.started)
+
+def mark_stale(fetched_at: Optional[datetime], reason: str = '') -> None:
+    """이후 기록하는 HTML 에 '최신 데이터 아님' 표시를 붙임 (None 이면 해제)"""
+    STALE_NOTICE['fetched_at'] = fetched_at
+    STALE_NOTICE['reason'] = reason
+
+def _stamp_stale(text: str) -> str:
+    fetched_at = STALE_NOTICE['fetched_at']
+    if fetched_at is None: return text
+    banner = STALE_BANNER.format(when=fetched_at.strftime('%Y-%m-%d %H:%M'), reason=STALE_NOTICE['reason'])
+    match = BODY_TAG.search(text)
+    return text[:match.end()] + banner + text[match.end():] if match else banner + text
+
+def write_text(path: str, text: str, encoding: str = 'utf-8') -> str:
+    """
+    텍스트 출력 기록 (변경 없으면 파일을 건드리지 않음). 상태 문자열을 반환합니다.
+    --compact / --gzip 이 켜져 있으면 HTML 은 축소해서 쓰고 .html.gz 사본도 함께 기록합니다.
+    """
+    is_html = path.lower().endswith(('.html', '.htm'))
+    if is_html: text = _stamp_stale(text)
+    original = len(text.encode(encoding)) if is_html else 0
+    if is_html and COMPACT_OPTIONS['enabled']:
+        text = compact_html(text)
+    with atomic_output(path) as out:
+        with open(out.tmp, 'w', encoding=encoding) as f:
+            f.write(text)
+    if is_html and (COMPACT_OPTIONS['enabled'] or COMPACT_OPTIONS['gzip']):
+        gzipped = None
+        if COMPACT_OPTIONS['gzip']:
+            data = gzip_bytes(text)
+            with atomic_output(path + '.gz') as gz_out:
+                with open(gz_out.tmp, 'wb') as f:
+                    f.write(data)
+            gzipped = len(data)
+        record_size(path, original, len(text.encode(encoding)), gzipped)
+    return out.status
+
+def status_note(status: str) -> str:
+    """완료 메시지 뒤에 붙일 설명"""
+    return ' (변경 없음)' if status == 'unchanged' else ''
@@ -0,0 +1,61 @@
+from collections import Counter
+from typing import List, Dict, Tuple, Any, Iterable
+
+# ==========================================
+# 집계 엔진: 반 × 그룹 × 성별 × 학교 × 상태
+# ==========================================
+STAT_DIMENSIONS: Tuple[str, ...] = ('class', 'group', 'gender', 'school', 'status')
+
+class ReportStats:
+    """
+    학생 레코드를 STAT_DIMENSIONS 조합별 인원수로 한 번만 집계해 두고,
+    모든 렌더러/요약 블록이 같은 결과를 조회하도록 합니다 (렌더링 순서와 무관).
+    """
+
+    def __init__(self, counts: Dict[Tuple[Any, ...], int]):
+        self.counts = counts
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]], vectorized: bool = True) -> 'ReportStats':
+        """
+        vectorized=True 이면 pandas groupby 로, False 이면 Counter 한 번 순회로 집계합니다.
+        (라이트 모드 / pandas 미사용 생성기는 False)
+        """
+        records = list(records)
+        if not records:
+            return cls({})
+
+        if vectorized:
+            import pandas as pd
+            df = pd.DataFrame.from_records(records, columns=list(STAT_DIMENSIONS))
+            sizes = df.groupby(list(STAT_DIMENSIONS), sort=False, dropna=False).size()
+            # numpy 스칼라 키는 파이썬 기본형으로 (JSON 직렬화 / dict 조회 일관성)
+            return cls({tuple(v.item() if hasattr(v, 'item') else v for v in key): int(n) for key, n in sizes.items()})
+
+        return cls(dict(Counter(tuple(r.get(d) for d in STAT_DIMENSIONS) for r in records)))
+
+    def _matches(self, key: Tuple[Any, ...], filters: Dict[str, Any]) -> bool:
+        for dim, val in filters.items():
+            if key[STAT_DIMENSIONS.index(dim)] != val: return False
+        return True
+
+    def total(self, **filters: Any) -> int:
+        """필터에 맞는 인원수. 예: stats.total(group='g1', gender='남')"""
+        return sum(n for key, n in self.counts.items() if self._matches(key, filters))
+
+    def by(self, *dims: str, **filters: Any) -> Dict[Any, int]:
+        """
+        필터에 맞는 인원을 dims 기준으로 묶어 반환합니다.
+        차원이 하나면 값 자체가, 여러 개면 튜플이 키가 됩니다.
+        """
+        positions = [STAT_DIMENSIONS.index(d) for d in dims]
+        result: Dict[Any, int] = {}
+        for key, n in self.counts.items():
+            if not self._matches(key, filters): continue
+            sub = key[positions[0]] if len(positions) == 1 else tuple(key[p] for p in positions)
+            result[sub] = result.get(sub, 0) + n
+        return result
+
+    def to_rows(self) -> List[Dict[str, Any]]:
+        """JSON 등으로 내보내기 위한 평탄화 (차원값 + count)"""
+        return [dict(zip(STAT_DIMENSIONS, key), count=n) for key, n in self.counts.items()]
@@ -0,0 +1,355 @@
+import os
+import re
+import sys
+import time
+import argparse
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from output_writer import atomic_output, write_text, status_note
+
+# numpy 는 실제로 쓰는 시점에 import (라이트 모드/짧은 예약 작업의 기동 시간 단축)
+
+# ==========================================
+# 1. 설정 정보
+# ==========================================
+# 연도 × 반 × 그룹 × 성별 × 상태 인원수 큐브
+CUBE_DIMENSIONS: Tuple[str, ...] = ('year', 'class', 'group', 'gender', 'status')
+CUBE_DIR_NAME = '.cube'
+# 상태 표시 순서 (그 밖의 값은 뒤에 가나다순)
+STATUS_ORDER = ('합격', '진행', '불합격', '지원', '지원중')
+PASS_STATUS = '합격'
+FAIL_STATUS = '불합격'
+YEAR_PATTERN = re.compile(r"(\d{4})학년도")
+
+def year_from_title(title: str) -> str:
+    """'2026학년도 목일중 ...' → '2026' (없으면 올해)"""
+    m = YEAR_PATTERN.search(title or '')
+    return m.group(1) if m else str(datetime.now().year)
+
+def cube_path(output_dir: str, name: str) -> str:
+    return os.path.join(output_dir, CUBE_DIR_NAME, f"{name}.npz")
+
+def _axis_sort_key(dim: str, value: str) -> Tuple[Any, ...]:
+    if dim in ('year', 'class'):
+        nums = re.findall(r'\d+', value)
+        return (0, int(nums[-1]) if nums else 0, value)
+    if dim == 'status' and value in STATUS_ORDER:
+        return (0, STATUS_ORDER.index(value), value)
+    return (1, 0, value)
+
+# ==========================================
+# 2. 결과 큐브 (numpy 다차원 배열)
+# ==========================================
+class ResultsCube:
+    """
+    CUBE_DIMENSIONS 조합별 인원수를 담은 다차원 배열.
+    axes[d] 는 d번째 차원의 값 목록, counts[i, j, ...] 는 그 조합의 인원수입니다.
+    슬라이스/합계는 배열 연산이라 질문 하나에 수 밀리초면 됩니다 (다시 내려받을 필요 없음).
+    """
+
+    def __init__(self, axes: Dict[str, List[str]], counts: Any):
+        self.axes = axes
+        self.counts = counts
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> 'ResultsCube':
+        """레코드(차원값 dict) → 큐브. 차원값을 코드로 바꾼 뒤 bincount 한 번으로 집계합니다."""
+        import numpy as np
+
+        records = list(records)
+        axes: Dict[str, List[str]] = {}
+        codes = []
+        for d in CUBE_DIMENSIONS:
+            values = np.array([str(r.get(d, '')) for r in records], dtype=np.str_)
+            uniques, inverse = np.unique(values, return_inverse=True)
+            # np.unique 는 사전순 → 표시 순서(반 번호, 상태 순서 등)로 코드 재배치
+            order = sorted(range(len(uniques)), key=lambda i, d=d: _axis_sort_key(d, str(uniques[i])))
+            remap = np.empty(len(uniques), dtype=np.intp)
+            remap[order] = np.arange(len(uniques))
+            axes[d] = [str(uniques[i]) for i in order]
+            codes.append(remap[inverse.ravel()])
+        shape = tuple(len(axes[d]) for d in CUBE_DIMENSIONS)
+        if not records:
+            return cls(axes, np.zeros(shape, dtype=np.int32))
+        flat = np.ravel_multi_index(codes, shape)
+        counts = np.bincount(flat, minlength=int(np.prod(shape))).astype(np.int32).reshape(shape)
+        return cls(axes, counts)
+
+    # ---------- 저장 / 불러오기 ----------
+    def save(self, path: str) -> str:
+        """.npz (counts + 차원별 값 목록). 내용이 같으면 파일을 건드리지 않습니다."""
+        import numpy as np
+
+        arrays = {'counts': self.counts, 'dims': np.array(CUBE_DIMENSIONS)}
+        for d in CUBE_DIMENSIONS:
+            arrays[f"axis_{d}"] = np.array(self.axes[d], dtype=np.str_)
+        with atomic_output(path) as out:
+            np.savez_compressed(out.tmp, **arrays)
+        return out.status
+
+    @classmethod
+    def load(cls, path: str) -> 'ResultsCube':
+        import numpy as np
+
+        with np.load(path, allow_pickle=False) as data:
+            dims = tuple(str(d) for d in data['dims'])
+            if dims != CUBE_DIMENSIONS:
+                raise ValueError(f"큐브 차원이 다릅니다: {dims}")
+            axes = {d: [str(v) for v in data[f"axis_{d}"]] for d in CUBE_DIMENSIONS}
+            return cls(axes, data['counts'].copy())
+
+    # ---------- 합치기 ----------
+    def merge(self, other: 'ResultsCube', replace_years: bool = True) -> 'ResultsCube':
+        """
+        두 큐브를 차원값 합집합 위에서 더합니다.
+        replace_years=True 이면 other 에 있는 연도는 self 쪽 값을 버리고 other 로 교체 (같은 해 재실행).
+        """
+        import numpy as np
+
+        base = self
+        if replace_years:
+            keep = [i for i, y in enumerate(self.axes['year']) if y not in set(other.axes['year'])]
+            base = ResultsCube(dict(self.axes, year=[self.axes['year'][i] for i in keep]), self.counts[keep])
+        axes = {d: sorted(set(base.axes[d]) | set(other.axes[d]), key=lambda v, d=d: _axis_sort_key(d, v))
+                for d in CUBE_DIMENSIONS}
+        counts = np.zeros(tuple(len(axes[d]) for d in CUBE_DIMENSIONS), dtype=np.int32)
+        for cube in (base, other):
+            if cube.counts.size == 0: continue
+            index = np.ix_(*[[axes[d].index(v) for v in cube.axes[d]] for d in CUBE_DIMENSIONS])
+            counts[index] += cube.counts
+        return ResultsCube(axes, counts)
+
+    # ---------- 조회 ----------
+    def _filter_index(self, filters: Dict[str, Any]) -> Tuple[Any, ...]:
+        index: List[Any] = []
+        for d in CUBE_DIMENSIONS:
+            if d not in filters:
+                index.append(slice(None))
+                continue
+            wanted = filters[d] if isinstance(filters[d], (list, tuple, set)) else [filters[d]]
+            index.append([i for i, v in enumerate(self.axes[d]) if v in {str(w) for w in wanted}])
+        return tuple(index)
+
+    def slice(self, **filters: Any) -> 'ResultsCube':
+        """필터에 맞는 부분 큐브. 예: cube.slice(year='2026', gender='여')"""
+        import numpy as np
+
+        index = self._filter_index(filters)
+        counts = self.counts
+        for k, idx in enumerate(index):
+            if isinstance(idx, list):
+                counts = np.take(counts, idx, axis=k)
+        axes = {d: [self.axes[d][i] for i in idx] if isinstance(idx, list) else list(self.axes[d])
+                for d, idx in zip(CUBE_DIMENSIONS, index)}
+        return ResultsCube(axes, counts)
+
+    def rollup(self, *dims: str, **filters: Any) -> Tuple[List[List[str]], Any]:
+        """
+        필터를 적용한 뒤 dims 만 남기고 나머지 차원을 합칩니다.
+        반환값: (남은 차원별 값 목록, 배열). 예: cube.rollup('class', 'status', year='2026')
+        """
+        sub = self.slice(**filters) if filters else self
+        positions = [CUBE_DIMENSIONS.index(d) for d in dims]
+        other = tuple(k for k in range(len(CUBE_DIMENSIONS)) if k not in positions)
+        summed = sub.counts.sum(axis=other)
+        # sum 후에는 남은 차원이 원래 순서이므로 요청한 순서로 재배열
+        remaining = sorted(positions)
+        return [sub.axes[d] for d in dims], summed.transpose([remaining.index(p) for p in positions])
+
+    def total(self, **filters: Any) -> int:
+        return int(self.slice(**filters).counts.sum()) if filters else int(self.counts.sum())
+
+    def pass_rate(self, *dims: str, **filters: Any) -> Tuple[List[List[str]], Any]:
+        """합격 / (합격 + 불합격). 결과가 아직 없는(불합격 0, 합격 0) 칸은 nan"""
+        import numpy as np
+
+        labels, passed = self.rollup(*dims, **dict(filters, status=PASS_STATUS))
+        _, failed = self.rollup(*dims, **dict(filters, status=FAIL_STATUS))
+        decided = passed + failed
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rate = np.where(decided > 0, passed / np.maximum(decided, 1), np.nan)
+        return labels, rate
+
+    def overall_rate(self, **filters: Any) -> float:
+        passed = self.total(**dict(filters, status=PASS_STATUS))
+        decided = passed + self.total(**dict(filters, status=FAIL_STATUS))
+        return passed / decided if decided else float('nan')
+
+    def has_outcomes(self) -> bool:
+        """불합격까지 기록된 큐브인지 (합격률 계산 가능 여부)"""
+        return FAIL_STATUS in self.axes['status'] and self.total(status=FAIL_STATUS) > 0
+
+def update_cube(path: str, records: Iterable[Dict[str, Any]]) -> Tuple[ResultsCube, str]:
+    """이번 실행의 레코드로 큐브를 만들고, 기존 큐브(다른 연도)와 합쳐 저장합니다."""
+    cube = ResultsCube.from_records(records)
+    if os.path.exists(path):
+        try:
+            cube = ResultsCube.load(path).merge(cube)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ 기존 큐브를 읽지 못해 새로 만듭니다: {e}")
+    return cube, cube.save(path)
+
+# ==========================================
+# 3. 정적 렌더링 (표 / SVG 막대 그래프)
+# ==========================================
+CUBE_CSS = """
+body { font-family: 'Malgun Gothic', 'Noto Sans KR', sans-serif; padding: 30px; background: #f9fafb; }
+.container { max-width: 1100px; margin: 0 auto; background: white; padding: 40px; box-shadow: 0 4px 6px rgba(0,0,0,0.1); border-radius: 8px; }
+h2 { text-align: center; margin-bottom: 6px; } h3 { margin: 28px 0 8px; border-bottom: 2px solid #000; padding-bottom: 4px; }
+.sub { text-align: right; font-size: 10pt; color: #666; }
+table { border-collapse: collapse; text-align: center; font-size: 10pt; margin-bottom: 8px; }
+th, td { border: 1px solid #000; padding: 4px 10px; white-space: nowrap; }
+thead th { background: #f1f3f5; } .total { background: #f8f9fa; font-weight: bold; }
+.rate { color: #1d4ed8; } .zero { color: #bbb; }
+svg text { font-family: inherit; font-size: 11px; }
+@media print { body { padding: 0; background: white; } .container { box-shadow: none; padding: 0; } }
+"""
+BAR_COLORS = ('#2563eb', '#f97316', '#16a34a', '#9333ea', '#64748b', '#dc2626')
+
+def _esc(text: Any) -> str:
+    return str(text).replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('"', '&quot;')
+
+def _cell(n: Any) -> str:
+    return f'<td class="zero">0</td>' if int(n) == 0 else f'<td>{int(n)}</td>'
+
+def _rate_cell(rate: float) -> str:
+    return '<td class="zero">-</td>' if rate != rate else f'<td class="rate">{rate * 100:.0f}%</td>'
+
+def cross_table_html(cube: ResultsCube, row_dim: str, col_dim: str, row_title: str, with_rate: bool = False,
+                     **filters: Any) -> str:
+    """row_dim × col_dim 교차표 (+ 행/열 합계, 필요하면 합격률 열)"""
+    (rows, cols), counts = cube.rollup(row_dim, col_dim, **filters)
+    if with_rate:
+        _, rates = cube.pass_rate(row_dim, **filters)
+    head = f'<tr><th>{_esc(row_title)}</th>' + ''.join(f'<th>{_esc(c)}</th>' for c in cols) + '<th>계</th>'
+    head += '<th>합격률</th></tr>' if with_rate else '</tr>'
+    body = ''
+    for i, r in enumerate(rows):
+        body += f'<tr><td>{_esc(r)}</td>' + ''.join(_cell(n) for n in counts[i]) + f'<td class="total">{int(counts[i].sum())}</td>'
+        body += (_rate_cell(float(rates[i])) if with_rate else '') + '</tr>'
+    foot = '<tr class="total"><td>계</td>' + ''.join(f'<td>{int(n)}</td>' for n in counts.sum(axis=0))
+    foot += f'<td>{int(counts.sum())}</td>'
+    if with_rate:
+        foot += _rate_cell(cube.overall_rate(**filters))
+    foot += '</tr>'
+    return f'<table><thead>{head}</thead><tbody>{body}</tbody><tfoot>{foot}</tfoot></table>'
+
+def bar_chart_svg(labels: Sequence[str], series: Dict[str, Sequence[float]], width: int = 900, height: int = 260,
+                  percent: bool = False) -> str:
+    """묶음 막대 그래프 (서버에서 SVG 문자열로 생성, 스크립트/외부 라이브러리 없음)"""
+    pad_l, pad_b, pad_t = 40, 28, 24
+    plot_w, plot_h = width - pad_l - 10, height - pad_b - pad_t
+    values = [v for vs in series.values() for v in vs if v == v]
+    top = 1.0 if percent else max(values + [1])
+    n_groups, n_series = max(len(labels), 1), max(len(series), 1)
+    group_w = plot_w / n_groups
+    bar_w = max(2.0, group_w * 0.8 / n_series)
+
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}" role="img">']
+    for k in range(5):  # 눈금선
+        y = pad_t + plot_h * k / 4
+        tick = top * (4 - k) / 4
+        label = f"{tick * 100:.0f}%" if percent else f"{tick:.0f}"
+        parts.append(f'<line x1="{pad_l}" y1="{y:.1f}" x2="{width - 10}" y2="{y:.1f}" stroke="#e5e7eb"/>'
+                     f'<text x="{pad_l - 4}" y="{y + 4:.1f}" text-anchor="end" fill="#6b7280">{label}</text>')
+    for s_idx, (name, vs) in enumerate(series.items()):
+        color = BAR_COLORS[s_idx % len(BAR_COLORS)]
+        for g_idx, v in enumerate(vs):
+            if v != v or v <= 0: continue
+            h = plot_h * v / top
+            x = pad_l + g_idx * group_w + group_w * 0.1 + s_idx * bar_w
+            text = f"{v * 100:.0f}%" if percent else f"{v:.0f}"
+            parts.append(f'<rect x="{x:.1f}" y="{pad_t + plot_h - h:.1f}" width="{bar_w - 1:.1f}" height="{h:.1f}" fill="{color}">'
+                         f'<title>{_esc(labels[g_idx])} {_esc(name)}: {text}</title></rect>')
+    for g_idx, label in enumerate(labels):
+        x = pad_l + g_idx * group_w + group_w / 2
+        parts.append(f'<text x="{x:.1f}" y="{height - 10}" text-anchor="middle">{_esc(label)}</text>')
+    legend_x = pad_l
+    for s_idx, name in enumerate(series):
+        color = BAR_COLORS[s_idx % len(BAR_COLORS)]
+        parts.append(f'<rect x="{legend_x}" y="4" width="10" height="10" fill="{color}"/><text x="{legend_x + 14}" y="13">{_esc(name)}</text>')
+        legend_x += 24 + 12 * len(name)
+    parts.append('</svg>')
+    return ''.join(parts)
+
+def render_cube_html(cube: ResultsCube, title: str, filename: str, year: Optional[str] = None) -> str:
+    """큐브의 주요 단면(반별/그룹×성별/연도별)을 정적 표와 SVG 그래프로 기록"""
+    year = year or (cube.axes['year'][-1] if cube.axes['year'] else '')
+    outcomes = cube.has_outcomes()
+    sections = []
+
+    (classes,), by_class = cube.rollup('class', year=year, status=PASS_STATUS)
+    if outcomes:
+        _, rates = cube.pass_rate('class', year=year)
+        chart = bar_chart_svg(classes, {'합격률': [float(r) for r in rates]}, percent=True)
+    else:
+        (_, genders), by_class_gender = cube.rollup('class', 'gender', year=year, status=PASS_STATUS)
+        chart = bar_chart_svg(classes, {g: [int(n) for n in by_class_gender[:, j]] for j, g in enumerate(genders)})
+    sections.append(f"<h3>{_esc(year)} 반별 {'합격률' if outcomes else '합격 인원'}</h3>{chart}")
+    sections.append(f"<h3>{_esc(year)} 반 × 상태</h3>" + cross_table_html(cube, 'class', 'status', '반', outcomes, year=year))
+    sections.append(f"<h3>{_esc(year)} 유형 × 성별 (합격)</h3>" + cross_table_html(cube, 'group', 'gender', '유형', False, year=year, status=PASS_STATUS))
+    if outcomes:
+        sections.append(f"<h3>{_esc(year)} 유형 × 상태</h3>" + cross_table_html(cube, 'group', 'status', '유형', True, year=year))
+
+    if len(cube.axes['year']) > 1:
+        # 연도 비교: 유형별 합격 인원 (막대 = 연도), 결과가 있으면 연도별 합격률 열 추가
+        (years, groups), by_year = cube.rollup('year', 'group', status=PASS_STATUS)
+        chart = bar_chart_svg(groups, {y: [int(n) for n in by_year[i]] for i, y in enumerate(years)})
+        sections.append("<h3>연도별 유형별 합격 인원</h3>" + chart
+                        + cross_table_html(cube, 'year', 'group', '연도', outcomes, status=PASS_STATUS))
+
+    html = f"""<!DOCTYPE html><html lang="ko"><head><meta charset="UTF-8"><title>{_esc(title)}</title><style>{CUBE_CSS}</style></head>
+<body><div class="container"><h2>{_esc(title)}</h2>
+<p class="sub">연도: {', '.join(map(_esc, cube.axes['year']))} · 전체 {cube.total()}건 · 업데이트: {datetime.now().strftime('%Y-%m-%d %H:%M')}</p>
+{''.join(sections)}
+</div></body></html>"""
+    status = write_text(filename, html)
+    print(f"✅ 통계 큐브 리포트 생성 완료: {os.path.abspath(filename)}{status_note(status)}")
+    return status
+
+# ==========================================
+# 4. 즉석 조회 (CLI)
+# ==========================================
+def _parse_filters(items: Sequence[str]) -> Dict[str, Any]:
+    filters: Dict[str, Any] = {}
+    for item in items:
+        key, _, value = item.partition('=')
+        if key not in CUBE_DIMENSIONS:
+            raise SystemExit(f"알 수 없는 차원: {key} (가능: {', '.join(CUBE_DIMENSIONS)})")
+        filters[key] = value.split(',')
+    return filters
+
+def print_rollup(cube: ResultsCube, dims: Sequence[str], filters: Dict[str, Any], rate: bool = False) -> None:
+    labels, values = cube.pass_rate(*dims, **filters) if rate else cube.rollup(*dims, **filters)
+    fmt = (lambda v: '-' if v != v else f"{v * 100:.0f}%") if rate else (lambda v: str(int(v)))
+    if len(dims) == 1:
+        for label, v in zip(labels[0], values):
+            print(f"{label}\t{fmt(v)}")
+    elif len(dims) == 2:
+        print('\t'.join([f"{dims[0]}\\{dims[1]}"] + list(labels[1])))
+        for label, row in zip(labels[0], values):
+            print('\t'.join([label] + [fmt(v) for v in row]))
+    else:
+        import numpy as np
+        for idx in np.ndindex(values.shape):
+            if rate or values[idx]:
+                print('\t'.join([labels[k][i] for k, i in enumerate(idx)] + [fmt(values[idx])]))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="저장된 결과 큐브(.npz) 즉석 조회")
+    parser.add_argument('--cube', default=cube_path('reports', 'mokil_high_school_results_gen'),
+                        help="큐브 파일 (기본: reports/.cube/mokil_high_school_results_gen.npz)")
+    parser.add_argument('--by', default='class', help=f"남길 차원 (쉼표 구분, 1~{len(CUBE_DIMENSIONS)}개): {','.join(CUBE_DIMENSIONS)}")
+    parser.add_argument('--rate', action='store_true', help="인원 대신 합격률 (합격 / (합격 + 불합격))")
+    parser.add_argument('where', nargs='*', default=[], help="필터 (예: year=2026 gender=여 status=합격,불합격)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.cube):
+        sys.exit(f"❌ 큐브 파일이 없습니다: {args.cube}")
+    started = time.perf_counter()
+    cube = ResultsCube.load(args.cube)
+    loaded = time.perf_counter()
+    print_rollup(cube, [d.strip() for d in args.by.split(',') if d.strip()], _parse_filters(args.where), args.rate)
+    print(f"⏱️ 불러오기 {(loaded - started) * 1000:.1f}ms / 조회 {(time.perf_counter() - loaded) * 1000:.1f}ms "
+          f"(큐브 {' × '.join(str(len(cube.axes[d])) for d in CUBE_DIMENSIONS)})", file=sys.stderr)
@@ -0,0 +1,184 @@
+import os
+import json
+import time
+import argparse
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from output_writer import mark_stale, close_outputs
+from run_metrics import METRICS
+
+# ==========================================
+# 1. 설정 정보
+# ==========================================
+# 단계: 수집(시트 다운로드) → 파싱(행 분류) → 렌더링(리포트 기록)
+STAGES = ('fetch', 'parse', 'render')
+STAGE_LABELS = {'fetch': '데이터 수집', 'parse': '파싱', 'render': '렌더링'}
+# 마지막으로 파싱에 성공한 데이터: .cache/last_good/<이름>.json (제한 시간 초과/수집 실패 시 대체 데이터)
+LAST_GOOD_DIR = os.path.join('.cache', 'last_good')
+# 실행 전체 제한만 있을 때 렌더링 몫으로 남겨 두는 비율 (수집이 밀려도 대체 데이터로 리포트를 만들 시간)
+RENDER_RESERVE = 0.2
+LAST_GOOD_VERSION = 1
+
+class BudgetExceeded(Exception):
+    """단계가 제한 시간 안에 끝나지 않음 (해당 단계 스레드는 버려지고 결과는 쓰이지 않음)"""
+
+    def __init__(self, stage: str, limit: float):
+        label = STAGE_LABELS.get(stage, stage)
+        super().__init__(f"{label} 단계가 제한 시간({limit:.3g}초) 안에 끝나지 않았습니다" if limit > 0
+                         else f"{label} 단계에 남은 제한 시간이 없습니다")
+        self.stage = stage
+        self.limit = limit
+
+class SourceUnavailable(Exception):
+    """수집 단계에서 원본을 읽지 못함 (제한 시간 실행은 last-good 으로 대체, 아니면 생성기가 알리고 처리)"""
+
+def stage_budget(text: str) -> Tuple[str, float]:
+    """argparse type: 'fetch=20' → ('fetch', 20.0)"""
+    stage, _, seconds = text.partition('=')
+    try:
+        value = float(seconds)
+    except ValueError:
+        value = -1.0
+    if stage not in STAGES or value <= 0:
+        raise argparse.ArgumentTypeError(f"'{text}': 단계=초 형식이어야 합니다 (단계: {', '.join(STAGES)})")
+    return stage, value
+
+# ==========================================
+# 2. 실행 / 단계별 제한 시간
+# ==========================================
+class RunBudget:
+    """
+    실행 전체(total)와 단계별(stages) 제한 시간. 단계 제한은 같은 단계를 여러 번 실행하면 합산해서 적용합니다.
+    수집/파싱은 전체 제한에서 렌더링 몫(render 단계 제한, 없으면 전체의 RENDER_RESERVE)을 뺀 시간 안에 끝나야 합니다.
+    제한이 있는 단계는 별도 스레드에서 실행하고 시간이 지나면 기다리지 않고 BudgetExceeded 를 냅니다
+    (느린 응답에 막힌 요청은 데몬 스레드에 남겨 두고 실행은 계속). 제한이 없으면 그냥 호출합니다.
+    """
+
+    def __init__(self, total: Optional[float] = None, stages: Optional[Dict[str, float]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.total = total
+        self.stages = dict(stages or {})
+        self.clock = clock
+        self.started = clock()
+        self.used: Dict[str, float] = {}
+        self.overruns: List[str] = []
+
+    @property
+    def enabled(self) -> bool:
+        return self.total is not None or bool(self.stages)
+
+    def limit(self, stage: str) -> Optional[float]:
+        """이번 단계 실행에 남은 시간 (단계 남은 몫과 실행 전체 남은 시간 중 작은 값, 제한 없으면 None)"""
+        candidates = []
+        if stage in self.stages: candidates.append(self.stages[stage] - self.used.get(stage, 0.0))
+        if self.total is not None:
+            remaining = self.total - (self.clock() - self.started)
+            candidates.append(remaining if stage == 'render' else remaining - self.render_reserve())
+        return max(0.0, min(candidates)) if candidates else None
+
+    def render_reserve(self) -> float:
+        """전체 제한 중 렌더링을 위해 남겨 둘 시간 (이미 렌더링에 쓴 만큼 줄어듦)"""
+        reserve = self.stages['render'] if 'render' in self.stages else (self.total or 0.0) * RENDER_RESERVE
+        return max(0.0, reserve - self.used.get('render', 0.0))
+
+    def run(self, stage: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        limit = self.limit(stage)
+        start = self.clock()
+        try:
+            if limit is None: return fn(*args, **kwargs)
+            return self._run_bounded(stage, limit, fn, args, kwargs)
+        finally:
+            elapsed = self.clock() - start
+            self.used[stage] = self.used.get(stage, 0.0) + elapsed
+            METRICS.add('stage_seconds', elapsed, stage=stage)
+
+    def _run_bounded(self, stage: str, limit: float, fn: Callable[..., Any], args: Any, kwargs: Any) -> Any:
+        result: Dict[str, Any] = {}
+
+        def target() -> None:
+            try:
+                result['value'] = fn(*args, **kwargs)
+            except BaseException as e:
+                result['error'] = e
+
+        if limit > 0:
+            worker = threading.Thread(target=target, name=f"budget-{stage}", daemon=True)
+            worker.start()
+            worker.join(limit)
+        if limit <= 0 or worker.is_alive():
+            # 버려진 렌더링 스레드가 이후에 리포트 파일을 바꾸지 않도록 기록을 닫음
+            if stage == 'render': close_outputs()
+            self.overruns.append(stage)
+            METRICS.add('budget_overruns', 1, stage=stage)
+            raise BudgetExceeded(stage, limit)
+        if 'error' in result: raise result['error']
+        return result['value']
+
+    @property
+    def render_overrun(self) -> bool:
+        return 'render' in self.overruns
+
+# ==========================================
+# 3. 마지막 성공 데이터 (last-good)
+# ==========================================
+def _last_good_path(name: str, root: str = LAST_GOOD_DIR) -> str:
+    return os.path.join(root, f"{name}.json")
+
+def save_last_good(name: str, data: Any, fetched_at: Optional[datetime] = None, root: str = LAST_GOOD_DIR) -> str:
+    """파싱까지 끝난 데이터를 JSON 으로 저장 (원자적 교체)"""
+    os.makedirs(root, exist_ok=True)
+    path = _last_good_path(name, root)
+    tmp = f"{path}.tmp-{os.getpid()}"
+    payload = {'version': LAST_GOOD_VERSION, 'name': name,
+               'fetched_at': (fetched_at or datetime.now()).isoformat(timespec='seconds'), 'data': data}
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp, path)
+    return path
+
+def load_last_good(name: str, root: str = LAST_GOOD_DIR) -> Optional[Tuple[datetime, Any]]:
+    """(수집 시각, 데이터). 없거나 읽을 수 없으면 None"""
+    try:
+        with open(_last_good_path(name, root), encoding='utf-8') as f:
+            payload = json.load(f)
+        if payload.get('version') != LAST_GOOD_VERSION: return None
+        return datetime.fromisoformat(payload['fetched_at']), payload['data']
+    except (OSError, ValueError, KeyError):
+        return None
+
+def use_last_good(name: str, error: BaseException) -> Optional[Tuple[datetime, Any]]:
+    """
+    수집/파싱이 제한 시간을 넘거나 실패했을 때 마지막 성공 데이터로 대체하고,
+    이후 기록하는 HTML 에 '최신 데이터 아님' 표시(수집 시각 포함)를 붙이도록 설정합니다.
+    """
+    reason = str(error) if isinstance(error, BudgetExceeded) else f"데이터 수집 실패: {error}"
+    loaded = load_last_good(name)
+    if loaded is None:
+        print(f"❌ {reason} - 대체할 마지막 성공 데이터({_last_good_path(name)})가 없어 리포트를 만들지 않습니다.")
+        return None
+    fetched_at, data = loaded
+    mark_stale(fetched_at, reason)
+    METRICS.set('stale_data_age_seconds', (datetime.now() - fetched_at).total_seconds(), source=name)
+    print(f"⚠️ {reason} - 마지막 성공 데이터({fetched_at:%Y-%m-%d %H:%M} 수집)로 리포트를 만듭니다.")
+    return loaded
+
+def fetch_and_parse(budget: RunBudget, name: str, fetch: Callable[[], Any],
+                    parse: Callable[[Any], Any]) -> Optional[Any]:
+    """
+    fetch → parse 를 단계별 제한 시간 안에서 실행합니다.
+    성공한 결과는 제한 시간 여부와 관계없이 항상 last-good 으로 저장합니다 (이후 --budget 실행의 대체 데이터).
+    제한 시간이 설정된 실행은 초과/실패 시 그 데이터로 대체하고, 아니면 예외를 그대로 올립니다.
+    반환: 파싱된 데이터 (대체할 데이터도 없으면 None)
+    """
+    try:
+        raw = budget.run('fetch', fetch)
+        fetched_at = datetime.now()
+        data = budget.run('parse', parse, raw)
+    except Exception as e:
+        if not budget.enabled: raise
+        loaded = use_last_good(name, e)
+        return loaded[1] if loaded else None
+    save_last_good(name, data, fetched_at)
+    return data
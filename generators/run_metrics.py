@@ -0,0 +1,228 @@
+import os
+import re
+import sys
+import time
+import argparse
+import threading
+import contextlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from output_writer import RUN_MANIFEST
+from html_compact import SIZE_STATS
+
+# ==========================================
+# 1. 설정 정보
+# ==========================================
+# node_exporter textfile collector 가 읽는 폴더 (지정하지 않으면 <출력 폴더>/.metrics)
+METRICS_TEXTFILE_DIR = os.environ.get('METRICS_TEXTFILE_DIR', '')
+METRICS_DIR_NAME = '.metrics'
+METRIC_PREFIX = 'school_report_'
+DEFAULT_METRICS_PORT = 9464
+CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+# 이름 → (종류, 설명). 예약 작업 1회 실행 결과이므로 모두 gauge (마지막 실행 값)
+METRIC_INFO: Dict[str, Tuple[str, str]] = {
+    'run_timestamp_seconds': ('gauge', 'Unix time when the run finished'),
+    'run_duration_seconds': ('gauge', 'Wall-clock duration of the run'),
+    'fetch_seconds': ('gauge', 'Time spent fetching source data'),
+    'fetch_bytes': ('gauge', 'Bytes downloaded from the source'),
+    'fetch_requests': ('gauge', 'Requests sent to Google Sheets (after coalescing)'),
+    'fetch_retries': ('gauge', 'Requests retried after 429/5xx responses'),
+    'fetch_throttled_seconds': ('gauge', 'Time spent waiting for the read quota'),
+    'rows_scanned': ('gauge', 'Source rows scanned during parsing'),
+    'students': ('gauge', 'Students classified per report and group'),
+    'render_seconds': ('gauge', 'Time spent rendering and writing each output'),
+    'write_seconds': ('gauge', 'Time spent writing output files (temp write + compare + replace)'),
+    'outputs': ('gauge', 'Output files by write status'),
+    'output_bytes': ('gauge', 'HTML output size before/after compaction and gzip'),
+    'cache_hits': ('gauge', 'Cache hits per cache'),
+    'cache_misses': ('gauge', 'Cache misses per cache'),
+    'validation_seconds': ('gauge', 'Time spent validating the normalized dataset'),
+    'validation_issues': ('gauge', 'Data-quality issues found per validation rule'),
+    'stage_seconds': ('gauge', 'Time spent per run stage (fetch / parse / render)'),
+    'budget_overruns': ('gauge', 'Stages stopped for exceeding their time budget'),
+    'stale_data_age_seconds': ('gauge', 'Age of the last-good data rendered after a fetch overrun or failure'),
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(round(value, 6))
+
+# ==========================================
+# 2. 실행 지표 수집
+# ==========================================
+class RunMetrics:
+    """이번 실행의 지표 값 (이름 + 라벨 → 값). 여러 writer 스레드에서 동시에 기록해도 안전합니다."""
+
+    def __init__(self) -> None:
+        self.started = time.time()
+        self.values: Dict[str, Dict[LabelKey, float]] = {}
+        self.lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelKey:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def set(self, name: str, value: float, **labels: Any) -> None:
+        with self.lock:
+            self.values.setdefault(name, {})[self._key(labels)] = float(value)
+
+    def add(self, name: str, value: float = 1.0, **labels: Any) -> None:
+        with self.lock:
+            series = self.values.setdefault(name, {})
+            key = self._key(labels)
+            series[key] = series.get(key, 0.0) + float(value)
+
+    @contextlib.contextmanager
+    def timer(self, name: str, **labels: Any) -> Iterator[None]:
+        """with METRICS.timer('fetch_seconds', source='early'): ... 걸린 시간을 누적"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start, **labels)
+
+    def render(self, generator: str) -> str:
+        """OpenMetrics 텍스트 (모든 시계열에 generator 라벨 추가)"""
+        lines: List[str] = []
+        with self.lock:
+            for name in sorted(self.values):
+                kind, help_text = METRIC_INFO.get(name, ('gauge', name))
+                family = METRIC_PREFIX + name
+                lines.append(f"# TYPE {family} {kind}")
+                lines.append(f"# HELP {family} {help_text}")
+                for key, value in sorted(self.values[name].items()):
+                    labels = ','.join(f'{k}="{_escape(v)}"' for k, v in (('generator', generator),) + key)
+                    lines.append(f"{family}{{{labels}}} {_format_value(value)}")
+        lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+
+METRICS = RunMetrics()
+
+# ==========================================
+# 3. 공용 캐시/스케줄러 지표 + 기록
+# ==========================================
+def record_scheduler(scheduler: Any, transfer: Optional[Dict[str, int]] = None, source: str = 'sheets') -> None:
+    """RequestScheduler.stats → 요청/재시도/쿼터 대기 (진행 중 요청 병합 / 핸들 재사용은 캐시 적중), transfer → 내려받은 바이트"""
+    stats = scheduler.stats
+    if transfer is not None:
+        METRICS.set('fetch_bytes', transfer['bytes'], source=source)
+    METRICS.set('fetch_requests', stats['calls'], source=source)
+    METRICS.set('fetch_retries', stats['retries'], source=source)
+    METRICS.set('fetch_throttled_seconds', stats['throttled_sec'], source=source)
+    METRICS.set('cache_hits', stats['coalesced'], cache='request_coalescing')
+    METRICS.set('cache_hits', stats['cached'], cache='spreadsheet_handles')
+
+def record_manifest(manifest: Any) -> None:
+    METRICS.set('cache_hits', manifest.stats['hit'], cache='sheet_manifest')
+    METRICS.set('cache_misses', manifest.stats['miss'], cache='sheet_manifest')
+
+def record_resolver(resolver: Any) -> None:
+    """학교명 표준화: 캐시에 있던 매핑은 적중, 새로 계산한 매핑(규칙/유사도/신규)은 미스"""
+    stats = resolver.stats
+    METRICS.set('cache_hits', stats['cached'], cache='school_names')
+    METRICS.set('cache_misses', stats['exact'] + stats['fuzzy'] + stats['new'], cache='school_names')
+
+def _record_outputs() -> None:
+    """출력 기록 결과(new / updated / unchanged)와 확장자별 기록 시간"""
+    with RUN_MANIFEST.lock:
+        entries = list(RUN_MANIFEST.entries)
+    for status in ('new', 'updated', 'unchanged'):
+        METRICS.set('outputs', sum(1 for e in entries if e['status'] == status), status=status)
+    for e in entries:
+        ext = os.path.splitext(e['path'])[1].lstrip('.') or 'none'
+        METRICS.add('write_seconds', e.get('seconds', 0.0), ext=ext)
+    # 변경 없는 출력은 내용 해시 캐시 적중으로 봄
+    METRICS.set('cache_hits', sum(1 for e in entries if e['status'] == 'unchanged'), cache='output_digest')
+    METRICS.set('cache_misses', sum(1 for e in entries if e['status'] != 'unchanged'), cache='output_digest')
+    # --compact / --gzip 사용 시 HTML 크기 (원본 / 축소 / gzip)
+    if SIZE_STATS:
+        METRICS.set('output_bytes', sum(int(e['original']) for e in SIZE_STATS), encoding='original')
+        METRICS.set('output_bytes', sum(int(e['written']) for e in SIZE_STATS), encoding='written')
+        gz = [int(e['gzip']) for e in SIZE_STATS if e['gzip'] is not None]
+        if gz: METRICS.set('output_bytes', sum(gz), encoding='gzip')
+
+def metrics_dir(output_dir: str) -> str:
+    return METRICS_TEXTFILE_DIR or os.path.join(output_dir, METRICS_DIR_NAME)
+
+def save_run_metrics(output_dir: str, name: Optional[str] = None) -> str:
+    """<출력 폴더>/.metrics/<생성기>.prom (또는 METRICS_TEXTFILE_DIR) 에 원자적으로 기록하고 경로를 반환합니다."""
+    name = name or os.path.splitext(os.path.basename(sys.argv[0]))[0] or 'run'
+    _record_outputs()
+    METRICS.set('run_duration_seconds', time.time() - METRICS.started)
+    METRICS.set('run_timestamp_seconds', time.time())
+
+    target_dir = metrics_dir(output_dir)
+    os.makedirs(target_dir, exist_ok=True)
+    path = os.path.join(target_dir, f"{name}.prom")
+    # textfile collector 는 *.prom 만 읽으므로 임시 파일은 다른 확장자로 기록 후 교체
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(METRICS.render(name))
+    os.replace(tmp, path)
+    print(f"📈 실행 지표 기록: {path}")
+    return path
+
+# ==========================================
+# 4. /metrics HTTP 엔드포인트 (textfile 폴더를 합쳐서 제공)
+# ==========================================
+FAMILY_LINE = re.compile(r"^# (TYPE|HELP) (\S+)")
+
+def merge_textfiles(directory: str) -> str:
+    """여러 생성기의 .prom 파일을 지표 이름(family)별로 합쳐 하나의 OpenMetrics 문서로 만듭니다."""
+    families: Dict[str, Dict[str, Any]] = {}
+    for fname in sorted(os.listdir(directory)) if os.path.isdir(directory) else []:
+        if not fname.endswith('.prom'): continue
+        with open(os.path.join(directory, fname), encoding='utf-8') as f:
+            current = None
+            for line in f.read().splitlines():
+                if not line or line == '# EOF': continue
+                m = FAMILY_LINE.match(line)
+                if m:
+                    current = families.setdefault(m.group(2), {'meta': {}, 'samples': []})
+                    current['meta'].setdefault(m.group(1), line)
+                elif current is not None and not line.startswith('#'):
+                    current['samples'].append(line)
+    lines = []
+    for family in sorted(families):
+        meta = families[family]['meta']
+        lines += [meta[k] for k in ('TYPE', 'HELP') if k in meta] + families[family]['samples']
+    lines.append('# EOF')
+    return '\n'.join(lines) + '\n'
+
+def serve_metrics(directory: str, host: str = '127.0.0.1', port: int = DEFAULT_METRICS_PORT) -> ThreadingHTTPServer:
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = merge_textfiles(directory).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    return ThreadingHTTPServer((host, port), MetricsHandler)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="생성기 실행 지표(OpenMetrics)를 /metrics 로 제공")
+    parser.add_argument('--dir', default=None, help=f"지표 파일 폴더 (기본: METRICS_TEXTFILE_DIR 또는 reports/{METRICS_DIR_NAME})")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_METRICS_PORT)
+    args = parser.parse_args()
+
+    directory = args.dir or metrics_dir('reports')
+    server = serve_metrics(directory, args.host, args.port)
+    print(f"📈 지표 엔드포인트: http://{args.host}:{server.server_address[1]}/metrics ({os.path.abspath(directory)})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 지표 엔드포인트 종료")
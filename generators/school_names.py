@@ -0,0 +1,191 @@
+import os
+import re
+import math
+import json
+import hashlib
+import threading
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# ==========================================
+# 1. 설정 정보
+# ==========================================
+CACHE_DIR = '.cache'
+CACHE_PATH = os.path.join(CACHE_DIR, 'school_names.json')
+
+# 표준 이름으로 미리 등록해 둘 학교 (데이터에서 처음 보는 이름은 자동으로 표준 이름이 됨)
+KNOWN_SCHOOLS: Tuple[str, ...] = (
+    '하나고', '중동고', '대원외고', '한영외고', '명덕외고', '서울국제고',
+    '서울과학고', '세종과학고', '한성과학고', '한국과학영재학교', '서울과학영재학교',
+    '서울예고', '선화예고', '미림마이스터고',
+)
+# 바이그램 Dice 유사도가 이 값 이상일 때만 같은 학교로 봄 (서울과학고/세종과학고 = 0.5 → 별개)
+MATCH_THRESHOLD = 0.8
+# 바이그램이 이보다 적은 짧은 이름은 퍼지 매칭하지 않음 (오병합 방지)
+MIN_NGRAMS = 3
+
+# 표기 정규화 규칙 (순서대로 적용)
+SUFFIX_RULES: Tuple[Tuple[str, str], ...] = (
+    ('여자고등학교', '여고'),
+    ('고등학교', '고'),
+    ('고교', '고'),
+)
+BRACKET_PATTERN = re.compile(r"[\(\[（【].*?([\)\]）】]|$)")
+SPACE_PATTERN = re.compile(r"\s+")
+
+# 규칙/기준이 바뀌면 예전 캐시는 버림
+RULES_VERSION = hashlib.sha1(repr((KNOWN_SCHOOLS, MATCH_THRESHOLD, MIN_NGRAMS, SUFFIX_RULES)).encode('utf-8')).hexdigest()[:12]
+
+# ==========================================
+# 2. 정규화 / n-gram
+# ==========================================
+def display_school_name(raw: str) -> str:
+    """표시용 정리: 괄호 내용 제거, 연속 공백 정리, '고등학교' → '고' 등 (예: '하나고등학교(자사)' → '하나고')"""
+    name = unicodedata.normalize('NFKC', raw or '')
+    name = SPACE_PATTERN.sub(' ', BRACKET_PATTERN.sub('', name)).strip()
+    for suffix, repl in SUFFIX_RULES:
+        if name.endswith(suffix):
+            name = name[:-len(suffix)].rstrip() + repl
+            break
+    return name
+
+def normalize_school_name(raw: str) -> str:
+    """
+    공백까지 없앤 비교용 키.
+    예: '하나고등학교' / '하나고(자사)' / ' 하나 고 ' → '하나고'
+    """
+    name = SPACE_PATTERN.sub('', display_school_name(raw))
+    for suffix, repl in SUFFIX_RULES:
+        if name.endswith(suffix):
+            return name[:-len(suffix)] + repl
+    return name
+
+def bigrams(name: str) -> Set[str]:
+    return {name[i:i + 2] for i in range(len(name) - 1)}
+
+# ==========================================
+# 3. 표준 학교명 매핑 (n-gram 역색인 + 캐시)
+# ==========================================
+class SchoolNameResolver:
+    """
+    원본 학교명 → 표준 학교명.
+    - 정규화 결과가 이미 표준 이름이면 그대로 사용
+    - 아니면 바이그램 역색인에서 바이그램을 공유하는 후보만 골라 Dice 유사도로 비교
+      (모든 쌍을 비교하지 않으므로 이름 수에 거의 선형)
+    - 어디에도 맞지 않으면 새 표준 이름으로 등록
+    결과는 .cache/school_names.json 에 보관해 다음 실행에서 그대로 재사용합니다.
+    """
+
+    def __init__(self, known: Iterable[str] = KNOWN_SCHOOLS, path: Optional[str] = CACHE_PATH,
+                 threshold: float = MATCH_THRESHOLD):
+        self.path = path
+        self.threshold = threshold
+        self.lock = threading.Lock()
+        self.canonical: List[str] = []     # 표준 이름 (표시용)
+        self.grams: List[Set[str]] = []
+        self.index: Dict[str, List[int]] = {}
+        self.lookup: Dict[str, int] = {}   # 비교용 키 → 표준 이름 번호
+        self.mapping: Dict[str, str] = {}  # 원본 → 표준 (캐시 대상)
+        self.dirty = False
+        self.stats = {'cached': 0, 'exact': 0, 'fuzzy': 0, 'new': 0}
+
+        for name in known:
+            self._add_canonical(name)
+        for raw, canon in self._load().items():
+            self.mapping[raw] = canon
+            if canon and normalize_school_name(canon) not in self.lookup:
+                self._add_canonical(canon)
+
+    def _load(self) -> Dict[str, str]:
+        if not self.path: return {}
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if payload.get('version') != RULES_VERSION: return {}
+        return payload.get('mapping', {})
+
+    def save(self) -> None:
+        """새로 매핑한 이름이 있을 때만 캐시 파일을 갱신"""
+        with self.lock:
+            if not self.path or not self.dirty: return
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp = self.path + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'version': RULES_VERSION, 'mapping': self.mapping}, f, ensure_ascii=False, indent=1, sort_keys=True)
+            os.replace(tmp, self.path)
+            self.dirty = False
+
+    def _add_canonical(self, display: str) -> int:
+        idx = len(self.canonical)
+        key = normalize_school_name(display)
+        grams = bigrams(key)
+        self.canonical.append(display_school_name(display))
+        self.grams.append(grams)
+        self.lookup[key] = idx
+        for g in grams:
+            self.index.setdefault(g, []).append(idx)
+        return idx
+
+    def _best_match(self, key: str) -> Optional[int]:
+        grams = bigrams(key)
+        n = len(grams)
+        if n < MIN_NGRAMS: return None
+        t = self.threshold
+        # Dice >= t 이려면 후보의 바이그램 수는 [t/(2-t)·n, (2-t)/t·n], 공유 바이그램은 최소 t·n/(2-t) 개
+        min_len, max_len = t / (2 - t) * n, (2 - t) / t * n
+        min_overlap = math.ceil(t * n / (2 - t) - 1e-9)
+        # prefix filtering: 드문 바이그램 n - min_overlap + 1 개 중 하나는 반드시 공유하므로 그 목록만 후보로 모음
+        probe = sorted(grams, key=lambda g: (len(self.index.get(g, ())), g))[:n - min_overlap + 1]
+        candidates = {idx for g in probe for idx in self.index.get(g, ())}
+
+        best, best_score = None, 0.0
+        for idx in sorted(candidates):  # 점수가 같으면 먼저 등록된(표준 목록 / 더 자주 나온) 이름 우선
+            m = len(self.grams[idx])
+            if m < min_len or m > max_len: continue
+            score = 2.0 * len(grams & self.grams[idx]) / (n + m)
+            if score > best_score:
+                best, best_score = idx, score
+        return best if best_score >= t else None
+
+    def resolve(self, raw: str) -> str:
+        with self.lock:
+            if raw in self.mapping:
+                self.stats['cached'] += 1
+                return self.mapping[raw]
+            key = normalize_school_name(raw)
+            if not key:
+                canon = ''
+            elif key in self.lookup:
+                self.stats['exact'] += 1
+                canon = self.canonical[self.lookup[key]]
+            else:
+                idx = self._best_match(key)
+                if idx is not None:
+                    self.stats['fuzzy'] += 1
+                    self.lookup[key] = idx  # 같은 변형은 다음부터 바로 찾음
+                else:
+                    self.stats['new'] += 1
+                    idx = self._add_canonical(raw)
+                canon = self.canonical[idx]
+            self.mapping[raw] = canon
+            self.dirty = True
+            return canon
+
+    def resolve_all(self, names: Iterable[str]) -> Dict[str, str]:
+        """
+        여러 이름을 한꺼번에 매핑합니다. 자주 나온 표기부터 처리해, 새 학교는 가장 흔한 표기가 표준 이름이 됩니다.
+        빈 값은 그대로 둡니다.
+        """
+        counts = Counter(n for n in names if n)
+        return {raw: self.resolve(raw) for raw, _ in sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))}
+
+_default_resolver: Optional[SchoolNameResolver] = None
+
+def get_resolver() -> SchoolNameResolver:
+    global _default_resolver
+    if _default_resolver is None:
+        _default_resolver = SchoolNameResolver()
+    return _default_resolver
@@ -0,0 +1,231 @@
+import os
+import json
+import unicodedata
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Set
+
+from output_writer import write_text, status_note
+
+# ==========================================
+# 1. 설정 정보
+# ==========================================
+# 리포트별 부분 색인: <출력 폴더>/.search/<리포트 키>.json → 모아서 <출력 폴더>/portal.html 에 내장
+SEARCH_DIR_NAME = '.search'
+PORTAL_NAME = 'portal.html'
+# 색인 대상 필드 (검색어는 이 필드들의 바이그램으로 찾음)
+INDEX_FIELDS = ('name', 'school', 'dept', 'group')
+# 포털 결과 표시용 필드 (문서 배열 순서)
+DOC_FIELDS = ('anchor', 'name', 'class', 'group', 'school', 'dept', 'status')
+
+def normalize_term(text: Any) -> str:
+    """전각/반각, 대소문자, 공백 차이를 없앤 비교용 문자열"""
+    return ''.join(unicodedata.normalize('NFKC', str(text or '')).lower().split())
+
+def term_grams(text: Any) -> Set[str]:
+    """바이그램 (한 글자면 그 글자)"""
+    t = normalize_term(text)
+    if len(t) < 2: return {t} if t else set()
+    return {t[i:i + 2] for i in range(len(t) - 1)}
+
+def _encode_postings(ids: List[int]) -> str:
+    """정렬된 문서 번호 → 36진 차분 문자열 (예: [3, 5, 40] → '3,2,z')"""
+    out, prev = [], 0
+    for i in ids:
+        out.append(_base36(i - prev))
+        prev = i
+    return ','.join(out)
+
+def _base36(n: int) -> str:
+    digits = '0123456789abcdefghijklmnopqrstuvwxyz'
+    s = ''
+    while True:
+        s = digits[n % 36] + s
+        n //= 36
+        if not n: return s
+
+# ==========================================
+# 2. 리포트별 부분 색인
+# ==========================================
+def search_dir(output_dir: str) -> str:
+    return os.path.join(output_dir, SEARCH_DIR_NAME)
+
+def save_search_partial(output_dir: str, key: str, title: str, href: str, docs: Iterable[Dict[str, Any]]) -> str:
+    """
+    리포트 하나의 검색 문서 목록을 기록합니다.
+    href 는 출력 폴더 기준 리포트 경로, 문서의 anchor 는 그 리포트 안의 행/카드 id 입니다.
+    """
+    payload = {
+        'key': key, 'title': title, 'href': href,
+        'docs': [[str(d.get(f, '') or '') for f in DOC_FIELDS] for d in docs],
+    }
+    return write_text(os.path.join(search_dir(output_dir), f"{key}.json"),
+                      json.dumps(payload, ensure_ascii=False, separators=(',', ':')))
+
+def load_partials(output_dir: str) -> List[Dict[str, Any]]:
+    """링크 대상 리포트가 남아 있는 부분 색인만 (키 순서)"""
+    directory = search_dir(output_dir)
+    partials = []
+    for fname in sorted(os.listdir(directory)) if os.path.isdir(directory) else []:
+        if not fname.endswith('.json'): continue
+        try:
+            with open(os.path.join(directory, fname), encoding='utf-8') as f:
+                partial = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if os.path.exists(os.path.join(output_dir, partial.get('href', ''))):
+            partials.append(partial)
+    return partials
+
+# ==========================================
+# 3. 통합 역색인 + 포털 페이지
+# ==========================================
+def build_index(partials: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    {'reports': [...], 'docs': [[리포트 번호, anchor, 이름, 반, 그룹, 학교, 학과, 상태], ...],
+     'postings': {바이그램: 36진 차분 문서 번호 목록}}
+    """
+    reports, docs = [], []
+    postings: Dict[str, List[int]] = {}
+    name_pos = [DOC_FIELDS.index(f) for f in INDEX_FIELDS]
+    for r_idx, partial in enumerate(partials):
+        reports.append({'title': partial['title'], 'href': partial['href']})
+        for doc in partial['docs']:
+            d_idx = len(docs)
+            docs.append([r_idx] + doc)
+            grams: Set[str] = set()
+            for pos in name_pos:
+                grams |= term_grams(doc[pos])
+            for g in grams:
+                postings.setdefault(g, []).append(d_idx)
+    return {'reports': reports, 'docs': docs,
+            'postings': {g: _encode_postings(ids) for g, ids in sorted(postings.items())}}
+
+PORTAL_CSS = """
+body { font-family: 'Malgun Gothic', 'Noto Sans KR', sans-serif; padding: 30px; background: #f9fafb; margin: 0; }
+.container { max-width: 1000px; margin: 0 auto; background: white; padding: 32px 40px; box-shadow: 0 4px 6px rgba(0,0,0,0.1); border-radius: 8px; }
+h2 { text-align: center; margin: 0 0 6px; } .sub { text-align: center; color: #666; font-size: 10pt; margin-bottom: 18px; }
+.reports { text-align: center; font-size: 10pt; margin-bottom: 16px; } .reports a { margin: 0 6px; }
+#q { width: 100%; box-sizing: border-box; font-size: 14pt; padding: 10px 14px; border: 2px solid #333; border-radius: 6px; }
+#status { font-size: 9pt; color: #666; margin: 6px 2px 10px; min-height: 1.2em; }
+table { width: 100%; border-collapse: collapse; font-size: 10pt; } th, td { border-bottom: 1px solid #ddd; padding: 6px 8px; text-align: left; }
+thead th { background: #f1f3f5; } td a { color: #1d4ed8; text-decoration: none; } mark { background: #fde68a; padding: 0; }
+"""
+
+PORTAL_SCRIPT = r"""
+const IDX = JSON.parse(document.getElementById('search-index').textContent);
+const norm = (s) => String(s).normalize('NFKC').toLowerCase().replace(/\s+/g, '');
+const esc = (v) => String(v).replace(/[&<>"]/g, (c) => ({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'})[c]);
+// 문서별 비교용 문자열 (후보 검증용, 이름|학교|학과|그룹)
+const TEXT = IDX.docs.map((d) => [d[2], d[5], d[6], d[4]].map(norm).join('|'));
+const KEYS = Object.keys(IDX.postings);
+const decoded = new Map();
+
+function postings(gram) {
+    if (decoded.has(gram)) return decoded.get(gram);
+    const enc = IDX.postings[gram];
+    let ids = new Int32Array(0);
+    if (enc !== undefined) {
+        const parts = enc.split(',');
+        ids = new Int32Array(parts.length);
+        let prev = 0;
+        parts.forEach((p, i) => { prev += parseInt(p, 36); ids[i] = prev; });
+    }
+    decoded.set(gram, ids);
+    return ids;
+}
+
+function intersect(a, b) {
+    const out = [];
+    for (let i = 0, j = 0; i < a.length && j < b.length;) {
+        if (a[i] === b[j]) { out.push(a[i]); i++; j++; }
+        else if (a[i] < b[j]) i++; else j++;
+    }
+    return out;
+}
+
+function candidates(word) {
+    if (word.length === 1) {
+        // 한 글자: 그 글자를 포함하는 바이그램 목록의 합집합
+        const set = new Set();
+        KEYS.forEach((k) => { if (k.includes(word)) postings(k).forEach((id) => set.add(id)); });
+        return Array.from(set).sort((x, y) => x - y);
+    }
+    let ids = null;
+    for (let i = 0; i < word.length - 1; i++) {
+        const p = postings(word.slice(i, i + 2));
+        ids = ids === null ? Array.from(p) : intersect(ids, p);
+        if (!ids.length) break;
+    }
+    return ids;
+}
+
+function search(query) {
+    const words = query.split(/\s+/).map(norm).filter(Boolean);
+    if (!words.length) return [];
+    let ids = null;
+    for (const w of words) {
+        const c = candidates(w).filter((id) => TEXT[id].includes(w));  // 바이그램 순서까지 확인
+        ids = ids === null ? c : intersect(ids, c);
+        if (!ids.length) break;
+    }
+    return ids;
+}
+
+const qEl = document.getElementById('q');
+const statusEl = document.getElementById('status');
+const bodyEl = document.getElementById('results');
+const MAX_RESULTS = 200;
+
+function highlight(text, words) {
+    let html = esc(text);
+    words.forEach((w) => { if (w && text.toLowerCase().includes(w)) html = html.split(esc(w)).join('<mark>' + esc(w) + '</mark>'); });
+    return html;
+}
+
+function run() {
+    const q = qEl.value.trim();
+    if (!q) { bodyEl.innerHTML = ''; statusEl.textContent = `${IDX.docs.length}명 색인됨`; return; }
+    const t0 = performance.now();
+    const ids = search(q);
+    const ms = performance.now() - t0;
+    const words = q.toLowerCase().split(/\s+/);
+    bodyEl.innerHTML = ids.slice(0, MAX_RESULTS).map((id) => {
+        const [r, anchor, name, cls, group, school, dept, status] = IDX.docs[id];
+        const report = IDX.reports[r];
+        return `<tr><td><a href="${esc(report.href)}#${esc(anchor)}">${highlight(name, words)}</a></td><td>${esc(cls)}</td>`
+            + `<td>${highlight(group, words)}</td><td>${highlight(school, words)}${dept ? ' · ' + highlight(dept, words) : ''}</td>`
+            + `<td>${esc(status)}</td><td><a href="${esc(report.href)}#${esc(anchor)}">${esc(report.title)}</a></td></tr>`;
+    }).join('');
+    statusEl.textContent = `${ids.length}건 (${ms.toFixed(2)}ms)` + (ids.length > MAX_RESULTS ? ` · 앞 ${MAX_RESULTS}건만 표시` : '');
+}
+
+qEl.addEventListener('input', run);
+if (location.hash.length > 1) qEl.value = decodeURIComponent(location.hash.slice(1));
+run();
+"""
+
+def save_portal(output_dir: str) -> str:
+    """모든 부분 색인을 합쳐 역색인을 만들고, 검색 포털(portal.html)에 내장해 기록합니다."""
+    partials = load_partials(output_dir)
+    index = build_index(partials)
+    # </script> 가 JSON 안에 있어도 스크립트 블록이 끊기지 않도록
+    index_json = json.dumps(index, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+    links = ' · '.join(f'<a href="{p["href"]}">{p["title"]}</a>' for p in partials)
+    html = f"""<!DOCTYPE html><html lang="ko"><head><meta charset="UTF-8"><meta name="viewport" content="width=device-width, initial-scale=1.0">
+<title>목일중 진학 리포트 통합 검색</title><style>{PORTAL_CSS}</style></head>
+<body><div class="container">
+<h2>목일중 진학 리포트 통합 검색</h2>
+<p class="sub">이름 · 학교 · 학과 · 유형으로 모든 리포트를 한 번에 검색합니다 (업데이트: {datetime.now().strftime('%Y-%m-%d %H:%M')})</p>
+<div class="reports">{links or '생성된 리포트가 없습니다.'}</div>
+<input id="q" type="search" placeholder="예: 홍길동, 하나고, 과학고 여" autofocus>
+<div id="status"></div>
+<table><thead><tr><th>이름</th><th>반</th><th>유형</th><th>학교 · 학과</th><th>상태</th><th>리포트</th></tr></thead><tbody id="results"></tbody></table>
+</div>
+<script id="search-index" type="application/json">{index_json}</script>
+<script>{PORTAL_SCRIPT}</script>
+</body></html>"""
+    path = os.path.join(output_dir, PORTAL_NAME)
+    status = write_text(path, html)
+    print(f"🔎 통합 검색 포털 생성 완료: {os.path.abspath(path)} (리포트 {len(partials)}개, {len(index['docs'])}명, "
+          f"색인어 {len(index['postings'])}개){status_note(status)}")
+    return status
@@ -0,0 +1,227 @@
+import os
+import re
+import json
+import time
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Pattern, Sequence, Tuple
+
+from sheets_client import RequestScheduler, get_scheduler
+
+# ==========================================
+# 1. 설정 정보
+# ==========================================
+CACHE_DIR = '.cache'
+MANIFEST_PATH = os.path.join(CACHE_DIR, 'sheet_manifest.json')
+# 시트 구성(이름/ID/크기)은 거의 바뀌지 않으므로 기본 12시간 보관
+MANIFEST_TTL = int(os.environ.get('SHEET_MANIFEST_TTL', str(12 * 3600)))
+
+SPREADSHEET_ID_PATTERN = re.compile(r"/spreadsheets/d/([a-zA-Z0-9-_]+)")
+
+def spreadsheet_id_from_url(url: str) -> str:
+    match = SPREADSHEET_ID_PATTERN.search(url)
+    if not match:
+        raise ValueError(f"스프레드시트 ID를 찾을 수 없는 URL: {url}")
+    return match.group(1)
+
+# ==========================================
+# 2. 워크시트 매니페스트 캐시
+# ==========================================
+class SheetManifest:
+    """
+    스프레드시트 ID → 워크시트 목록(ID, 제목, 행/열 크기) 캐시.
+    유효 기간(TTL) 안에서는 open_by_url / worksheets() 호출 없이 바로 값 읽기로 넘어갑니다.
+    """
+
+    def __init__(self, path: str = MANIFEST_PATH, ttl: int = MANIFEST_TTL, clock: Callable[[], float] = time.time):
+        self.path = path
+        self.ttl = ttl
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.stats = {'hit': 0, 'miss': 0, 'invalidated': 0}
+        self.entries: Dict[str, Dict[str, Any]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, self.path)
+
+    def get(self, spreadsheet_id: str) -> Optional[List[Dict[str, Any]]]:
+        """유효한 항목이 있으면 시트 목록을, 없거나 만료되었으면 None"""
+        with self.lock:
+            entry = self.entries.get(spreadsheet_id)
+            if entry and self.clock() - entry['fetched_at'] < self.ttl:
+                self.stats['hit'] += 1
+                return entry['sheets']
+            self.stats['miss'] += 1
+            return None
+
+    def put(self, spreadsheet_id: str, sheets: List[Dict[str, Any]]) -> None:
+        with self.lock:
+            self.entries[spreadsheet_id] = {'fetched_at': self.clock(), 'sheets': sheets}
+            self._save()
+
+    def invalidate(self, spreadsheet_id: str) -> None:
+        with self.lock:
+            if self.entries.pop(spreadsheet_id, None) is not None:
+                self.stats['invalidated'] += 1
+                self._save()
+
+_default_manifest: Optional[SheetManifest] = None
+
+def get_manifest() -> SheetManifest:
+    global _default_manifest
+    if _default_manifest is None:
+        _default_manifest = SheetManifest()
+    return _default_manifest
+
+# ==========================================
+# 3. 시트 탐색 / 값 읽기
+# ==========================================
+def _sheet_info(ws: Any) -> Dict[str, Any]:
+    return {'id': ws.id, 'title': ws.title, 'index': ws.index, 'rows': ws.row_count, 'cols': ws.col_count}
+
+def discover_sheets(client: Any, url: str, scheduler: Optional[RequestScheduler] = None,
+                    manifest: Optional[SheetManifest] = None) -> Tuple[str, List[Dict[str, Any]]]:
+    """매니페스트에 있으면 그대로, 없으면 open_by_url + worksheets() 로 전체 시트 목록을 만듭니다."""
+    scheduler = scheduler or get_scheduler()
+    manifest = manifest or get_manifest()
+    spreadsheet_id = spreadsheet_id_from_url(url)
+
+    sheets = manifest.get(spreadsheet_id)
+    if sheets is None:
+        doc = scheduler.call(('open', url), client.open_by_url, url)
+        worksheets = scheduler.call(('worksheets', spreadsheet_id), doc.worksheets)
+        sheets = [_sheet_info(ws) for ws in worksheets]
+        manifest.put(spreadsheet_id, sheets)
+    return spreadsheet_id, sheets
+
+def _a1_sheet(title: str) -> str:
+    return "'" + title.replace("'", "''") + "'"
+
+def read_sheet_values(client: Any, spreadsheet_id: str, sheet: Dict[str, Any],
+                      scheduler: Optional[RequestScheduler] = None) -> List[List[str]]:
+    """
+    스프레드시트를 열지 않고 값 API 로 시트 전체를 읽습니다 (get_all_values 와 같은 결과, 행 끝 빈칸 제외).
+    gspread 6 의 http_client 가 없으면 open_by_key 경로로 대체합니다.
+    """
+    scheduler = scheduler or get_scheduler()
+    a1 = _a1_sheet(sheet['title'])
+    http_client = getattr(client, 'http_client', None)
+    if http_client is not None:
+        response = scheduler.call(('values', spreadsheet_id, sheet['id']), http_client.values_get, spreadsheet_id, a1)
+    else:
+        doc = scheduler.call_cached(('open_key', spreadsheet_id), client.open_by_key, spreadsheet_id)
+        response = scheduler.call(('values', spreadsheet_id, sheet['id']), doc.values_get, a1)
+    return response.get('values', [])
+
+def column_letter(index: int) -> str:
+    """열 번호(A=0) → A1 열 문자 (0 → A, 25 → Z, 26 → AA)"""
+    letters = ''
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+def column_spans(columns: Iterable[int]) -> List[Tuple[int, int]]:
+    """열 번호들을 연속 구간으로 묶음: {0,1,2,3,7,...,15,20,21,22} → [(0, 3), (7, 15), (20, 22)]"""
+    spans: List[Tuple[int, int]] = []
+    for c in sorted(set(columns)):
+        if spans and c == spans[-1][1] + 1:
+            spans[-1] = (spans[-1][0], c)
+        else:
+            spans.append((c, c))
+    return spans
+
+def read_sheet_columns(client: Any, spreadsheet_id: str, sheet: Dict[str, Any], columns: Sequence[int],
+                       scheduler: Optional[RequestScheduler] = None, tail_from: Optional[int] = None) -> List[List[str]]:
+    """
+    columns 에 있는 열만 values_batch_get 한 번으로 읽습니다 (연속 구간마다 'A:D' 같은 범위 하나).
+    결과 행은 원래 열 위치를 유지한 고정 폭(최대 열 + 1) 목록이라 row[COL[...]] 인덱싱을 그대로 쓸 수 있고,
+    읽지 않은 열은 '' 입니다 (호출하는 쪽에서 행마다 칸을 채울 필요 없음).
+    tail_from 을 주면 그 열부터 시트의 마지막 열(매니페스트의 열 수)까지도 함께 읽습니다.
+    """
+    scheduler = scheduler or get_scheduler()
+    if tail_from is not None:
+        columns = list(columns) + list(range(tail_from, sheet.get('cols') or 0))
+    spans = column_spans(columns)
+    a1 = _a1_sheet(sheet['title'])
+    ranges = [f"{a1}!{column_letter(start)}:{column_letter(end)}" for start, end in spans]
+    key = ('values', spreadsheet_id, sheet['id'], tuple(spans))
+    http_client = getattr(client, 'http_client', None)
+    if http_client is not None:
+        response = scheduler.call(key, http_client.values_batch_get, spreadsheet_id, ranges)
+    else:
+        doc = scheduler.call_cached(('open_key', spreadsheet_id), client.open_by_key, spreadsheet_id)
+        response = scheduler.call(key, doc.values_batch_get, ranges)
+
+    blocks = [vr.get('values', []) for vr in response.get('valueRanges', [])]
+    width = spans[-1][1] + 1 if spans else 0
+    rows = [[''] * width for _ in range(max((len(b) for b in blocks), default=0))]
+    for (start, _), block in zip(spans, blocks):
+        for row, values in zip(rows, block):
+            row[start:start + len(values)] = values
+    # 끝쪽 빈 행은 전체 읽기(get_all_values)와 같게 생략
+    while rows and not any(rows[-1]): rows.pop()
+    return rows
+
+def _is_lookup_miss(exc: BaseException) -> bool:
+    """시트 이름이 바뀌었거나 삭제되어 범위를 찾지 못한 경우 (Sheets API 400 'Unable to parse range')"""
+    response = getattr(exc, 'response', None)
+    return getattr(response, 'status_code', None) in (400, 404) or 'Unable to parse range' in str(exc)
+
+def fetch_target_sheets(client: Any, url: str, pattern: Pattern[str],
+                        scheduler: Optional[RequestScheduler] = None,
+                        manifest: Optional[SheetManifest] = None,
+                        columns: Optional[Sequence[int]] = None,
+                        tail_from: Optional[int] = None) -> Iterator[Tuple[Dict[str, Any], List[List[str]]]]:
+    """
+    제목이 pattern 에 맞는 시트마다 (시트 정보, 행 목록) 을 순서대로 돌려줍니다.
+    매니페스트 기준으로 읽다가 시트를 찾지 못하면 매니페스트를 무효화하고 한 번 다시 탐색합니다.
+    columns 를 주면 그 열만 읽습니다 (read_sheet_columns, 행 폭 = 최대 열 + 1). tail_from 은 그 열부터 시트 끝 열까지 추가.
+    """
+    scheduler = scheduler or get_scheduler()
+    manifest = manifest or get_manifest()
+    # 탐색(연결) 오류는 호출 시점에 바로 드러나도록 먼저 실행하고, 값 읽기는 순회하면서 진행
+    spreadsheet_id, sheets = discover_sheets(client, url, scheduler, manifest)
+    return _iter_target_sheets(client, url, pattern, scheduler, manifest, spreadsheet_id, sheets, columns, tail_from)
+
+def _iter_target_sheets(client: Any, url: str, pattern: Pattern[str], scheduler: RequestScheduler, manifest: SheetManifest,
+                        spreadsheet_id: str, sheets: List[Dict[str, Any]],
+                        columns: Optional[Sequence[int]] = None,
+                        tail_from: Optional[int] = None) -> Iterator[Tuple[Dict[str, Any], List[List[str]]]]:
+    pending = [s for s in sheets if pattern.search(s['title'])]
+    done = set()
+    rediscovered = False
+
+    while pending:
+        sheet = pending.pop(0)
+        try:
+            if columns:
+                rows = read_sheet_columns(client, spreadsheet_id, sheet, columns, scheduler, tail_from)
+            else:
+                rows = read_sheet_values(client, spreadsheet_id, sheet, scheduler)
+        except Exception as e:
+            if rediscovered or not _is_lookup_miss(e):
+                print(f"⚠️ 시트 데이터 읽기 실패 ({sheet['title']}): {e}")
+                done.add(sheet['id'])
+                continue
+            # 캐시된 시트 구성이 실제와 다름 → 무효화 후 한 번 재탐색하고 남은 시트 목록을 새로 구성
+            print(f"🔄 시트 구성이 바뀌었습니다. 시트 목록을 다시 가져옵니다... ({sheet['title']})")
+            manifest.invalidate(spreadsheet_id)
+            scheduler.invalidate(('open_key', spreadsheet_id))
+            _, fresh = discover_sheets(client, url, scheduler, manifest)
+            rediscovered = True
+            pending = [s for s in fresh if pattern.search(s['title']) and s['id'] not in done]
+            continue
+        done.add(sheet['id'])
+        yield sheet, rows
@@ -0,0 +1,247 @@
+import os
+import time
+import random
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+# ==========================================
+# 1. 설정 정보
+# ==========================================
+KEY_FILE = 'service_key.json'
+SCOPES = [
+    'https://www.googleapis.com/auth/spreadsheets',
+    'https://www.googleapis.com/auth/drive'
+]
+
+# Sheets API 읽기 쿼터 (사용자당 분당 60회). 여러 작업이 같은 계정으로 동시에 돌면
+# 환경변수로 작업별 몫을 나눠 줄 수 있음. 예: SHEETS_READS_PER_MINUTE=20
+READ_QUOTA_PER_MINUTE = int(os.environ.get('SHEETS_READS_PER_MINUTE', '60'))
+RETRY_STATUS = (429, 500, 503)  # 재시도할 HTTP 상태
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0    # 초
+BACKOFF_MAX = 64.0    # 초
+# call_cached 로 명시적으로 보관하는 결과(스프레드시트 핸들 등)의 유효 시간 (초)
+HANDLE_TTL = 300.0
+
+# 구글 대신 로컬 대역 서버(generators/sheets_stub.py)로 요청을 보낼 때 지정. 예: SHEETS_ENDPOINT=http://127.0.0.1:8765
+SHEETS_ENDPOINT = os.environ.get('SHEETS_ENDPOINT', '').rstrip('/')
+GOOGLE_HOSTS = ('https://docs.google.com', 'https://sheets.googleapis.com')
+
+# 응답 수 / 내려받은 바이트 (실행 지표용, authorize() 로 만든 클라이언트의 모든 응답 합계)
+TRANSFER_STATS = {'responses': 0, 'bytes': 0}
+_transfer_lock = threading.Lock()
+
+# ==========================================
+# 2. 토큰 버킷
+# ==========================================
+class TokenBucket:
+    """
+    분당 쿼터를 초당 보충량으로 환산한 토큰 버킷.
+    clock / sleep 을 주입할 수 있어 가짜 시계로 시험할 수 있습니다.
+    """
+
+    def __init__(self, capacity: int, refill_per_sec: float,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.capacity = capacity
+        self.refill_per_sec = refill_per_sec
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = float(capacity)
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, quota: int, **kwargs: Any) -> 'TokenBucket':
+        return cls(capacity=quota, refill_per_sec=quota / 60.0, **kwargs)
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_sec)
+        self.updated = now
+
+    def try_acquire(self, tokens: int = 1) -> bool:
+        """기다리지 않고 토큰을 얻을 수 있으면 소비하고 True (서버 쪽 쿼터 흉내용)"""
+        with self.lock:
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: int = 1) -> float:
+        """토큰을 얻을 때까지 기다리고, 기다린 시간(초)을 반환합니다."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited
+                delay = (tokens - self.tokens) / self.refill_per_sec
+            self.sleep(delay)
+            waited += delay
+
+# ==========================================
+# 3. 요청 스케줄러 (쿼터 + 중복 요청 병합 + 백오프)
+# ==========================================
+def _status_code(exc: BaseException) -> Optional[int]:
+    """gspread.exceptions.APIError 등에서 HTTP 상태 코드를 꺼냅니다."""
+    response = getattr(exc, 'response', None)
+    code = getattr(response, 'status_code', None) or getattr(exc, 'code', None) or getattr(exc, 'status_code', None)
+    return code if isinstance(code, int) else None
+
+class RequestScheduler:
+    """
+    모든 gspread 호출이 거쳐 가는 중앙 스케줄러.
+    - 호출마다 토큰 버킷에서 읽기 쿼터 1개를 소비
+    - 같은 key 의 요청이 진행 중이면 새로 보내지 않고 그 결과를 함께 받음 (끝난 요청의 결과는 보관하지 않음)
+    - 결과를 재사용해도 되는 호출(스프레드시트 핸들 등)만 call_cached 로 ttl 동안 보관
+    - 429/5xx 응답은 지수 백오프(+지터)로 재시도
+    """
+
+    def __init__(self, bucket: Optional[TokenBucket] = None, max_retries: int = MAX_RETRIES,
+                 backoff_base: float = BACKOFF_BASE, backoff_max: float = BACKOFF_MAX,
+                 sleep: Callable[[float], None] = time.sleep, rng: Optional[random.Random] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.bucket = bucket or TokenBucket.per_minute(READ_QUOTA_PER_MINUTE, clock=clock, sleep=sleep)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.sleep = sleep
+        self.rng = rng or random.Random()
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.inflight: Dict[Hashable, Future] = {}                # 진행 중인 요청 (끝나면 제거)
+        self.cached: Dict[Hashable, Tuple[float, Any]] = {}       # call_cached 결과: key → (만료 시각, 값)
+        self.stats = {'calls': 0, 'coalesced': 0, 'cached': 0, 'retries': 0, 'throttled_sec': 0.0}
+
+    def call(self, key: Optional[Hashable], fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        fn(*args, **kwargs) 를 쿼터 안에서 실행합니다.
+        같은 key 의 요청이 아직 진행 중이면 중복 요청으로 보고 그 요청의 결과(또는 예외)를 함께 돌려줍니다.
+        요청이 끝나면 key 를 지우므로 그 뒤의 호출은 새로 읽습니다 (다시 읽기/실시간 갱신에 이전 값이 섞이지 않음).
+        key=None 이면 병합하지 않습니다 (쓰기 등).
+        """
+        if key is None:
+            return self._execute(fn, args, kwargs)
+
+        with self.lock:
+            future = self.inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self.inflight[key] = future
+            else:
+                self.stats['coalesced'] += 1
+
+        if owner:
+            try:
+                future.set_result(self._execute(fn, args, kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                with self.lock:
+                    self.inflight.pop(key, None)
+        return future.result()
+
+    def call_cached(self, key: Hashable, fn: Callable[..., Any], *args: Any, ttl: float = HANDLE_TTL, **kwargs: Any) -> Any:
+        """
+        결과를 ttl 초 동안 보관하고 재사용하는 call (시트마다 다시 열 필요가 없는 스프레드시트 핸들 등).
+        시트 값처럼 바뀌는 데이터에는 쓰지 않습니다. 실패한 결과는 보관하지 않습니다.
+        """
+        with self.lock:
+            entry = self.cached.get(key)
+            if entry is not None and entry[0] > self.clock():
+                self.stats['cached'] += 1
+                return entry[1]
+        value = self.call(key, fn, *args, **kwargs)
+        with self.lock:
+            self.cached[key] = (self.clock() + ttl, value)
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        """call_cached 로 보관한 결과를 버림 (진행 중인 요청은 그대로 끝까지 공유)"""
+        with self.lock:
+            self.cached.pop(key, None)
+
+    def clear(self) -> None:
+        """call_cached 로 보관한 결과를 모두 버림 (같은 프로세스에서 스프레드시트를 다시 열 때)"""
+        with self.lock:
+            self.cached.clear()
+
+    def _execute(self, fn: Callable[..., Any], args: Any, kwargs: Any) -> Any:
+        attempt = 0
+        while True:
+            waited = self.bucket.acquire()
+            with self.lock:
+                self.stats['calls'] += 1
+                self.stats['throttled_sec'] += waited
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if _status_code(e) not in RETRY_STATUS or attempt >= self.max_retries:
+                    raise
+                delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+                delay += self.rng.uniform(0, delay / 2)
+                attempt += 1
+                with self.lock:
+                    self.stats['retries'] += 1
+                print(f"⏳ 요청 제한/일시 오류({_status_code(e)}) - {delay:.1f}초 후 재시도 ({attempt}/{self.max_retries})")
+                self.sleep(delay)
+
+_default_scheduler: Optional[RequestScheduler] = None
+_default_lock = threading.Lock()
+
+def get_scheduler() -> RequestScheduler:
+    """프로세스 전체가 공유하는 기본 스케줄러 (같은 프로세스의 모든 리포트가 같은 쿼터를 씀)"""
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            _default_scheduler = RequestScheduler()
+        return _default_scheduler
+
+# ==========================================
+# 4. 엔드포인트 / 인증
+# ==========================================
+def endpoint_url(url: str, endpoint: Optional[str] = None) -> str:
+    """SHEETS_ENDPOINT 가 설정되어 있으면 구글 호스트를 대역 서버 주소로 바꿉니다 (경로/쿼리는 그대로)."""
+    endpoint = SHEETS_ENDPOINT if endpoint is None else endpoint.rstrip('/')
+    if not endpoint: return url
+    for host in GOOGLE_HOSTS:
+        if url.startswith(host):
+            return endpoint + url[len(host):]
+    return url
+
+def _endpoint_session(endpoint: str) -> Any:
+    import requests
+
+    class EndpointSession(requests.Session):
+        """gspread 가 만드는 모든 요청 URL 을 대역 서버로 돌림 (인증 헤더 없음)"""
+        def request(self, method: str, url: str, *args: Any, **kwargs: Any) -> Any:  # type: ignore[override]
+            return super().request(method, endpoint_url(url, endpoint), *args, **kwargs)
+
+    return EndpointSession()
+
+def _count_transfer(response: Any, *args: Any, **kwargs: Any) -> None:
+    with _transfer_lock:
+        TRANSFER_STATS['responses'] += 1
+        TRANSFER_STATS['bytes'] += len(response.content)
+
+def authorize(key_file: str = KEY_FILE, scopes: Optional[List[str]] = None, endpoint: Optional[str] = None) -> Any:
+    """
+    서비스 계정으로 gspread 클라이언트를 만듭니다 (gspread / google-auth 는 이때 import).
+    SHEETS_ENDPOINT(또는 endpoint 인자)가 있으면 키 파일 없이 대역 서버에 연결합니다.
+    """
+    import gspread
+    endpoint = SHEETS_ENDPOINT if endpoint is None else endpoint.rstrip('/')
+    if endpoint:
+        print(f"🧪 로컬 시트 대역 서버 사용: {endpoint}")
+        client = gspread.Client(auth=None, session=_endpoint_session(endpoint))
+    else:
+        from google.oauth2.service_account import Credentials
+
+        creds = Credentials.from_service_account_file(key_file, scopes=scopes or SCOPES)
+        client = gspread.authorize(creds)
+    client.http_client.session.hooks['response'].append(_count_transfer)
+    return client
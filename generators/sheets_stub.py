@@ -0,0 +1,353 @@
+import re
+import csv
+import io
+import json
+import time
+import random
+import argparse
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, unquote
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sheets_client import TokenBucket
+
+# ==========================================
+# 1. 설정 정보
+# ==========================================
+# 실제 구글 시트와 같은 ID/gid 를 쓰므로, 생성기 쪽은 SHEETS_ENDPOINT 만 바꾸면 그대로 동작
+SPREADSHEET_ID = '1I_Cy5TZEnG0GmoThLPJJR7ZrXxUgXzsDDzu2zOtmjQI'
+SURVEY_MAIN_GID = 294818561
+RESULT_GIDS = {'early': 214657398, 'late': 1675631175}
+SURVEY_TITLE = "진학희망 및 지원유형 조사(3{num:02d})_Sheet1"
+
+DEFAULT_PORT = 8765
+ERROR_STATUS = {429: 'RESOURCE_EXHAUSTED', 500: 'INTERNAL', 503: 'UNAVAILABLE', 400: 'INVALID_ARGUMENT', 404: 'NOT_FOUND'}
+
+# 설문 시트 헤더 (generate_dashboard / generate_table 의 열 위치와 동일: H~P 지원, U~W 합불)
+SURVEY_HEADER = ['반', '번호', '성명', '성별', '연락처', '희망계열', '비고',
+                 '영재고', '과학고', '예술고', '특성화고', '학과', '자사고', '외고/국제고', '일반고', '기타',
+                 '', '', '', '', '영재고 합불', '전기고 합불', '후기고 합불']
+
+# ==========================================
+# 2. 합성 데이터
+# ==========================================
+def synthetic_result_rows(mode: str, students: int, seed: int = 0) -> List[List[str]]:
+    """
+    전기고/후기고 결과 시트(CSV export)와 같은 레이아웃의 합성 행.
+    그룹마다 [반, 이름, 성별, 학교명, 학과, 합격여부] 블록이 가로로 나열됩니다.
+    """
+    rng = random.Random(seed)
+    group_count = 4 if mode == 'early' else 3
+    schools = ['하나고', '중동고', '대원외고', '서울과학고', '서울예고', '미림마이스터고']
+
+    header: List[str] = []
+    for _ in range(group_count):
+        header += ['반', '이름', '성별', '학교명', '학과', '합격여부']
+    rows = [['2026 진학 현황'] + [''] * (len(header) - 1), header]
+    for i in range(students):
+        row: List[str] = []
+        for g in range(group_count):
+            if rng.random() < 0.4:
+                row += [f"3-{rng.randint(1, 15)}", f"학생{g}{i}", rng.choice(['남', '여']),
+                        rng.choice(schools), '', rng.choice(['합격', '불합격', ''])]
+            else:
+                row += [''] * 6
+        rows.append(row)
+    return rows
+
+def synthetic_survey_rows(class_num: int, students: int, seed: int = 0) -> List[List[str]]:
+    """반별 진학희망 조사 시트 (1행 제목, 2행 헤더, 3행부터 학생)"""
+    rng = random.Random(seed * 1000 + class_num)
+    tracks = [(7, 0.08, ['O', '한국과학영재학교', '서울과학영재학교']), (8, 0.10, ['서울과학고', '세종과학고', '한성과학고']),
+              (9, 0.08, ['서울예고', '선화예술고', '덕원예고']), (10, 0.10, ['미림마이스터고', '서울로봇고']),
+              (12, 0.20, ['하나고', '중동고', '하나고등학교']), (13, 0.12, ['대원외고', '명덕외고', '서울국제고']),
+              (14, 0.25, ['목동고', '양정고']), (15, 0.07, ['대안학교'])]
+    rows = [[f"3학년 {class_num}반 진학희망 및 지원유형 조사"] + [''] * (len(SURVEY_HEADER) - 1), list(SURVEY_HEADER)]
+    for i in range(students):
+        row = [f"3-{class_num}", str(i + 1), f"학생{class_num:02d}{i:03d}", rng.choice(['남', '여'])] + [''] * (len(SURVEY_HEADER) - 4)
+        pick, acc = rng.random(), 0.0
+        for col, weight, schools in tracks:
+            acc += weight
+            if pick < acc:
+                row[col] = rng.choice(schools)
+                if col == 7:
+                    row[20] = rng.choice(['1차합격', '2차합격', '최종합격', '불합격', ''])
+                    # 영재고 탈락 후 과학고 지원 (폭포수 이력)
+                    if '불합' in row[20] and rng.random() < 0.5: row[8] = rng.choice(tracks[1][2])
+                elif col in (8, 9, 10): row[21] = rng.choice(['합격', '불합격', ''])
+                elif col in (12, 13): row[22] = rng.choice(['합격', '불합격', ''])
+                break
+        rows.append(row)
+    return rows
+
+def build_workbook(classes: int = 15, students_per_class: int = 30, result_students: int = 60, seed: int = 0) -> Dict[str, Any]:
+    """대역 서버가 제공할 스프레드시트 하나 (설문 시트 + 전기고/후기고 결과 시트)"""
+    sheets = [{'id': SURVEY_MAIN_GID, 'title': '진학희망 및 지원유형 조사', 'rows': [list(SURVEY_HEADER)]}]
+    for num in range(1, classes + 1):
+        sheets.append({'id': 1000 + num, 'title': SURVEY_TITLE.format(num=num), 'rows': synthetic_survey_rows(num, students_per_class, seed)})
+    sheets.append({'id': RESULT_GIDS['early'], 'title': '전기고 결과', 'rows': synthetic_result_rows('early', result_students, seed + 1)})
+    sheets.append({'id': RESULT_GIDS['late'], 'title': '후기고 결과', 'rows': synthetic_result_rows('late', result_students, seed + 2)})
+    return {'id': SPREADSHEET_ID, 'title': '2026 진학 현황 (로컬 대역)', 'sheets': sheets}
+
+# ==========================================
+# 3. A1 범위
+# ==========================================
+A1_CELL = re.compile(r"^([A-Za-z]*)(\d*)$")
+
+def _col_index(letters: str) -> int:
+    n = 0
+    for ch in letters.upper():
+        n = n * 26 + (ord(ch) - 64)
+    return n - 1
+
+def split_range(a1: str) -> Tuple[str, str]:
+    """"'시트 이름'!A1:D10" → ("시트 이름", "A1:D10") (범위가 없으면 '')"""
+    if a1.startswith("'"):
+        i = 1
+        while i < len(a1):
+            if a1[i] == "'":
+                if a1[i + 1:i + 2] == "'": i += 2; continue
+                break
+            i += 1
+        title, rest = a1[1:i].replace("''", "'"), a1[i + 1:]
+        return title, rest[1:] if rest.startswith('!') else rest
+    title, _, cells = a1.partition('!')
+    return title, cells
+
+def slice_range(rows: Sequence[Sequence[str]], cells: str) -> List[List[str]]:
+    """A1 표기(A1:D10, A:D, H3:P, B2)만큼 잘라낸 행 목록"""
+    if not cells: return [list(r) for r in rows]
+    start, _, end = cells.partition(':')
+    end = end or start
+    m1, m2 = A1_CELL.match(start), A1_CELL.match(end)
+    if not m1 or not m2: raise ValueError(f"Unable to parse range: {cells}")
+    c0 = _col_index(m1.group(1)) if m1.group(1) else 0
+    c1 = _col_index(m2.group(1)) + 1 if m2.group(1) else None
+    r0 = int(m1.group(2)) - 1 if m1.group(2) else 0
+    r1 = int(m2.group(2)) if m2.group(2) else None
+    return [list(r[c0:c1]) for r in rows[r0:r1]]
+
+def workbook_xlsx(workbook: Dict[str, Any]) -> bytes:
+    """전체 시트를 XLSX 한 파일로 (숫자만 있는 칸은 구글 시트처럼 숫자 셀로 저장)"""
+    import openpyxl
+    book = openpyxl.Workbook(write_only=True)
+    for sheet in workbook['sheets']:
+        ws = book.create_sheet(sheet['title'][:100])
+        for r in sheet['rows']:
+            ws.append([int(v) if v.isdigit() and str(int(v)) == v else (v or None) for v in r])
+    buf = io.BytesIO()
+    book.save(buf)
+    return buf.getvalue()
+
+def _trim(rows: List[List[str]]) -> List[List[str]]:
+    """Sheets API 처럼 행 끝 빈칸과 끝쪽 빈 행을 생략"""
+    out = []
+    for r in rows:
+        while r and r[-1] == '': r = r[:-1]
+        out.append(r)
+    while out and not out[-1]: out.pop()
+    return out
+
+# ==========================================
+# 4. 대역 서버
+# ==========================================
+class SheetsStub:
+    """
+    구글 시트의 CSV export 와 gspread 가 쓰는 Sheets API v4 일부(메타데이터, values, values:batchGet)를 흉내 냅니다.
+    - latency_ms / jitter_ms: 응답마다 지연
+    - error_rate / error_status: 확률적으로 5xx 등 오류 응답
+    - quota_per_minute: 분당 요청 수를 넘으면 429 (0 = 제한 없음)
+    요청 종류/상태별 횟수는 stats 와 GET /__stats 로 확인합니다.
+    GET /__latency?ms=N 으로 실행 중에 응답 지연을 바꿉니다 (제한 시간 초과 시험용).
+    """
+
+    def __init__(self, workbook: Optional[Dict[str, Any]] = None, latency_ms: float = 0, jitter_ms: float = 0,
+                 error_rate: float = 0.0, error_status: Sequence[int] = (500, 503), quota_per_minute: int = 0, seed: int = 0):
+        self.workbooks = {}
+        self.add_workbook(workbook or build_workbook(seed=seed))
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = tuple(error_status)
+        self.bucket = TokenBucket.per_minute(quota_per_minute) if quota_per_minute else None
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats: Counter = Counter()
+
+    def add_workbook(self, workbook: Dict[str, Any]) -> None:
+        self.workbooks[workbook['id']] = workbook
+
+    def _count(self, *keys: str) -> None:
+        with self.lock:
+            for k in keys: self.stats[k] += 1
+
+    def _error(self, code: int, message: str) -> Tuple[int, str, bytes]:
+        body = {'error': {'code': code, 'message': message, 'status': ERROR_STATUS.get(code, 'UNKNOWN')}}
+        return code, 'application/json; charset=UTF-8', json.dumps(body, ensure_ascii=False).encode('utf-8')
+
+    def _json(self, payload: Any) -> Tuple[int, str, bytes]:
+        return 200, 'application/json; charset=UTF-8', json.dumps(payload, ensure_ascii=False).encode('utf-8')
+
+    def _sheet(self, workbook: Dict[str, Any], title: str) -> Optional[Dict[str, Any]]:
+        return next((s for s in workbook['sheets'] if s['title'] == title), None)
+
+    def handle(self, path: str, query: Dict[str, List[str]]) -> Tuple[int, str, bytes]:
+        """(상태 코드, Content-Type, 본문) 반환"""
+        if path == '/__stats':
+            with self.lock:
+                return self._json(dict(self.stats))
+        if path == '/__latency':
+            with self.lock:
+                if 'ms' in query: self.latency_ms = float(query['ms'][0])
+                return self._json({'latency_ms': self.latency_ms})
+
+        kind, handler, args = self._route(path)
+        self._count('requests', kind)
+        if self.bucket is not None and not self.bucket.try_acquire():
+            result = self._error(429, "Quota exceeded for quota metric 'Read requests' (local stub)")
+        else:
+            with self.lock:
+                inject = self.error_rate and self.rng.random() < self.error_rate
+                status = self.rng.choice(self.error_status) if inject else 0
+            result = self._error(status, 'Injected error (local stub)') if inject else handler(query, *args)
+
+        delay = self.latency_ms + (self.rng.uniform(0, self.jitter_ms) if self.jitter_ms else 0)
+        if delay: time.sleep(delay / 1000)
+        self._count(f"status_{result[0]}")
+        return result
+
+    def _route(self, path: str) -> Tuple[str, Any, Tuple[str, ...]]:
+        for kind, pattern, handler in (
+            ('export', r"^/spreadsheets/d/([^/]+)/export$", self._export),
+            ('batch_get', r"^/v4/spreadsheets/([^/]+)/values:batchGet$", self._batch_get),
+            ('values', r"^/v4/spreadsheets/([^/]+)/values/(.+)$", self._values),
+            ('metadata', r"^/v4/spreadsheets/([^/]+)$", self._metadata),
+        ):
+            m = re.match(pattern, path)
+            if m: return kind, handler, tuple(unquote(g) for g in m.groups())
+        return 'unknown', lambda query: self._error(404, f"Unknown path: {path}"), ()
+
+    def _workbook(self, spreadsheet_id: str) -> Optional[Dict[str, Any]]:
+        return self.workbooks.get(spreadsheet_id)
+
+    def _export(self, query: Dict[str, List[str]], spreadsheet_id: str) -> Tuple[int, str, bytes]:
+        workbook = self._workbook(spreadsheet_id)
+        if workbook is None: return self._error(404, 'Spreadsheet not found')
+        fmt = query.get('format', ['csv'])[0]
+        if fmt == 'xlsx':
+            return 200, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', workbook_xlsx(workbook)
+        if fmt != 'csv': return self._error(400, 'Only format=csv/xlsx is supported by the stub')
+        gid = int(query.get('gid', [workbook['sheets'][0]['id']])[0])
+        sheet = next((s for s in workbook['sheets'] if s['id'] == gid), None)
+        if sheet is None: return self._error(404, f"No sheet with gid {gid}")
+        # CSV export 는 시트 너비만큼 빈칸을 채움
+        width = max((len(r) for r in sheet['rows']), default=0)
+        buf = io.StringIO()
+        writer = csv.writer(buf, lineterminator='\r\n')
+        for r in sheet['rows']:
+            writer.writerow(list(r) + [''] * (width - len(r)))
+        return 200, 'text/csv; charset=utf-8', buf.getvalue().encode('utf-8')
+
+    def _metadata(self, query: Dict[str, List[str]], spreadsheet_id: str) -> Tuple[int, str, bytes]:
+        workbook = self._workbook(spreadsheet_id)
+        if workbook is None: return self._error(404, 'Requested entity was not found.')
+        sheets = [{'properties': {'sheetId': s['id'], 'title': s['title'], 'index': i, 'sheetType': 'GRID',
+                                  'gridProperties': {'rowCount': max(len(s['rows']), 1000),
+                                                     'columnCount': max(max((len(r) for r in s['rows']), default=0), 26)}}}
+                  for i, s in enumerate(workbook['sheets'])]
+        return self._json({'spreadsheetId': spreadsheet_id, 'properties': {'title': workbook['title'], 'locale': 'ko_KR'},
+                           'sheets': sheets, 'spreadsheetUrl': f"https://docs.google.com/spreadsheets/d/{spreadsheet_id}/edit"})
+
+    def _value_range(self, workbook: Dict[str, Any], a1: str) -> Optional[Dict[str, Any]]:
+        title, cells = split_range(a1)
+        sheet = self._sheet(workbook, title)
+        if sheet is None: return None
+        return {'range': a1, 'majorDimension': 'ROWS', 'values': _trim(slice_range(sheet['rows'], cells))}
+
+    def _values(self, query: Dict[str, List[str]], spreadsheet_id: str, a1: str) -> Tuple[int, str, bytes]:
+        workbook = self._workbook(spreadsheet_id)
+        if workbook is None: return self._error(404, 'Requested entity was not found.')
+        try:
+            value_range = self._value_range(workbook, a1)
+        except ValueError as e:
+            return self._error(400, str(e))
+        if value_range is None: return self._error(400, f"Unable to parse range: {a1}")
+        return self._json(value_range)
+
+    def _batch_get(self, query: Dict[str, List[str]], spreadsheet_id: str) -> Tuple[int, str, bytes]:
+        workbook = self._workbook(spreadsheet_id)
+        if workbook is None: return self._error(404, 'Requested entity was not found.')
+        ranges = []
+        for a1 in query.get('ranges', []):
+            try:
+                value_range = self._value_range(workbook, a1)
+            except ValueError as e:
+                return self._error(400, str(e))
+            if value_range is None: return self._error(400, f"Unable to parse range: {a1}")
+            ranges.append(value_range)
+        return self._json({'spreadsheetId': spreadsheet_id, 'valueRanges': ranges})
+
+def _handler_class(stub: SheetsStub, verbose: bool) -> type:
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self) -> None:
+            parts = urlsplit(self.path)
+            status, content_type, body = stub.handle(parts.path, parse_qs(parts.query))
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            if verbose: super().log_message(format, *args)
+
+    return StubHandler
+
+def start_stub(stub: Optional[SheetsStub] = None, host: str = '127.0.0.1', port: int = 0,
+               verbose: bool = False) -> Tuple[ThreadingHTTPServer, str]:
+    """백그라운드 스레드에서 대역 서버를 띄우고 (서버, 기본 URL) 을 반환 (port=0 이면 빈 포트)"""
+    server = ThreadingHTTPServer((host, port), _handler_class(stub or SheetsStub(), verbose))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+# ==========================================
+# 5. 실행
+# ==========================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="구글 시트 로컬 대역 서버 (부하/지연 시험용)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--classes', type=int, default=15, help="설문 시트(반) 수 (최대 99)")
+    parser.add_argument('--students', type=int, default=30, help="설문 시트당 학생 수")
+    parser.add_argument('--result-students', type=int, default=60, help="전기고/후기고 결과 시트 행 수")
+    parser.add_argument('--latency', type=float, default=0, help="응답 지연 (ms)")
+    parser.add_argument('--jitter', type=float, default=0, help="추가 무작위 지연 최댓값 (ms)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="오류 응답 확률 (0~1)")
+    parser.add_argument('--error-status', default='500,503', help="주입할 오류 상태 코드 (쉼표 구분)")
+    parser.add_argument('--quota', type=int, default=0, help="분당 허용 요청 수 (초과 시 429, 0 = 무제한)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--verbose', action='store_true', help="요청 로그 출력")
+    args = parser.parse_args()
+    if not 1 <= args.classes <= 99:
+        parser.error("--classes 는 1~99 사이여야 합니다.")
+
+    workbook = build_workbook(args.classes, args.students, args.result_students, args.seed)
+    stub = SheetsStub(workbook, latency_ms=args.latency, jitter_ms=args.jitter, error_rate=args.error_rate,
+                      error_status=[int(c) for c in args.error_status.split(',') if c.strip()],
+                      quota_per_minute=args.quota, seed=args.seed)
+    server = ThreadingHTTPServer((args.host, args.port), _handler_class(stub, args.verbose))
+    base = f"http://{args.host}:{server.server_address[1]}"
+    print(f"🧪 구글 시트 대역 서버 실행 중: {base}")
+    print(f"   시트 {len(workbook['sheets'])}개 (설문 {args.classes}개 × {args.students}명, 결과 {args.result_students}행)")
+    print(f"   생성기에서 사용: SHEETS_ENDPOINT={base} python generators/generate_dashboard.py")
+    print(f"   요청 통계: {base}/__stats  /  지연 변경: {base}/__latency?ms=5000  (Ctrl+C 로 종료)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 대역 서버 종료")
+        print(json.dumps(dict(stub.stats), ensure_ascii=False))
@@ -0,0 +1,94 @@
+import os
+import json
+import shutil
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# ==========================================
+# 1. 설정 정보
+# ==========================================
+# 스냅샷 위치: .cache/snapshots/<원본 키>/<수집 시각>/col_0000.npy ... + meta.json
+SNAPSHOT_DIR = os.path.join('.cache', 'snapshots')
+SNAPSHOT_KEEP = 5            # 원본별로 보관할 최근 스냅샷 수
+SNAPSHOT_VERSION = 1
+SNAPSHOT_BLOCK_ROWS = 10000  # 행으로 바꿀 때 한 번에 읽는 행 수 (mmap 에서 이만큼씩만 메모리에 올림)
+TIME_FORMAT = '%Y%m%d-%H%M%S'
+
+def source_key(source: str) -> str:
+    """원본(URL / 로컬 경로)별 폴더 이름"""
+    return hashlib.sha1(source.encode('utf-8')).hexdigest()[:12]
+
+# ==========================================
+# 2. 저장
+# ==========================================
+def save_snapshot(source: str, columns: Sequence[Sequence[str]], fetched_at: Optional[datetime] = None,
+                  root: str = SNAPSHOT_DIR) -> str:
+    """
+    파싱된 원본 표를 열 단위 NumPy 배열(고정 길이 유니코드)로 저장합니다.
+    열마다 .npy 한 개라서 읽을 때 파싱/타입 추론 없이 mmap 으로 바로 열 수 있습니다.
+    """
+    import numpy as np
+
+    fetched_at = fetched_at or datetime.now()
+    base = os.path.join(root, source_key(source))
+    path = os.path.join(base, fetched_at.strftime(TIME_FORMAT))
+    tmp = f"{path}.tmp-{os.getpid()}"
+    os.makedirs(tmp, exist_ok=True)
+
+    n_rows = len(columns[0]) if columns else 0
+    for j, col in enumerate(columns):
+        arr = np.asarray(col, dtype=np.str_)
+        if arr.dtype.itemsize == 0: arr = arr.astype('<U1')  # 빈 열도 mmap 가능하도록
+        np.save(os.path.join(tmp, f"col_{j:04d}.npy"), arr)
+    meta = {'version': SNAPSHOT_VERSION, 'source': source, 'fetched_at': fetched_at.isoformat(timespec='seconds'),
+            'n_rows': n_rows, 'n_cols': len(columns)}
+    with open(os.path.join(tmp, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=1)
+
+    # 완성된 폴더만 보이도록 마지막에 이름 변경 (같은 초에 다시 저장하면 교체)
+    if os.path.exists(path): shutil.rmtree(path)
+    os.replace(tmp, path)
+    _prune(base)
+    return path
+
+def _prune(base: str, keep: int = SNAPSHOT_KEEP) -> None:
+    for name in _snapshot_names(base)[:-keep]:
+        shutil.rmtree(os.path.join(base, name), ignore_errors=True)
+
+# ==========================================
+# 3. 찾기 / 불러오기
+# ==========================================
+def _snapshot_names(base: str) -> List[str]:
+    if not os.path.isdir(base): return []
+    return sorted(n for n in os.listdir(base)
+                  if '.tmp-' not in n and os.path.exists(os.path.join(base, n, 'meta.json')))
+
+def find_snapshot(source: str, selector: str = 'latest', root: str = SNAPSHOT_DIR) -> Optional[str]:
+    """
+    selector: 'latest'(가장 최근), 수집 시각 앞부분(예: '20261019', '20261019-0930'), 또는 스냅샷 폴더 경로
+    """
+    if os.path.isdir(selector) and os.path.exists(os.path.join(selector, 'meta.json')):
+        return selector
+    base = os.path.join(root, source_key(source))
+    names = _snapshot_names(base)
+    if selector != 'latest':
+        names = [n for n in names if n.startswith(selector)]
+    return os.path.join(base, names[-1]) if names else None
+
+def load_snapshot(path: str) -> Tuple[Dict[str, Any], List[Any]]:
+    """(meta, 열 배열 목록). 배열은 읽기 전용 mmap 이라 실제로 읽는 부분만 메모리에 올라옵니다."""
+    import numpy as np
+
+    with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('version') != SNAPSHOT_VERSION:
+        raise ValueError(f"지원하지 않는 스냅샷 버전: {meta.get('version')}")
+    columns = [np.load(os.path.join(path, f"col_{j:04d}.npy"), mmap_mode='r') for j in range(meta['n_cols'])]
+    return meta, columns
+
+def iter_rows(columns: Sequence[Any], block: int = SNAPSHOT_BLOCK_ROWS) -> Iterator[Tuple[str, ...]]:
+    """열 배열들을 행 튜플로 순회 (값은 str, block 행씩 잘라 변환)"""
+    n_rows = len(columns[0]) if columns else 0
+    for start in range(0, n_rows, block):
+        yield from zip(*(col[start:start + block].tolist() for col in columns))
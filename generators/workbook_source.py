@@ -0,0 +1,107 @@
+import os
+import re
+import datetime
+from typing import Any, Dict, Iterator, List, Optional, Pattern, Sequence, Tuple
+
+from sheets_client import endpoint_url
+from sheet_manifest import get_manifest, spreadsheet_id_from_url
+from run_metrics import METRICS
+
+# ==========================================
+# 1. 설정 정보
+# ==========================================
+# 내려받은 통합 문서 보관 위치 (다음 실행에서 --workbook <경로> 로 오프라인 재사용)
+WORKBOOK_DIR = os.path.join('.cache', 'workbooks')
+EXPORT_URL = "https://docs.google.com/spreadsheets/d/{id}/export?format=xlsx"
+DOWNLOAD_BLOCK = 1 << 16
+GID_PATTERN = re.compile(r"[?&#]gid=(\d+)")
+
+def workbook_url(sheet_url: str) -> str:
+    """시트 URL(편집/CSV export 등) → 같은 스프레드시트 전체의 XLSX export URL"""
+    return EXPORT_URL.format(id=spreadsheet_id_from_url(sheet_url))
+
+def _cell_text(value: Any) -> str:
+    """셀 값 → CSV export / 값 API 와 같은 문자열 (빈 칸 '', 정수형 실수는 소수점 없이)"""
+    if value is None: return ''
+    if isinstance(value, bool): return 'TRUE' if value else 'FALSE'
+    if isinstance(value, float) and value.is_integer(): return str(int(value))
+    if isinstance(value, datetime.datetime):
+        return value.strftime('%Y-%m-%d' if value.time() == datetime.time() else '%Y-%m-%d %H:%M:%S')
+    return str(value)
+
+# ==========================================
+# 2. 통합 문서 (한 번 받아 모든 시트를 스트리밍)
+# ==========================================
+class WorkbookSource:
+    """
+    스프레드시트 전체를 XLSX 한 파일로 받아(또는 로컬 .xlsx) 필요한 시트를 read-only 모드로 한 행씩 읽습니다.
+    시트별 CSV export / 값 API 읽기를 요청 한 번으로 대체하고, 받은 파일은 WORKBOOK_DIR 에 남겨 오프라인 실행에 씁니다.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self.path = source if os.path.exists(source) else self._download(source)
+        import openpyxl
+        self.book = openpyxl.load_workbook(self.path, read_only=True, data_only=True)
+        self.titles: List[str] = list(self.book.sheetnames)
+
+    def _download(self, url: str) -> str:
+        import requests
+        os.makedirs(WORKBOOK_DIR, exist_ok=True)
+        path = os.path.join(WORKBOOK_DIR, f"{spreadsheet_id_from_url(url)}.xlsx")
+        tmp = f"{path}.{os.getpid()}.tmp"
+        print("📥 통합 문서(XLSX) 다운로드 중...", end=" ", flush=True)
+        with METRICS.timer('fetch_seconds', source='workbook'), requests.get(endpoint_url(url), stream=True) as resp:
+            resp.raise_for_status()
+            with open(tmp, 'wb') as out:
+                for block in resp.iter_content(DOWNLOAD_BLOCK):
+                    out.write(block)
+        os.replace(tmp, path)
+        METRICS.set('fetch_bytes', os.path.getsize(path), source='workbook')
+        METRICS.set('fetch_requests', 1, source='workbook')
+        print(f"완료! ({os.path.getsize(path) / 1024:.0f}KB → {path})")
+        return path
+
+    def rows(self, title: str, width: Optional[int] = None) -> List[List[str]]:
+        """
+        시트 한 장의 행 목록 (1행부터, 중간 빈 행 유지, 끝쪽 빈 행 생략).
+        width 를 주면 그 열까지만 읽고 모든 행을 같은 폭으로 맞춤 (fetch_target_sheets(columns=...) 와 같은 모양).
+        """
+        out: List[List[str]] = []
+        for values in self.book[title].iter_rows(max_col=width, values_only=True):
+            row = [_cell_text(v) for v in values]
+            if width:
+                row += [''] * (width - len(row))
+            else:
+                while row and row[-1] == '': row.pop()
+            out.append(row)
+        while out and not any(out[-1]): out.pop()
+        return out
+
+    def sheets(self, pattern: Pattern[str], columns: Optional[Sequence[int]] = None,
+               tail_from: Optional[int] = None) -> Iterator[Tuple[Dict[str, Any], List[List[str]]]]:
+        """제목이 pattern 에 맞는 시트마다 (시트 정보, 행 목록) - fetch_target_sheets 대체 (tail_from 이면 시트 끝 열까지)"""
+        width = max(columns) + 1 if columns else None
+        for index, title in enumerate(self.titles):
+            if pattern.search(title):
+                sheet_width = max(width, self.book[title].max_column or 0) if width and tail_from is not None else width
+                yield {'title': title, 'index': index}, self.rows(title, sheet_width)
+
+    def title_for(self, sheet_url: str, default: str) -> Optional[str]:
+        """
+        gid 가 붙은 시트 URL → 통합 문서 안의 시트 이름 (XLSX 에는 gid 가 없음).
+        시트 매니페스트에 gid 가 있으면 그 이름(만료 여부 무관), 없으면 default. 통합 문서에 없으면 None.
+        """
+        match = GID_PATTERN.search(sheet_url)
+        entry = get_manifest().entries.get(spreadsheet_id_from_url(sheet_url), {})
+        known = {str(s['id']): s['title'] for s in entry.get('sheets', [])}
+        title = known.get(match.group(1), default) if match else default
+        return title if title in self.titles else None
+
+_opened: Dict[str, WorkbookSource] = {}
+
+def open_workbook(source: str) -> WorkbookSource:
+    """같은 실행 안에서는 한 번만 내려받고 엽니다 (전기/후기 등 여러 생성 단계 공용)"""
+    if source not in _opened:
+        _opened[source] = WorkbookSource(source)
+    return _opened[source]
@@ -0,0 +1,39 @@
+import os
+import sys
+from typing import Iterator, List
+
+import pytest
+
+# 생성기들은 generators/ 안에서 서로를 형제 모듈로 import
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'generators'))
+
+import output_writer  # noqa: E402
+
+class FakeClock:
+    """주입용 가짜 시계: clock() 은 현재 시각, sleep() 은 기다리지 않고 시각만 앞당김"""
+
+    def __init__(self, start: float = 1000.0):
+        self.now = start
+        self.sleeps: List[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch) -> Iterator[str]:
+    """캐시(.cache)/출력(reports) 경로가 모두 상대 경로라 테스트마다 빈 폴더에서 실행하고, 전역 출력 상태를 되돌림"""
+    monkeypatch.chdir(tmp_path)
+    yield str(tmp_path)
+    output_writer._outputs_closed.clear()
+    output_writer.mark_stale(None)
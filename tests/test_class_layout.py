@@ -0,0 +1,65 @@
+from class_layout import FOOTER_ROWS, HEADER_ROWS, build_class_layout
+
+GROUPS = [
+    {'id': 'g1', 'label': '영재고', 'has_dept': False},
+    {'id': 'g2', 'label': '특성화고', 'has_dept': True},
+    {'id': 'g3', 'label': '예술고', 'has_dept': False},   # 학생 없음 → 표에서 빠짐
+]
+
+def student(name: str) -> dict:
+    return {'name': name, 'gender': '남', 'school': '한국고', 'dept': ''}
+
+def fixture_model():
+    a, b, c = student('가'), student('나'), student('다')
+    classes = {
+        1: {'g1': [a, b], 'g2': [], 'g3': []},   # 보이는 그룹(g2)에 학생 0명
+        2: {'g1': [], 'g2': [c], 'g3': []},
+        3: {'g1': [], 'g2': [], 'g3': []},       # 반 전체가 비어도 한 행
+    }
+    counts = {'g1': 2, 'g2': 1, 'g3': 0}
+    return classes, counts, (a, b, c)
+
+def test_spans_skip_empty_groups_and_include_dept():
+    classes, counts, _ = fixture_model()
+    layout = build_class_layout(classes, GROUPS, counts, [1, 2, 3])
+    assert [g['id'] for g in layout['visible_groups']] == ['g1', 'g2']
+    assert [(s['group']['id'], s['col'], s['width']) for s in layout['spans']] == [('g1', 1, 3), ('g2', 4, 4)]
+    assert layout['n_cols'] == 8
+
+def test_blocks_pad_short_groups_with_none():
+    classes, counts, (a, b, c) = fixture_model()
+    layout = build_class_layout(classes, GROUPS, counts, [1, 2, 3])
+    blocks = {blk['num']: blk for blk in layout['blocks']}
+    assert [(blk['label'], blk['top'], blk['height'], blk['filled']) for blk in layout['blocks']] == [
+        ('3-1', 0, 2, [2, 0]), ('3-2', 2, 1, [0, 1]), ('3-3', 3, 1, [0, 0])]
+    assert blocks[1]['rows'] == [[a, None], [b, None]]
+    assert blocks[2]['rows'] == [[None, c]]
+    assert blocks[3]['rows'] == [[None, None]]
+    assert layout['body_rows'] == 4
+    assert layout['footer_top'] == HEADER_ROWS + 4
+
+def test_merge_ranges():
+    classes, counts, _ = fixture_model()
+    layout = build_class_layout(classes, GROUPS, counts, [1, 2, 3])
+    footer = layout['footer_top']
+    expected = [(0, 0, 1, 0)]                                             # 학반 머리글 (2행)
+    for col, last in ((1, 3), (4, 7)):
+        expected.append((0, col, 0, last))                                # 그룹 이름
+        expected += [(footer + i, col, footer + i, last) for i in range(len(FOOTER_ROWS))]  # 남/여/계
+    expected.append((HEADER_ROWS, 0, HEADER_ROWS + 1, 0))                 # 3-1 학반 칸 (2행), 1행짜리 반은 병합 없음
+    assert layout['merges'] == expected
+
+def test_without_classes_only_headers_and_footer():
+    classes, counts, _ = fixture_model()
+    layout = build_class_layout(classes, GROUPS, counts, ())
+    assert layout['blocks'] == [] and layout['body_rows'] == 0
+    assert layout['footer_top'] == HEADER_ROWS
+    assert (0, 0, HEADER_ROWS - 1, 0) in layout['merges']
+    assert all(r0 == 0 or r0 >= HEADER_ROWS for r0, _, _, _ in layout['merges'])
+
+def test_no_visible_groups():
+    classes, _, _ = fixture_model()
+    layout = build_class_layout(classes, GROUPS, {'g1': 0, 'g2': 0, 'g3': 0}, [1])
+    assert layout['spans'] == [] and layout['n_cols'] == 1
+    assert layout['blocks'][0]['height'] == 1 and layout['blocks'][0]['rows'] == [[]]
+    assert layout['merges'] == [(0, 0, 1, 0)]
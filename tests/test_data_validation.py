@@ -0,0 +1,45 @@
+import pytest
+
+from data_validation import classify_result, is_contradictory
+
+# ==========================================
+# 합불 칸 판정 (대시보드 / 컬러리포트 / 결과 생성기 공용 규칙)
+# ==========================================
+@pytest.mark.parametrize('text, expected', [
+    ('합격', '합격'),
+    (' 최종 합격 ', '합격'),
+    ('합 격', '합격'),
+    ('불합격', '불합격'),
+    ('불합', '불합격'),
+    ('미합격', '불합격'),
+    ('탈락', '불합격'),
+    ('1차 불합격', '불합격'),
+    ('합격 → 불합격', '불합격'),
+    ('1차합격', '진행'),
+    ('2차 합격', '진행'),
+    ('면접합격', '진행'),
+    ('예비합격', '진행'),
+    ('예비 합격 3번', '진행'),
+    ('합계', ''),
+    ('결합', ''),
+    ('예비소집 참석', ''),
+    ('합', ''),
+    ('', ''),
+    (None, ''),
+])
+def test_classify_result(text, expected):
+    assert classify_result(text) == expected
+
+@pytest.mark.parametrize('text, expected', [
+    ('합격 → 불합격', True),
+    ('탈락(합격 취소)', True),
+    ('불합격', False),
+    ('미합격', False),
+    ('합격', False),
+    ('1차 합격, 최종 불합격', False),
+    ('예비합격 → 불합격', False),
+    ('합계 탈락', False),
+    ('', False),
+])
+def test_is_contradictory(text, expected):
+    assert is_contradictory(text) is expected
@@ -0,0 +1,227 @@
+import os
+import re
+import sys
+import time
+import argparse
+import threading
+import subprocess
+from datetime import datetime
+
+import pytest
+
+import output_writer
+from output_writer import OutputsClosed, atomic_output, close_outputs, mark_stale, write_text
+from run_budget import (BudgetExceeded, RunBudget, SourceUnavailable, fetch_and_parse, load_last_good,
+                        save_last_good, stage_budget)
+from run_metrics import METRICS
+from sheet_manifest import SheetManifest, fetch_target_sheets
+from sheets_client import RequestScheduler, authorize
+import sheets_stub
+
+GENERATORS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'generators')
+
+def metric(name: str, **labels) -> float:
+    return METRICS.values.get(name, {}).get(METRICS._key(labels), 0.0)
+
+# ==========================================
+# 제한 시간 계산 (가짜 시계)
+# ==========================================
+def test_stage_budget_argument():
+    assert stage_budget('fetch=20') == ('fetch', 20.0)
+    for bad in ('fetch', 'fetch=0', 'fetch=abc', 'upload=5'):
+        with pytest.raises(argparse.ArgumentTypeError):
+            stage_budget(bad)
+
+def test_total_budget_keeps_render_reserve(clock):
+    budget = RunBudget(total=10, clock=clock)
+    assert budget.limit('fetch') == pytest.approx(8.0)    # 전체의 20% 는 렌더링 몫
+    assert budget.limit('render') == pytest.approx(10.0)
+    clock.advance(5)
+    assert budget.limit('fetch') == pytest.approx(3.0)
+    assert budget.limit('render') == pytest.approx(5.0)
+    clock.advance(6)
+    assert budget.limit('fetch') == 0.0
+
+def test_stage_budget_is_cumulative(clock):
+    budget = RunBudget(stages={'fetch': 3}, clock=clock)
+    assert budget.run('fetch', lambda: clock.advance(2) or 'rows') == 'rows'
+    assert budget.used['fetch'] == pytest.approx(2.0)
+    assert budget.limit('fetch') == pytest.approx(1.0)
+    assert budget.limit('parse') is None
+
+def test_disabled_budget_calls_directly(clock):
+    budget = RunBudget(clock=clock)
+    assert not budget.enabled
+    assert budget.run('fetch', threading.current_thread) is threading.current_thread()
+
+# ==========================================
+# 단계 초과
+# ==========================================
+def test_fetch_overrun_raises_without_waiting():
+    budget = RunBudget(stages={'fetch': 0.05})
+    release = threading.Event()
+    before = metric('budget_overruns', stage='fetch')
+    start = time.monotonic()
+    with pytest.raises(BudgetExceeded) as exc:
+        budget.run('fetch', release.wait, 5)
+    release.set()
+    assert time.monotonic() - start < 1.0
+    assert exc.value.stage == 'fetch'
+    assert budget.overruns == ['fetch']
+    assert not budget.render_overrun
+    assert metric('budget_overruns', stage='fetch') == before + 1
+
+def test_exhausted_budget_skips_stage(clock):
+    budget = RunBudget(total=10, clock=clock)
+    clock.advance(20)
+    called = []
+    with pytest.raises(BudgetExceeded):
+        budget.run('parse', called.append, 1)
+    assert called == []
+
+def test_stage_error_is_raised_in_caller():
+    budget = RunBudget(stages={'parse': 5})
+    with pytest.raises(KeyError):
+        budget.run('parse', {}.__getitem__, 'missing')
+
+def test_render_overrun_blocks_late_writes(workdir):
+    write_text('reports/a.html', '<html><body>old</body></html>')
+    budget = RunBudget(stages={'render': 0.05})
+    started, release = threading.Event(), threading.Event()
+    errors = []
+
+    def slow_render() -> None:
+        started.set()
+        release.wait(5)
+        try:
+            write_text('reports/a.html', '<html><body>new</body></html>')
+        except OutputsClosed as e:
+            errors.append(e)
+
+    with pytest.raises(BudgetExceeded):
+        budget.run('render', slow_render)
+    assert budget.render_overrun
+    release.set()
+    for _ in range(500):
+        if errors: break
+        time.sleep(0.01)
+    assert errors, "버려진 렌더링 스레드의 기록이 막혀야 함"
+    with open('reports/a.html', encoding='utf-8') as f:
+        assert 'old' in f.read()
+    assert os.listdir('reports') == ['a.html']
+
+# ==========================================
+# 출력 닫기 / 오래된 데이터 표시
+# ==========================================
+def test_close_outputs_keeps_previous_file(workdir):
+    write_text('out.html', '<body>v1</body>')
+    close_outputs()
+    with pytest.raises(OutputsClosed):
+        write_text('out.html', '<body>v2</body>')
+    with open('out.html', encoding='utf-8') as f:
+        assert f.read() == '<body>v1</body>'
+
+def test_close_during_write_discards_temp_file(workdir):
+    with pytest.raises(OutputsClosed):
+        with atomic_output('out.csv') as out:
+            with open(out.tmp, 'w', encoding='utf-8') as f:
+                f.write('late')
+            close_outputs()
+    assert os.listdir('.') == []
+
+def test_stale_banner_only_in_html(workdir):
+    mark_stale(datetime(2026, 3, 2, 8, 30), '데이터 수집 단계가 제한 시간(20초) 안에 끝나지 않았습니다')
+    write_text('page.html', '<html><body class="x"><h1>t</h1></body></html>')
+    write_text('data.csv', 'a,b\n')
+    with open('page.html', encoding='utf-8') as f:
+        html = f.read()
+    assert re.search(r'<body class="x"><div class="stale-banner"[^>]*>⚠️ 최신 데이터가 아닙니다 - 2026-03-02 08:30', html)
+    with open('data.csv', encoding='utf-8') as f:
+        assert f.read() == 'a,b\n'
+    mark_stale(None)
+    write_text('page.html', '<html><body><h1>t</h1></body></html>')
+    with open('page.html', encoding='utf-8') as f:
+        assert 'stale-banner' not in f.read()
+
+# ==========================================
+# last-good 대체
+# ==========================================
+def test_success_saves_last_good_without_budget(workdir):
+    data = fetch_and_parse(RunBudget(), 'dashboard', lambda: [1, 2], lambda raw: {'n': len(raw)})
+    assert data == {'n': 2}
+    loaded = load_last_good('dashboard')
+    assert loaded is not None and loaded[1] == {'n': 2}
+    assert output_writer.STALE_NOTICE['fetched_at'] is None
+
+def test_unbudgeted_failure_is_raised(workdir):
+    save_last_good('dashboard', {'n': 1})
+
+    def fetch():
+        raise SourceUnavailable('구글 시트 연결 실패')
+
+    with pytest.raises(SourceUnavailable):
+        fetch_and_parse(RunBudget(), 'dashboard', fetch, lambda raw: raw)
+    assert output_writer.STALE_NOTICE['fetched_at'] is None
+
+def test_budgeted_failure_uses_last_good(workdir):
+    save_last_good('dashboard', {'n': 1}, fetched_at=datetime(2026, 3, 1, 9, 0))
+
+    def fetch():
+        raise SourceUnavailable('구글 시트 연결 실패')
+
+    data = fetch_and_parse(RunBudget(stages={'fetch': 5}), 'dashboard', fetch, lambda raw: raw)
+    assert data == {'n': 1}
+    assert output_writer.STALE_NOTICE['fetched_at'] == datetime(2026, 3, 1, 9, 0)
+    assert '데이터 수집 실패' in output_writer.STALE_NOTICE['reason']
+    assert metric('stale_data_age_seconds', source='dashboard') > 0
+
+def test_overrun_without_last_good_returns_none(workdir):
+    budget = RunBudget(stages={'fetch': 0.05})
+    release = threading.Event()
+    assert fetch_and_parse(budget, 'table', lambda: release.wait(5), lambda raw: raw) is None
+    release.set()
+
+# ==========================================
+# 대역 서버 지연 주입
+# ==========================================
+def test_slow_source_falls_back_to_last_good(workdir):
+    stub = sheets_stub.SheetsStub(sheets_stub.build_workbook(classes=3, students_per_class=4, result_students=5))
+    server, base = sheets_stub.start_stub(stub)
+    try:
+        client = authorize(endpoint=base)
+        url = f"https://docs.google.com/spreadsheets/d/{sheets_stub.SPREADSHEET_ID}/edit"
+        manifest = SheetManifest(path='manifest.json')
+        pattern = re.compile(r"진학희망 및 지원유형 조사\(3\d{2}\)_Sheet1")
+
+        def fetch():
+            return list(fetch_target_sheets(client, url, pattern, RequestScheduler(), manifest, columns=[0, 1, 2]))
+
+        def parse(sheets):
+            return {sheet['title']: len(rows) for sheet, rows in sheets}
+
+        fresh = fetch_and_parse(RunBudget(stages={'fetch': 10}), 'dashboard', fetch, parse)
+        assert len(fresh) == 3
+        assert output_writer.STALE_NOTICE['fetched_at'] is None
+
+        stub.latency_ms = 2000
+        budget = RunBudget(stages={'fetch': 0.3})
+        start = time.monotonic()
+        data = fetch_and_parse(budget, 'dashboard', fetch, parse)
+        assert time.monotonic() - start < 1.5
+        assert data == fresh
+        assert budget.overruns == ['fetch']
+        write_text('reports/dashboard.html', '<html><body></body></html>')
+        with open('reports/dashboard.html', encoding='utf-8') as f:
+            assert '데이터 수집 단계가 제한 시간(0.3초) 안에 끝나지 않았습니다' in f.read()
+    finally:
+        stub.latency_ms = 0
+        server.shutdown()
+        server.server_close()
+
+def test_dashboard_without_key_reports_connection_failure(workdir):
+    env = {k: v for k, v in os.environ.items() if k != 'SHEETS_ENDPOINT'}
+    result = subprocess.run([sys.executable, os.path.join(GENERATORS, 'generate_dashboard.py')],
+                            cwd=workdir, env=env, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    assert '❌ 구글 시트 연결 실패' in result.stdout
+    assert 'Traceback' not in result.stderr
@@ -0,0 +1,106 @@
+import json
+import random
+
+import pytest
+
+import school_names
+from school_names import SchoolNameResolver, bigrams, display_school_name, normalize_school_name
+
+# ==========================================
+# 표기 정규화
+# ==========================================
+@pytest.mark.parametrize('raw, display, key', [
+    ('하나고등학교(자사)', '하나고', '하나고'),
+    ('하나고 (자사)', '하나고', '하나고'),
+    (' 서울 과학 고등학교 ', '서울 과학고', '서울과학고'),
+    ('서울국제고교', '서울국제고', '서울국제고'),
+    ('중앙여자고등학교', '중앙여고', '중앙여고'),
+    ('ＡＢ고', 'AB고', 'AB고'),            # 전각 → 반각 (NFKC)
+    ('하나고(자사', '하나고', '하나고'),    # 닫히지 않은 괄호
+    ('', '', ''),
+])
+def test_normalize(raw, display, key):
+    assert display_school_name(raw) == display
+    assert normalize_school_name(raw) == key
+
+# ==========================================
+# 같은 학교 / 다른 학교 경계
+# ==========================================
+def test_similar_but_different_schools_stay_separate():
+    resolver = SchoolNameResolver(path=None)
+    assert resolver.resolve('서울과학고') == '서울과학고'
+    assert resolver.resolve('세종과학고') == '세종과학고'
+    assert resolver.resolve('한성과학고등학교') == '한성과학고'
+    assert resolver.resolve('서울과학영재학교') != resolver.resolve('한국과학영재학교')
+
+def test_similar_unknown_schools_stay_separate_without_known_list():
+    # 미리 등록된 이름 없이 데이터만으로도 Dice 0.5 쌍은 합치지 않음
+    resolver = SchoolNameResolver(known=(), path=None)
+    mapping = resolver.resolve_all(['서울과학고', '세종과학고', '서울과학고등학교'])
+    assert mapping == {'서울과학고': '서울과학고', '서울과학고등학교': '서울과학고', '세종과학고': '세종과학고'}
+
+def test_spelling_variants_merge():
+    resolver = SchoolNameResolver(path=None)
+    assert resolver.resolve('하나고등학교(자사)') == '하나고'
+    assert resolver.resolve('미림 마이스터고등학교') == '미림마이스터고'
+    assert resolver.resolve('미림마이스터') == '미림마이스터고'          # Dice 0.91
+    assert resolver.resolve('서울과학영재학고') == '서울과학영재학교'     # 오타, Dice 0.86
+    assert resolver.stats['fuzzy'] == 2
+
+def test_short_names_are_not_fuzzy_matched():
+    resolver = SchoolNameResolver(path=None)
+    assert resolver.resolve('중동교') == '중동교'   # 바이그램 2개 < MIN_NGRAMS
+    assert resolver.stats['new'] == 1
+
+def test_most_common_spelling_becomes_canonical():
+    resolver = SchoolNameResolver(known=(), path=None)
+    mapping = resolver.resolve_all(['목일과학기술고'] * 3 + ['목일과학기술고등학교(특성화)', '', '목일 과학기술고'])
+    assert set(mapping.values()) == {'목일과학기술고'}
+    assert '' not in mapping
+
+def test_prefix_filter_matches_brute_force():
+    # 후보 제한(prefix / 길이 필터)이 전체 비교와 같은 결과를 내는지 무작위 이름으로 확인
+    rng = random.Random(0)
+    syllables = '가나다라마바사아자차카타파하서울과학국제예술'
+    names = [''.join(rng.choice(syllables) for _ in range(rng.randint(3, 7))) + '고' for _ in range(300)]
+    resolver = SchoolNameResolver(known=names[:150], path=None)
+    for name in names[150:]:
+        key = normalize_school_name(name)
+        grams = bigrams(key)
+        best, best_score = None, 0.0
+        for idx, other in enumerate(resolver.grams):
+            score = 2.0 * len(grams & other) / (len(grams) + len(other)) if grams or other else 0.0
+            if score > best_score: best, best_score = idx, score
+        expected = best if len(grams) >= school_names.MIN_NGRAMS and best_score >= resolver.threshold else None
+        assert resolver._best_match(key) == expected, name
+
+# ==========================================
+# 캐시
+# ==========================================
+def test_cache_is_reused(workdir):
+    path = 'school_names.json'
+    first = SchoolNameResolver(path=path)
+    first.resolve_all(['하나고등학교(자사)', '새빛과학고'])
+    first.save()
+    second = SchoolNameResolver(path=path)
+    assert second.resolve('하나고등학교(자사)') == '하나고'
+    assert second.resolve('새빛과학고등학교') == '새빛과학고'   # 캐시에서 온 표준 이름도 색인됨
+    assert second.stats['cached'] == 1
+
+def test_cache_from_old_rules_is_discarded(workdir):
+    path = 'school_names.json'
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'version': 'old-rules', 'mapping': {'세종과학고': '서울과학고'}}, f, ensure_ascii=False)
+    resolver = SchoolNameResolver(path=path)
+    assert resolver.resolve('세종과학고') == '세종과학고'
+    assert resolver.stats['cached'] == 0
+    resolver.save()
+    with open(path, encoding='utf-8') as f:
+        payload = json.load(f)
+    assert payload['version'] == school_names.RULES_VERSION
+    assert payload['mapping'] == {'세종과학고': '세종과학고'}
+
+def test_unreadable_cache_is_ignored(workdir):
+    with open('school_names.json', 'w', encoding='utf-8') as f:
+        f.write('{not json')
+    assert SchoolNameResolver(path='school_names.json').resolve('하나고') == '하나고'
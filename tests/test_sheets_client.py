@@ -0,0 +1,254 @@
+import re
+import random
+import threading
+from typing import Any, Dict, List
+
+import pytest
+
+from sheets_client import TokenBucket, RequestScheduler
+from sheet_manifest import SheetManifest, fetch_target_sheets, read_sheet_columns, column_letter
+
+SHEET_URL = 'https://docs.google.com/spreadsheets/d/fake-sheet-id/edit#gid=0'
+SPREADSHEET_ID = 'fake-sheet-id'
+
+# ==========================================
+# 가짜 gspread 클라이언트
+# ==========================================
+class FakeAPIError(Exception):
+    """gspread.exceptions.APIError 처럼 response.status_code 를 가진 오류"""
+
+    def __init__(self, status: int):
+        super().__init__(f"HTTP {status}")
+        self.response = type('Response', (), {'status_code': status})()
+
+class FakeWorksheet:
+    def __init__(self, sheet_id: int, title: str, index: int):
+        self.id, self.title, self.index = sheet_id, title, index
+        self.row_count, self.col_count = 100, 26
+
+class FakeHTTPClient:
+    def __init__(self, client: 'FakeClient'):
+        self.client = client
+
+    def values_batch_get(self, spreadsheet_id: str, ranges: List[str]) -> Dict[str, Any]:
+        return self.client.batch_get(ranges)
+
+class FakeDoc:
+    def __init__(self, client: 'FakeClient'):
+        self.client = client
+
+    def worksheets(self) -> List[FakeWorksheet]:
+        self.client.calls.append('worksheets')
+        return [FakeWorksheet(i, title, i) for i, title in enumerate(self.client.sheets)]
+
+    def values_batch_get(self, ranges: List[str]) -> Dict[str, Any]:
+        return self.client.batch_get(ranges)
+
+class FakeClient:
+    """
+    gspread.Client 대역: 시트 제목 → 행 목록. 호출을 calls 에 기록하고,
+    failures 에 상태 코드를 넣어 두면 값 읽기가 그 순서대로 실패합니다.
+    with_http_client=False 이면 gspread 6 이전처럼 open_by_key 경로를 탑니다.
+    """
+
+    def __init__(self, sheets: Dict[str, List[List[str]]], with_http_client: bool = True):
+        self.sheets = sheets
+        self.calls: List[str] = []
+        self.ranges: List[str] = []
+        self.failures: List[int] = []
+        if with_http_client: self.http_client = FakeHTTPClient(self)
+
+    def open_by_url(self, url: str) -> FakeDoc:
+        self.calls.append('open_by_url')
+        return FakeDoc(self)
+
+    def open_by_key(self, key: str) -> FakeDoc:
+        self.calls.append('open_by_key')
+        return FakeDoc(self)
+
+    def batch_get(self, ranges: List[str]) -> Dict[str, Any]:
+        self.calls.append('values')
+        if self.failures: raise FakeAPIError(self.failures.pop(0))
+        title = ranges[0].split('!')[0].strip("'")
+        rows = self.sheets[title]
+        out = []
+        for a1 in ranges:
+            self.ranges.append(a1)
+            start, end = a1.split('!')[1].split(':')
+            lo, hi = column_index(start), column_index(end)
+            out.append({'values': [row[lo:hi + 1] for row in rows]})
+        return {'valueRanges': out}
+
+def column_index(letters: str) -> int:
+    index = 0
+    for ch in letters: index = index * 26 + ord(ch) - 64
+    return index - 1
+
+def scheduler_for(clock, **kwargs: Any) -> RequestScheduler:
+    """가짜 시계/sleep 을 쓰는 스케줄러 (버킷도 같은 시계)"""
+    bucket = kwargs.pop('bucket', None) or TokenBucket(capacity=100, refill_per_sec=100, clock=clock, sleep=clock.sleep)
+    return RequestScheduler(bucket=bucket, sleep=clock.sleep, clock=clock, rng=random.Random(0), **kwargs)
+
+# ==========================================
+# 토큰 버킷
+# ==========================================
+def test_bucket_waits_for_refill_on_fake_clock(clock):
+    bucket = TokenBucket(capacity=2, refill_per_sec=0.5, clock=clock, sleep=clock.sleep)
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == pytest.approx(2.0)   # 토큰 1개 = 2초
+    assert clock.sleeps == [pytest.approx(2.0)]
+
+def test_bucket_per_minute_quota(clock):
+    bucket = TokenBucket.per_minute(60, clock=clock, sleep=clock.sleep)
+    assert all(bucket.try_acquire() for _ in range(60))
+    assert not bucket.try_acquire()
+    clock.advance(1.0)
+    assert bucket.try_acquire()
+
+def test_scheduler_throttles_to_quota(clock):
+    bucket = TokenBucket(capacity=1, refill_per_sec=1.0, clock=clock, sleep=clock.sleep)
+    scheduler = scheduler_for(clock, bucket=bucket)
+    for i in range(3):
+        scheduler.call(('values', i), lambda: None)
+    assert scheduler.stats['calls'] == 3
+    assert scheduler.stats['throttled_sec'] == pytest.approx(2.0)
+
+# ==========================================
+# 재시도 / 백오프
+# ==========================================
+def test_scheduler_retries_429_with_backoff(clock):
+    client = FakeClient({'S': [['a']]})
+    client.failures = [429, 503]
+    scheduler = scheduler_for(clock)
+    response = scheduler.call(('values', 'S'), client.http_client.values_batch_get, SPREADSHEET_ID, ["'S'!A:A"])
+    assert response['valueRanges'][0]['values'] == [['a']]
+    assert scheduler.stats['retries'] == 2
+    # 1초, 2초 기준 지수 백오프 + 최대 50% 지터
+    assert 1.0 <= clock.sleeps[0] <= 1.5
+    assert 2.0 <= clock.sleeps[1] <= 3.0
+
+def test_scheduler_does_not_retry_client_errors(clock):
+    client = FakeClient({'S': [['a']]})
+    client.failures = [400]
+    scheduler = scheduler_for(clock)
+    with pytest.raises(FakeAPIError):
+        scheduler.call(('values', 'S'), client.http_client.values_batch_get, SPREADSHEET_ID, ["'S'!A:A"])
+    assert scheduler.stats['retries'] == 0
+    assert clock.sleeps == []
+
+def test_scheduler_gives_up_after_max_retries(clock):
+    client = FakeClient({'S': [['a']]})
+    client.failures = [429] * 3
+    scheduler = scheduler_for(clock, max_retries=2)
+    with pytest.raises(FakeAPIError):
+        scheduler.call(('values', 'S'), client.http_client.values_batch_get, SPREADSHEET_ID, ["'S'!A:A"])
+    assert client.calls.count('values') == 3
+
+# ==========================================
+# 중복 요청 병합 (진행 중인 요청만)
+# ==========================================
+def test_inflight_duplicates_share_one_request(clock):
+    scheduler = scheduler_for(clock)
+    started, release = threading.Event(), threading.Event()
+    calls: List[int] = []
+
+    def slow_read() -> int:
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return len(calls)
+
+    results: List[int] = []
+    first = threading.Thread(target=lambda: results.append(scheduler.call('k', slow_read)))
+    first.start()
+    assert started.wait(5)
+    second = threading.Thread(target=lambda: results.append(scheduler.call('k', slow_read)))
+    second.start()
+    for _ in range(500):
+        if scheduler.stats['coalesced']: break
+        threading.Event().wait(0.01)
+    release.set()
+    first.join(5); second.join(5)
+
+    assert len(calls) == 1
+    assert results == [1, 1]
+    assert scheduler.stats['coalesced'] == 1
+
+def test_finished_request_is_read_again(clock):
+    scheduler = scheduler_for(clock)
+    values = iter(['old', 'new'])
+    assert scheduler.call(('values', 'S'), lambda: next(values)) == 'old'
+    # 끝난 요청의 결과는 보관하지 않음 → 다시 읽기(실시간 갱신 등)는 새 값
+    assert scheduler.call(('values', 'S'), lambda: next(values)) == 'new'
+    assert scheduler.stats['coalesced'] == 0
+
+def test_failed_request_is_not_shared_afterwards(clock):
+    scheduler = scheduler_for(clock)
+    with pytest.raises(ValueError):
+        scheduler.call('k', lambda: (_ for _ in ()).throw(ValueError('boom')))
+    assert scheduler.call('k', lambda: 'ok') == 'ok'
+
+def test_call_cached_expires_after_ttl(clock):
+    scheduler = scheduler_for(clock)
+    client = FakeClient({})
+    first = scheduler.call_cached(('open_key', 'x'), client.open_by_key, 'x', ttl=60)
+    assert scheduler.call_cached(('open_key', 'x'), client.open_by_key, 'x', ttl=60) is first
+    clock.advance(61)
+    assert scheduler.call_cached(('open_key', 'x'), client.open_by_key, 'x', ttl=60) is not first
+    scheduler.invalidate(('open_key', 'x'))
+    scheduler.call_cached(('open_key', 'x'), client.open_by_key, 'x', ttl=60)
+    assert client.calls.count('open_by_key') == 3
+    assert scheduler.stats['cached'] == 1
+
+# ==========================================
+# 가짜 클라이언트로 시트 읽기
+# ==========================================
+SURVEY = {
+    '설문(301)': [['반', '번호', '이름', '', 'x'], ['', '', '', '', ''], ['3-1', '1', '김', '', 'y']],
+    '설문(302)': [['반', '번호', '이름', '', 'x'], ['', '', '', '', ''], ['3-2', '7', '이', '', 'z']],
+    '결과': [['무관']],
+}
+
+def test_fetch_target_sheets_reads_only_mapped_columns(clock, workdir):
+    client = FakeClient(SURVEY)
+    scheduler = scheduler_for(clock)
+    manifest = SheetManifest(path='manifest.json', clock=clock)
+    got = list(fetch_target_sheets(client, SHEET_URL, re.compile(r"설문\(3\d{2}\)"), scheduler, manifest, columns=[0, 2, 4]))
+
+    assert [sheet['title'] for sheet, _ in got] == ['설문(301)', '설문(302)']
+    assert got[0][1][2] == ['3-1', '', '김', '', 'y']   # 읽지 않은 열은 '' (원래 열 위치 유지)
+    assert client.calls == ['open_by_url', 'worksheets', 'values', 'values']
+    assert scheduler.stats['calls'] == 4
+
+    # 매니페스트가 유효하면 탐색 없이 값만 읽음
+    client.calls.clear()
+    list(fetch_target_sheets(client, SHEET_URL, re.compile(r"설문\(3\d{2}\)"), scheduler, manifest, columns=[0, 2, 4]))
+    assert client.calls == ['values', 'values']
+
+def test_open_by_key_fallback_reuses_handle(clock):
+    client = FakeClient(SURVEY, with_http_client=False)
+    scheduler = scheduler_for(clock)
+    for title in ('설문(301)', '설문(302)'):
+        read_sheet_columns(client, SPREADSHEET_ID, {'id': title, 'title': title}, [0, 1], scheduler)
+    assert client.calls == ['open_by_key', 'values', 'values']
+
+def test_tail_reads_to_last_sheet_column(clock):
+    # 대시보드 합불 스캔: Q열부터 시트 끝(AD)까지 - Z 뒤 비고란의 결과도 읽음
+    row = [''] * 30
+    row[:3], row[28] = ['3-1', '1', '김'], '최종 합격'
+    client = FakeClient({'넓은 시트': [row]})
+    sheet = {'id': 7, 'title': '넓은 시트', 'cols': 30}
+    rows = read_sheet_columns(client, SPREADSHEET_ID, sheet, [0, 1, 2] + list(range(16, 26)), scheduler_for(clock), tail_from=16)
+    assert client.ranges == ["'넓은 시트'!A:C", "'넓은 시트'!Q:AD"]
+    assert len(rows[0]) == 30 and rows[0][28] == '최종 합격'
+
+def test_tail_keeps_minimum_width_on_default_grid(clock):
+    client = FakeClient({'S': [['a'] + [''] * 25]})
+    rows = read_sheet_columns(client, SPREADSHEET_ID, {'id': 1, 'title': 'S', 'cols': 26},
+                              [0] + list(range(16, 26)), scheduler_for(clock), tail_from=16)
+    assert client.ranges == ["'S'!A:A", "'S'!Q:Z"]
+    assert len(rows[0]) == 26
+
+def test_column_letter():
+    assert [column_letter(i) for i in (0, 16, 25, 26, 29, 701, 702)] == ['A', 'Q', 'Z', 'AA', 'AD', 'ZZ', 'AAA']